@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Evaluate search ranking against a labeled query set.
+
+Each line of the query file is a JSON object with a query and the spans a
+good search should return:
+
+    {"query": "how to make search fast", "relevant": [
+        {"video_id": "…", "start_ms": 120000, "end_ms": 150000},
+        {"video_id": "…"}
+    ]}
+
+Optional "tags" and "platform" keys filter the query like /search does.
+A relevant span is found when a result from the same video overlaps it; a
+label without timestamps matches any result from the video. Candidates are
+retrieved once per query from the configured database, then every fusion
+configuration is ranked over the same candidates.
+
+Usage:
+    python backend/benchmarks/search_eval.py queries.jsonl [--k 5 10 20]
+        [--config rrf:0.6:0.4 --config weighted:0.6:0.4]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.search_service import search_service
+
+
+def load_queries(path: Path) -> list[dict]:
+    """Load labeled queries from a JSON Lines file."""
+    queries = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                queries.append(json.loads(line))
+    return queries
+
+
+def parse_config(value: str) -> tuple[str, float, float]:
+    """Parse a mode:vector_weight:text_weight fusion configuration."""
+    mode, vector_weight, text_weight = value.split(":")
+    if mode not in ("rrf", "weighted"):
+        raise argparse.ArgumentTypeError(f"Unknown fusion mode: {mode}")
+    return mode, float(vector_weight), float(text_weight)
+
+
+def matches(result: dict, label: dict) -> bool:
+    """Check whether a result covers a labeled relevant span."""
+    if result["video_id"] != label["video_id"]:
+        return False
+    if "start_ms" not in label:
+        return True
+    return result["start_ms"] < label.get("end_ms", label["start_ms"] + 1) and result["end_ms"] > label["start_ms"]
+
+
+def recall_at_k(results: list[dict], relevant: list[dict], k: int) -> float:
+    """Fraction of relevant spans found in the top k results."""
+    if not relevant:
+        return 0.0
+    top = results[:k]
+    found = sum(1 for label in relevant if any(matches(r, label) for r in top))
+    return found / len(relevant)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def evaluate(queries: list[dict], configs: list[tuple[str, float, float]], ks: list[int]):
+    """Retrieve candidates per query and score every fusion configuration."""
+    max_k = max(ks)
+    retrieval_ms = []
+    candidates = []
+    
+    for item in queries:
+        start = time.perf_counter()
+        candidates.append(await search_service.retrieve_candidates(
+            item["query"],
+            tags=item.get("tags"),
+            platform=item.get("platform")
+        ))
+        retrieval_ms.append((time.perf_counter() - start) * 1000)
+    
+    print(f"Queries: {len(queries)}")
+    print(f"Retrieval latency: p50 {percentile(retrieval_ms, 50):.1f} ms, "
+          f"p95 {percentile(retrieval_ms, 95):.1f} ms")
+    print("=" * 60)
+    
+    header = f"{'config':<24}" + "".join(f"{f'R@{k}':>8}" for k in ks) + f"{'fuse p50':>12}{'fuse p95':>12}"
+    print(header)
+    
+    for mode, vector_weight, text_weight in configs:
+        recalls = {k: [] for k in ks}
+        fusion_ms = []
+        
+        for item, (vector_results, text_results) in zip(queries, candidates):
+            start = time.perf_counter()
+            merged = search_service.merge_results(
+                vector_results,
+                text_results,
+                mode=mode,
+                vector_weight=vector_weight,
+                text_weight=text_weight
+            )
+            ranked = search_service.rank_results(merged, max_k)
+            fusion_ms.append((time.perf_counter() - start) * 1000)
+            
+            for k in ks:
+                recalls[k].append(recall_at_k(ranked, item.get("relevant", []), k))
+        
+        label = f"{mode}:{vector_weight:g}:{text_weight:g}"
+        row = f"{label:<24}" + "".join(f"{statistics.mean(recalls[k]):>8.3f}" for k in ks)
+        row += f"{percentile(fusion_ms, 50):>9.2f} ms{percentile(fusion_ms, 95):>9.2f} ms"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("queries", type=Path, help="JSON Lines file of labeled queries")
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument(
+        "--config",
+        type=parse_config,
+        action="append",
+        help="Fusion configuration as mode:vector_weight:text_weight (repeatable)"
+    )
+    args = parser.parse_args()
+    
+    configs = args.config or [
+        ("rrf", 1.0, 1.0),
+        ("rrf", 0.6, 0.4),
+        ("weighted", 0.6, 0.4),
+        ("weighted", 1.0, 0.0),
+    ]
+    
+    queries = load_queries(args.queries)
+    if not queries:
+        print("❌ No queries found")
+        sys.exit(1)
+    
+    asyncio.run(evaluate(queries, configs, args.k))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """Configuration management using pydantic-settings."""
 
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -22,9 +23,104 @@ class Settings(BaseSettings):
     max_video_duration_seconds: int = 7200
     signed_url_ttl_seconds: int = 900
     
+    # Transcript chunking
+    chunk_duration_ms: int = 12500
+    chunk_overlap_ms: int = 1500
+    chunking_mode: Literal["time", "sentence"] = "time"
+    chunk_min_ms: int = 6000
+    chunk_target_ms: int = 15000
+    chunk_max_ms: int = 20000
+    chunk_pause_ms: int = 700
+    
+    # Notes generation
+    notes_max_chars: int = 30000
+    notes_window_chars: int = 12000
+    notes_map_concurrency: int = 4
+    
+    # Audio fingerprint deduplication
+    fingerprint_enabled: bool = False
+    fingerprint_max_seconds: int = 180
+    fingerprint_min_matches: int = 20
+    fingerprint_min_match_ratio: float = 0.02
+    fingerprint_max_duration_diff_seconds: int = 10
+    
+    # Audio pre-processing before upload and transcription
+    audio_transcode_enabled: bool = False
+    audio_transcode_bitrate: str = "24k"
+    audio_trim_silence: bool = False
+    silence_threshold_db: int = -50
+    silence_min_seconds: float = 0.5
+    
+    # Segmented transcription for long media
+    transcription_segmented_enabled: bool = False
+    transcription_segment_seconds: int = 600
+    transcription_segment_overlap_seconds: float = 2.0
+    transcription_segment_concurrency: int = 4
+    
+    # Embeddings
+    embedding_backend: Literal["gemini", "local"] = "gemini"
+    embedding_dimension: int = 768
+    embedding_batch_size: int = 64
+    local_embedding_model: str = "sentence-transformers/all-mpnet-base-v2"
+    local_embedding_runtime: Literal["onnx", "torch"] = "onnx"
+    embedding_model_cache_seconds: int = 30
+    
+    # Transcription backend
+    transcription_backend: Literal["deepgram", "local"] = "deepgram"
+    local_transcription_model: str = "small"
+    local_transcription_compute_type: str = "int8"
+    local_transcription_workers: int = 2
+    local_transcription_cpu_threads: int = 4
+    local_transcription_model_cache_size: int = 1
+    local_transcription_beam_size: int = 1
+    
+    # Deepgram
+    deepgram_base_url: str = "https://api.deepgram.com/v1/listen"
+    deepgram_callback_enabled: bool = False
+    deepgram_callback_secret: str = ""
+    deepgram_callback_timeout_seconds: int = 3600
+    deepgram_callback_sweep_seconds: int = 300
+    public_base_url: str = "http://localhost:8000"
+    
+    # Search ranking
+    search_fusion_mode: Literal["rrf", "weighted"] = "rrf"
+    search_vector_weight: float = 0.6
+    search_text_weight: float = 0.4
+    search_rrf_k: int = 60
+    search_candidates: int = 50
+    search_cache_enabled: bool = True
+    search_cache_size: int = 512
+    search_cache_ttl_seconds: int = 300
+    search_cache_redis: bool = False
+    suggest_refresh_seconds: int = 5
+    suggest_full_rebuild_seconds: int = 600
+    related_refresh_seconds: int = 10
+    related_full_rebuild_seconds: int = 600
+    
+    # Vector index
+    vector_index_enabled: bool = False
+    vector_index_path: str = "data/vector_index"
+    vector_index_nlist: int = 0
+    vector_index_nprobe: int = 8
+    vector_index_train_iterations: int = 10
+    vector_index_refresh_seconds: int = 10
+    vector_snapshot_dtype: Literal["float32", "float16", "int8"] = "int8"
+    vector_index_rescore_factor: int = 4
+    vector_snapshot_compact_entries: int = 100
+    
+    # Auto collections
+    auto_collections_clusters: int = 0
+    auto_collections_min_size: int = 3
+    auto_collections_min_similarity: float = 0.6
+    auto_collections_iterations: int = 20
+    auto_collections_label_keywords: int = 3
+    
     # Rate Limiting
     ingest_rate_limit_per_hour: int = 10
     search_rate_limit_per_hour: int = 100
+    ingest_rate_limit_burst: int = 3
+    search_rate_limit_burst: int = 20
+    rate_limit_local_lease: int = 5
     
     model_config = SettingsConfigDict(
         env_file="../.env",
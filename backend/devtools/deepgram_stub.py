@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Deepgram pre-recorded API.
+
+Serves POST /v1/listen. Without a callback parameter it answers synchronously
+with a canned transcript; with one it returns a request ID at once and POSTs
+the result to the callback URL after a delay, like Deepgram's callback mode.
+
+Usage:
+    python backend/devtools/deepgram_stub.py [--port 8081] [--delay 2] [--fail]
+
+Then point the API and worker at it:
+    DEEPGRAM_BASE_URL=http://localhost:8081/v1/listen
+"""
+
+import argparse
+import asyncio
+import uuid
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+SAMPLE_TEXT = (
+    "Welcome back to the channel. Today we are looking at how to make search "
+    "fast. First, keep the index small. Second, measure before you optimize."
+)
+
+app = FastAPI(title="Deepgram stub")
+options = argparse.Namespace(delay=2.0, fail=False)
+
+
+def build_result(request_id: str) -> dict:
+    """Build a Deepgram-shaped result with evenly spaced word timings."""
+    words = []
+    t = 0.5
+    for token in SAMPLE_TEXT.split():
+        words.append({
+            "word": token.strip(".,").lower(),
+            "punctuated_word": token,
+            "start": round(t, 2),
+            "end": round(t + 0.3, 2),
+            "confidence": 0.99,
+        })
+        t += 0.4
+    
+    return {
+        "metadata": {"request_id": request_id, "duration": round(t, 2), "channels": 1},
+        "results": {
+            "channels": [{
+                "alternatives": [{
+                    "transcript": SAMPLE_TEXT,
+                    "confidence": 0.99,
+                    "words": words,
+                }],
+                "detected_language": "en",
+            }],
+        },
+    }
+
+
+async def deliver(callback_url: str, request_id: str):
+    """POST the result (or an error body) to the callback URL after a delay."""
+    await asyncio.sleep(options.delay)
+    
+    if options.fail:
+        body = {"err_code": "REMOTE_CONTENT_ERROR", "err_msg": "Stubbed failure", "request_id": request_id}
+    else:
+        body = build_result(request_id)
+    
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(callback_url, json=body)
+        print(f"📨 Callback {request_id} -> {response.status_code}")
+    except Exception as e:
+        print(f"❌ Callback {request_id} failed: {e}")
+
+
+@app.post("/v1/listen")
+async def listen(request: Request, callback: str | None = None):
+    """Emulate Deepgram's pre-recorded transcription endpoint."""
+    request_id = str(uuid.uuid4())
+    
+    if callback:
+        asyncio.create_task(deliver(callback, request_id))
+        return {"request_id": request_id}
+    
+    return build_result(request_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds before the callback is sent")
+    parser.add_argument("--fail", action="store_true", help="Send Deepgram error bodies instead of results")
+    args = parser.parse_args()
+    
+    options.delay = args.delay
+    options.fail = args.fail
+    
+    print(f"🎙️  Deepgram stub listening on http://localhost:{args.port}/v1/listen")
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ from config import settings
 from database import db
 from models import HealthResponse
 from middleware.rate_limit import RateLimitMiddleware
+from services.suggest_index import suggest_index
+from services.related_videos import related_video_index
+from services.callback_sweeper import callback_sweeper
+from services.vector_index import vector_index_service
 
 
 @asynccontextmanager
@@ -19,12 +23,22 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting ClipBrain API...")
     # Note: Direct PostgreSQL connection disabled (using Supabase REST API instead)
     # await db.connect()
+    await suggest_index.start()
+    await related_video_index.start()
+    if settings.vector_index_enabled:
+        await vector_index_service.start()
+    if settings.deepgram_callback_enabled:
+        await callback_sweeper.start()
     print("✅ Application started successfully")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down ClipBrain API...")
+    await suggest_index.stop()
+    await related_video_index.stop()
+    await vector_index_service.stop()
+    await callback_sweeper.stop()
     # await db.disconnect()
     print("✅ Application shut down successfully")
 
@@ -51,17 +65,20 @@ app.add_middleware(RateLimitMiddleware)
 
 
 # Import routes
-from routes import ingest, jobs, items, search, jump, export as export_route, collections, tags
+from routes import ingest, jobs, items, search, jump, export as export_route, collections, tags, admin, webhooks, suggest
 
 # Include routers
 app.include_router(ingest.router, tags=["Ingestion"])
 app.include_router(jobs.router, tags=["Jobs"])
 app.include_router(items.router, tags=["Items"])
 app.include_router(search.router, tags=["Search"])
+app.include_router(suggest.router, tags=["Search"])
 app.include_router(jump.router, tags=["Jump"])
 app.include_router(export_route.router, tags=["Export"])
 app.include_router(collections.router, tags=["Collections"])
 app.include_router(tags.router, tags=["Tags"])
+app.include_router(admin.router, tags=["Admin"])
+app.include_router(webhooks.router, tags=["Webhooks"])
 
 
 @app.get("/")
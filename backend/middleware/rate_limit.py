@@ -1,63 +1,375 @@
 """Rate limiting middleware using Redis."""
 
+import math
+import re
 import time
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from collections import OrderedDict
+from dataclasses import dataclass
+
 import redis.asyncio as redis
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
 from config import settings
 
+# GCRA in one round trip. The key holds the theoretical arrival time (TAT)
+# of the next request in milliseconds; a request is allowed while the TAT
+# stays within the burst tolerance of now. Time comes from the Redis server
+# so API replicas with drifting clocks share one schedule.
+#
+# KEYS[1]: bucket key
+# ARGV[1]: emission interval in ms (period / limit)
+# ARGV[2]: burst, requests allowed back to back
+# ARGV[3]: requests to charge
+# ARGV[4]: 1 to grant fewer requests than asked when that is all there is
+#
+# Returns {granted, remaining, retry_after_ms, reset_after_ms}
+GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local partial = ARGV[4] == '1'
+
+local time = redis.call('TIME')
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+
+local available = math.floor((now - tat) / interval) + burst
+local granted = cost
+if available < cost then
+  if partial and available >= 1 then
+    granted = available
+  else
+    local needed = partial and 1 or cost
+    return {0, 0, tat + (needed - burst) * interval - now, tat - now}
+  end
+end
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware."""
+local new_tat = tat + interval * granted
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {granted, available - granted, 0, new_tat - now}
+"""
+
+# Clients with a local budget kept per process
+MAX_LOCAL_BUCKETS = 10000
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Limit shared by all routes under a path prefix."""
+    name: str
+    prefix: str
+    pattern: re.Pattern
+    limit: int
+    burst: int
+    period_seconds: int = 3600
     
-    def __init__(self, app):
-        super().__init__(app)
+    @property
+    def interval_ms(self) -> int:
+        """Milliseconds between requests at the sustained rate."""
+        return math.ceil(self.period_seconds * 1000 / self.limit)
+    
+    @property
+    def lease(self) -> int:
+        """Requests taken from Redis at a time into the local budget."""
+        return max(1, min(settings.rate_limit_local_lease, self.burst // 4))
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of charging requests against a rule."""
+    granted: int
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+    
+    @property
+    def allowed(self) -> bool:
+        """Whether at least one request was granted."""
+        return self.granted > 0
+    
+    def headers(self) -> dict[str, str]:
+        """X-RateLimit-* headers, plus Retry-After when denied."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+@dataclass
+class _LocalBucket:
+    """Requests granted by Redis and not yet spent by this process."""
+    rule: RateLimitRule
+    tokens: int
+    remaining: int
+    reset_at: float
+    denied_until: float = 0.0
+    
+    def take(self, now: float) -> RateLimitResult | None:
+        """Spend a local token, or report a denial that has not expired."""
+        if self.tokens > 0:
+            self.tokens -= 1
+            return self._result(1, now)
+        if now < self.denied_until:
+            return self._result(0, now)
+        return None
+    
+    def _result(self, granted: int, now: float) -> RateLimitResult:
+        return RateLimitResult(
+            granted=granted,
+            limit=self.rule.limit,
+            remaining=self.remaining + self.tokens,
+            retry_after=max(0.0, self.denied_until - now),
+            reset_after=max(0.0, self.reset_at - now),
+        )
+
+
+def _rule(name: str, prefix: str, limit: int, burst: int) -> RateLimitRule:
+    """Rule for a path and everything below it (/search covers /search/batch)."""
+    return RateLimitRule(
+        name=name,
+        prefix=prefix,
+        pattern=re.compile(rf"^{re.escape(prefix)}(/|$)"),
+        limit=limit,
+        burst=max(1, min(burst, limit)),
+    )
+
+
+class RateLimiter:
+    """
+    GCRA rate limiter backed by a Redis script.
+    
+    Every request is accounted for in Redis, but not one at a time: each
+    process leases a few requests per client and spends them locally, so
+    Redis is consulted once per lease. Denials are also cached locally until
+    their retry time, so rejected clients cost no round trips.
+    """
+    
+    def __init__(self):
+        self.rules = [
+            _rule("ingest", "/ingest", settings.ingest_rate_limit_per_hour, settings.ingest_rate_limit_burst),
+            _rule("search", "/search", settings.search_rate_limit_per_hour, settings.search_rate_limit_burst),
+        ]
+        self._prefixes = tuple(rule.prefix for rule in self.rules)
+        self._buckets: OrderedDict[tuple[str, str], _LocalBucket] = OrderedDict()
         self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        self._script = self.redis_client.register_script(GCRA_SCRIPT)
     
-    async def dispatch(self, request: Request, call_next):
+    def match(self, path: str) -> RateLimitRule | None:
+        """
+        Find the rule limiting a path.
+        
+        Args:
+            path: Request path, without query string
+        
+        Returns:
+            First matching rule, or None if the path is not limited
+        """
+        # One C-level check for the common, unlimited case
+        if not path.startswith(self._prefixes):
+            return None
+        for rule in self.rules:
+            if rule.pattern.match(path):
+                return rule
+        return None
+    
+    async def acquire(self, rule: RateLimitRule, client: str) -> RateLimitResult | None:
+        """
+        Admit one request from a client, from the local budget if possible.
+        
+        Args:
+            rule: Rule limiting the request
+            client: Client identifier, usually the IP address
+        
+        Returns:
+            Result with header values, or None if Redis is unavailable
+            (callers fail open)
+        """
+        key = (rule.name, client)
+        now = time.monotonic()
+        
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            result = bucket.take(now)
+            if result is not None:
+                return result
+        
+        result = await self.charge(rule, client, rule.lease, partial=True)
+        if result is None:
+            return None
+        
+        self._buckets[key] = bucket = _LocalBucket(
+            rule=rule,
+            tokens=result.granted,
+            remaining=result.remaining,
+            reset_at=now + result.reset_after,
+            denied_until=now + result.retry_after,
+        )
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > MAX_LOCAL_BUCKETS:
+            self._buckets.popitem(last=False)
+        
+        return bucket.take(now)
+    
+    async def charge(
+        self,
+        rule: RateLimitRule,
+        client: str,
+        cost: int = 1,
+        partial: bool = False
+    ) -> RateLimitResult | None:
+        """
+        Charge requests from a client against a rule in Redis.
+        
+        Args:
+            rule: Rule to charge
+            client: Client identifier
+            cost: Number of requests to charge
+            partial: Grant fewer than cost requests rather than none
+        
+        Returns:
+            Result, or None if Redis is unavailable
+        """
+        try:
+            granted, remaining, retry_after_ms, reset_after_ms = await self._script(
+                keys=[f"ratelimit:{rule.name}:{client}"],
+                args=[rule.interval_ms, rule.burst, cost, int(partial)],
+            )
+        except Exception:
+            return None
+        
+        return RateLimitResult(
+            granted=int(granted),
+            limit=rule.limit,
+            remaining=max(0, int(remaining)),
+            retry_after=int(retry_after_ms) / 1000,
+            reset_after=int(reset_after_ms) / 1000,
+        )
+    
+    async def charge_path(self, path: str, client: str, cost: int = 1) -> RateLimitResult | None:
+        """
+        Charge extra requests to whichever rule limits a path.
+        
+        Used by endpoints that do the work of several requests, such as
+        batch search, to pay for the requests beyond the first. Tokens this
+        process already leased for the client are spent first and only the
+        rest is charged in Redis, so a call within max_cost() from an idle
+        client always succeeds. The full cost is charged or nothing is: on
+        denial the leased tokens are given back.
+        
+        Args:
+            path: Request path
+            client: Client identifier
+            cost: Number of requests to charge
+        
+        Returns:
+            Result, or None if the path is not limited or Redis is unavailable
+        """
+        rule = self.match(path)
+        if rule is None or cost < 1:
+            return None
+        
+        bucket = self._buckets.get((rule.name, client))
+        leased = min(cost, bucket.tokens) if bucket else 0
+        if leased:
+            bucket.tokens -= leased
+        if leased == cost:
+            return bucket._result(cost, time.monotonic())
+        
+        result = await self.charge(rule, client, cost - leased)
+        if result is None or not result.allowed:
+            if leased:
+                bucket.tokens += leased
+            return result
+        
+        result.granted += leased
+        return result
+    
+    def max_cost(self, path: str) -> int | None:
+        """
+        Most requests one call to a path may stand for.
+        
+        GCRA never admits more than the burst at once, so larger batches
+        could not succeed however long the client waits.
+        
+        Args:
+            path: Request path
+        
+        Returns:
+            The limiting rule's burst, or None if the path is not limited
+        """
+        rule = self.match(path)
+        return rule.burst if rule else None
+
+
+def client_id(request: Request) -> str:
+    """Rate limit identity of a request's client."""
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limited_response(result: RateLimitResult) -> JSONResponse:
+    """429 response for a denied request."""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": f"Rate limit exceeded. Maximum {result.limit} requests per hour."
+        },
+        headers=result.headers(),
+    )
+
+
+class RateLimitMiddleware:
+    """
+    Rate limiting middleware.
+    
+    Plain ASGI rather than BaseHTTPMiddleware: unlimited routes pass straight
+    through after a path check, and limited ones stream their responses
+    unchanged apart from the added headers.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
         """Process request with rate limiting."""
-        # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
+        rule = rate_limiter.match(scope["path"]) if scope["type"] == "http" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
         
-        # Define rate limits per endpoint
-        rate_limits = {
-            "/ingest": settings.ingest_rate_limit_per_hour,
-            "/search": settings.search_rate_limit_per_hour,
-        }
+        client = scope.get("client")
+        result = await rate_limiter.acquire(rule, client[0] if client else "unknown")
+        if result is None:
+            # If Redis fails, allow request (fail open)
+            await self.app(scope, receive, send)
+            return
+        
+        if not result.allowed:
+            await rate_limited_response(result)(scope, receive, send)
+            return
         
-        # Check if endpoint needs rate limiting
-        path = request.url.path
-        limit = None
-        for endpoint, endpoint_limit in rate_limits.items():
-            if path.startswith(endpoint):
-                limit = endpoint_limit
-                break
-        
-        if limit:
-            # Check rate limit
-            key = f"ratelimit:{path}:{client_ip}"
-            current_hour = int(time.time() / 3600)
-            key_with_hour = f"{key}:{current_hour}"
-            
-            try:
-                # Increment counter
-                count = await self.redis_client.incr(key_with_hour)
-                
-                # Set expiry on first request
-                if count == 1:
-                    await self.redis_client.expire(key_with_hour, 3600)
-                
-                # Check if limit exceeded
-                if count > limit:
-                    raise HTTPException(
-                        status_code=429,
-                        detail=f"Rate limit exceeded. Maximum {limit} requests per hour."
-                    )
-            except HTTPException:
-                raise
-            except Exception:
-                # If Redis fails, allow request (fail open)
-                pass
-        
-        response = await call_next(request)
-        return response
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in result.headers().items()
+        ]
+        
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *headers]}
+            await send(message)
+        
+        await self.app(scope, receive, send_with_headers)
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
@@ -10,6 +10,8 @@ from uuid import UUID
 Platform = Literal["youtube", "instagram", "tiktok", "facebook"]
 VideoStatus = Literal["queued", "processing", "done", "failed"]
 PipelineStage = Literal["download", "upload", "transcribe", "notes", "embeddings", "previews"]
+ChunkingMode = Literal["time", "sentence"]
+FusionMode = Literal["rrf", "weighted"]
 
 
 # Request Models
@@ -24,6 +26,14 @@ class SearchRequest(BaseModel):
     top_k: int = Field(20, ge=1, le=100, description="Number of results to return")
     tags: list[str] | None = Field(None, description="Filter by tags")
     platform: Platform | None = Field(None, description="Filter by platform")
+    fusion: FusionMode | None = Field(None, description="Rank fusion mode (default from settings)")
+    vector_weight: float | None = Field(None, ge=0, le=10, description="Weight of vector results in fusion")
+    text_weight: float | None = Field(None, ge=0, le=10, description="Weight of full-text results in fusion")
+
+
+class SearchBatchRequest(BaseModel):
+    """Request to run several searches at once."""
+    queries: list[SearchRequest] = Field(..., min_length=1, max_length=50, description="Searches to run")
 
 
 class UpdateTagsRequest(BaseModel):
@@ -36,6 +46,38 @@ class CreateCollectionRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Collection name")
 
 
+class RechunkRequest(BaseModel):
+    """Request to re-chunk stored transcripts with a new chunker configuration."""
+    video_ids: list[str] | None = Field(None, description="Videos to re-chunk (default: all done videos)")
+    chunk_duration_ms: int = Field(12500, ge=1000, le=120000, description="Target chunk duration in milliseconds")
+    overlap_ms: int = Field(1500, ge=0, le=30000, description="Overlap between chunks in milliseconds")
+    mode: ChunkingMode = Field("time", description="Cut on fixed time windows or at sentence/pause boundaries")
+    min_chunk_ms: int = Field(6000, ge=1000, le=120000, description="Minimum chunk duration (sentence mode)")
+    target_chunk_ms: int = Field(15000, ge=1000, le=120000, description="Duration up to which sentences are merged (sentence mode)")
+    max_chunk_ms: int = Field(20000, ge=1000, le=120000, description="Maximum chunk duration (sentence mode)")
+    pause_ms: int = Field(700, ge=100, le=10000, description="Inter-word gap treated as a boundary (sentence mode)")
+    batch_size: int = Field(25, ge=1, le=500, description="Videos per queued job")
+
+
+class ReembedRequest(BaseModel):
+    """Request to migrate chunk embeddings to a new model."""
+    model_id: str = Field(..., description='Target model, "gemini/text-embedding-004" or "local/<sentence-transformers model>"')
+    dimension: int = Field(768, ge=1, le=16000, description="Dimension of the target model's vectors")
+    batch_size: int = Field(64, ge=1, le=1000, description="Chunks per embedding batch")
+
+
+class VectorIndexRequest(BaseModel):
+    """Request to build the in-process vector index."""
+    nlist: int | None = Field(None, ge=0, description="Inverted lists (default from settings, 0 for sqrt of the chunk count)")
+    nprobe_check: int | None = Field(None, ge=1, description="Report recall@10 at this nprobe after the build")
+
+
+class AutoCollectionsRequest(BaseModel):
+    """Request to re-cluster videos into suggested collections."""
+    clusters: int | None = Field(None, ge=0, description="Number of clusters (default from settings, 0 for sqrt of half the video count)")
+    min_size: int | None = Field(None, ge=1, description="Smallest cluster kept as a collection (default from settings)")
+
+
 # Response Models
 class IngestResponse(BaseModel):
     """Response from ingesting a video."""
@@ -51,6 +93,36 @@ class JobStatusResponse(BaseModel):
     current_stage: PipelineStage | None = None
 
 
+class RechunkResponse(BaseModel):
+    """Response from starting a re-chunk run."""
+    job_ids: list[str]
+    total_videos: int
+
+
+class ReembedResponse(BaseModel):
+    """Response from starting an embedding model migration."""
+    job_id: str
+    model_id: str
+
+
+class VectorIndexResponse(BaseModel):
+    """Response from starting a vector index build."""
+    job_id: str
+
+
+class AutoCollectionsResponse(BaseModel):
+    """Response from starting a clustering job."""
+    job_id: str
+
+
+class AdminJobResponse(BaseModel):
+    """Status and progress of an admin background job."""
+    id: str
+    status: str
+    progress: dict | None = None
+    error: str | None = None
+
+
 class VideoDetails(BaseModel):
     """Video metadata."""
     id: str
@@ -112,11 +184,52 @@ class SearchResponse(BaseModel):
     query_time_ms: float
 
 
+class SearchBatchItem(BaseModel):
+    """Results of one search in a batch."""
+    results: list[SearchResult]
+    total: int
+
+
+class SearchBatchResponse(BaseModel):
+    """Response from a batch of searches."""
+    searches: list[SearchBatchItem]
+    query_time_ms: float
+
+
+class SuggestionModel(BaseModel):
+    """Search-as-you-type suggestion."""
+    text: str
+    kind: Literal["title", "keyword", "chapter", "entity"]
+    video_count: int
+
+
+class SuggestResponse(BaseModel):
+    """Response for suggestions."""
+    prefix: str
+    suggestions: list[SuggestionModel]
+
+
+class RelatedVideo(BaseModel):
+    """Video related to another by content."""
+    video_id: str
+    title: str | None
+    platform: Platform
+    source_url: str
+    score: float
+
+
+class RelatedVideosResponse(BaseModel):
+    """Response for related videos."""
+    video_id: str
+    related: list[RelatedVideo]
+
+
 class JumpResponse(BaseModel):
     """Response for jump/deep link."""
     deep_link: str
     signed_play_url: str
     start_seconds: float
+    play_start_seconds: float  # Seek position within signed_play_url
 
 
 class CollectionDetails(BaseModel):
@@ -125,6 +238,7 @@ class CollectionDetails(BaseModel):
     name: str
     created_at: datetime
     video_count: int | None = None
+    suggested: bool = False
 
 
 class CollectionWithVideos(BaseModel):
@@ -133,6 +247,7 @@ class CollectionWithVideos(BaseModel):
     name: str
     created_at: datetime
     videos: list[VideoDetails]
+    suggested: bool = False
 
 
 class HealthResponse(BaseModel):
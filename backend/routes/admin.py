@@ -0,0 +1,165 @@
+"""Admin maintenance routes."""
+
+from fastapi import APIRouter, HTTPException
+from models import (
+    RechunkRequest, RechunkResponse, ReembedRequest, ReembedResponse,
+    VectorIndexRequest, VectorIndexResponse, AutoCollectionsRequest,
+    AutoCollectionsResponse, AdminJobResponse
+)
+from supabase_client import supabase
+from workers.job_queue import enqueue_job, get_job_status
+from services.embeddings import provider_for_model
+from workers.rechunk import rechunk_videos
+from workers.reembed import reembed_corpus
+from workers.vector_index import build_vector_index
+from workers.auto_collections import build_auto_collections
+
+router = APIRouter()
+
+
+@router.post("/admin/rechunk", response_model=RechunkResponse)
+async def start_rechunk(request: RechunkRequest):
+    """
+    Re-chunk and re-embed stored transcripts without re-transcription.
+
+    Args:
+        request: Videos to process and the new chunker configuration
+
+    Returns:
+        IDs of the queued batch jobs
+    """
+    if not request.min_chunk_ms <= request.target_chunk_ms <= request.max_chunk_ms:
+        raise HTTPException(
+            status_code=400,
+            detail="Chunk durations must satisfy min_chunk_ms <= target_chunk_ms <= max_chunk_ms"
+        )
+
+    video_ids = request.video_ids
+    if video_ids is None:
+        videos = await supabase.select_all(
+            "videos",
+            columns="id",
+            filters={"status": "done"}
+        )
+        video_ids = [video["id"] for video in videos]
+
+    chunker_config = {
+        "chunk_duration_ms": request.chunk_duration_ms,
+        "overlap_ms": request.overlap_ms,
+        "mode": request.mode,
+        "min_chunk_ms": request.min_chunk_ms,
+        "target_chunk_ms": request.target_chunk_ms,
+        "max_chunk_ms": request.max_chunk_ms,
+        "pause_ms": request.pause_ms,
+    }
+
+    # Enqueue one job per batch of videos
+    job_ids = []
+    for i in range(0, len(video_ids), request.batch_size):
+        batch = video_ids[i:i + request.batch_size]
+        job = enqueue_job(rechunk_videos, batch, chunker_config)
+        job_ids.append(job.id)
+
+    return RechunkResponse(job_ids=job_ids, total_videos=len(video_ids))
+
+
+@router.post("/admin/reembed", response_model=ReembedResponse)
+async def start_reembed(request: ReembedRequest):
+    """
+    Re-embed all chunks with a new model and cut search over when done.
+
+    Search keeps serving the current model's vectors until every chunk has
+    a vector from the new model.
+
+    Args:
+        request: Target model and batch size
+
+    Returns:
+        ID of the queued job
+    """
+    try:
+        provider_for_model(request.model_id, request.dimension)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # A full corpus pass can outlast the default 30-minute job timeout
+    job = enqueue_job(
+        reembed_corpus,
+        request.model_id,
+        request.dimension,
+        request.batch_size,
+        job_timeout=6 * 3600
+    )
+
+    return ReembedResponse(job_id=job.id, model_id=request.model_id)
+
+
+@router.post("/admin/vector-index", response_model=VectorIndexResponse)
+async def start_vector_index_build(request: VectorIndexRequest):
+    """
+    Build the in-process vector index from the active model's vectors.
+
+    API processes load the new build on their next refresh.
+
+    Args:
+        request: Index parameters
+
+    Returns:
+        ID of the queued job
+    """
+    job = enqueue_job(
+        build_vector_index,
+        request.nlist,
+        request.nprobe_check,
+        job_timeout=2 * 3600
+    )
+
+    return VectorIndexResponse(job_id=job.id)
+
+
+@router.post("/admin/auto-collections", response_model=AutoCollectionsResponse)
+async def start_auto_collections(request: AutoCollectionsRequest):
+    """
+    Re-cluster the library into suggested collections.
+
+    Replaces the current suggested collections; manual and accepted ones
+    are kept. Videos finished later join the nearest cluster on their own.
+
+    Args:
+        request: Clustering parameters
+
+    Returns:
+        ID of the queued job
+    """
+    job = enqueue_job(
+        build_auto_collections,
+        request.clusters,
+        request.min_size,
+        job_timeout=3600
+    )
+
+    return AutoCollectionsResponse(job_id=job.id)
+
+
+@router.get("/admin/jobs/{job_id}", response_model=AdminJobResponse)
+async def get_admin_job(job_id: str):
+    """
+    Get status and progress of an admin job.
+
+    Args:
+        job_id: RQ job ID
+
+    Returns:
+        Job status with progress counters
+    """
+    status = get_job_status(job_id)
+
+    if status["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return AdminJobResponse(
+        id=status["id"],
+        status=getattr(status["status"], "value", status["status"]),
+        progress=(status.get("meta") or {}).get("progress"),
+        error=status.get("exc_info"),
+    )
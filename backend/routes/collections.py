@@ -110,7 +110,7 @@ async def list_collections():
     Returns:
         List of collections
     """
-    collections = await supabase.select("collections", columns="*")
+    collections = await supabase.select("collections", columns="id,name,created_at,suggested")
     
     # Get video counts
     result = []
@@ -126,6 +126,7 @@ async def list_collections():
             name=collection["name"],
             created_at=collection["created_at"],
             video_count=len(items),
+            suggested=collection.get("suggested", False),
         ))
     
     return result
@@ -145,7 +146,7 @@ async def get_collection(collection_id: str):
     # Get collection
     collection = await supabase.select(
         "collections",
-        columns="*",
+        columns="id,name,created_at,suggested",
         filters={"id": collection_id},
         limit=1
     )
@@ -187,4 +188,45 @@ async def get_collection(collection_id: str):
         name=collection_data["name"],
         created_at=collection_data["created_at"],
         videos=videos,
+        suggested=collection_data.get("suggested", False),
+    )
+
+
+@router.post("/collections/{collection_id}/accept", response_model=CollectionDetails)
+async def accept_collection(collection_id: str):
+    """
+    Keep a suggested collection as a regular collection.
+    
+    Accepted collections survive re-clustering and no longer receive
+    videos automatically.
+    
+    Args:
+        collection_id: Collection ID
+    
+    Returns:
+        Accepted collection details
+    """
+    collection = await supabase.select(
+        "collections",
+        columns="id,suggested",
+        filters={"id": collection_id},
+        limit=1
+    )
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if not collection[0].get("suggested"):
+        raise HTTPException(status_code=400, detail="Collection is not a suggestion")
+    
+    updated = await supabase.update(
+        "collections",
+        {"suggested": False},
+        {"id": collection_id}
+    )
+    accepted = updated[0]
+    
+    return CollectionDetails(
+        id=accepted["id"],
+        name=accepted["name"],
+        created_at=accepted["created_at"],
+        suggested=False,
     )
@@ -1,9 +1,19 @@
 """Item/video detail routes."""
 
-from fastapi import APIRouter, HTTPException
-from models import ItemResponse, VideoDetails, NotesDetails, TranscriptChunk
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+from models import (
+    ItemResponse,
+    VideoDetails,
+    NotesDetails,
+    TranscriptChunk,
+    RelatedVideo,
+    RelatedVideosResponse,
+)
 from supabase_client import supabase
 from storage import storage_service
+from services.related_videos import related_video_index
 
 router = APIRouter()
 
@@ -96,3 +106,60 @@ async def get_item(video_id: str):
         transcript_preview=transcript_preview,
         status=video_data["status"],
     )
+
+
+@router.get("/item/{video_id}/related", response_model=RelatedVideosResponse)
+async def get_related(
+    video_id: str,
+    limit: int = Query(10, ge=1, le=50, description="Maximum related videos")
+):
+    """
+    Get videos related to a video by content.
+    
+    Ranks videos by similarity of their centroid embeddings, served from
+    the in-memory related video index.
+    
+    Args:
+        video_id: Video ID
+        limit: Maximum related videos
+    
+    Returns:
+        Related videos, most similar first
+    """
+    video = await supabase.select(
+        "videos",
+        columns="id",
+        filters={"id": video_id},
+        limit=1
+    )
+    
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    # Videos still processing have no centroid yet
+    related = await related_video_index.lookup(video_id, limit) or []
+    
+    rows = await asyncio.gather(*(
+        supabase.select(
+            "videos",
+            columns="id,title,platform,source_url",
+            filters={"id": related_id},
+            limit=1
+        )
+        for related_id, _ in related
+    ))
+    
+    return RelatedVideosResponse(
+        video_id=video_id,
+        related=[
+            RelatedVideo(
+                video_id=related_id,
+                title=row[0].get("title"),
+                platform=row[0]["platform"],
+                source_url=row[0]["source_url"],
+                score=round(score, 4),
+            )
+            for (related_id, score), row in zip(related, rows)
+            if row
+        ],
+    )
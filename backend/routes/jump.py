@@ -23,7 +23,7 @@ async def generate_jump_link(video_id: str, start_ms: int):
     # Get video
     video = await supabase.select(
         "videos",
-        columns="source_url,platform,storage_path",
+        columns="source_url,platform,storage_path,media_offset_ms",
         filters={"id": video_id},
         limit=1
     )
@@ -58,4 +58,5 @@ async def generate_jump_link(video_id: str, start_ms: int):
         deep_link=deep_link,
         signed_play_url=signed_play_url,
         start_seconds=start_seconds,
+        play_start_seconds=max(0, start_ms - (video_data.get("media_offset_ms") or 0)) / 1000,
     )
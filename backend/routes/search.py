@@ -1,9 +1,15 @@
 """Search routes."""
 
+import json
 import time
-from fastapi import APIRouter
-from models import SearchRequest, SearchResponse, SearchResult as SearchResultModel
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from models import (
+    SearchRequest, SearchResponse, SearchResult as SearchResultModel,
+    SearchBatchRequest, SearchBatchResponse, SearchBatchItem
+)
 from services.search_service import search_service
+from middleware.rate_limit import rate_limiter, client_id, rate_limited_response
 
 router = APIRouter()
 
@@ -27,26 +33,13 @@ async def search_videos(request: SearchRequest):
         top_k=request.top_k,
         tags=request.tags,
         platform=request.platform,
+        fusion=request.fusion,
+        vector_weight=request.vector_weight,
+        text_weight=request.text_weight,
     )
     
     # Convert to response models
-    result_models = [
-        SearchResultModel(
-            video_id=r.video_id,
-            title=r.title,
-            platform=r.platform,
-            start_ms=r.start_ms,
-            end_ms=r.end_ms,
-            snippet=r.snippet,
-            score=r.score,
-            tags=r.tags,
-            chapter_title=r.chapter_title,
-            source_url=r.source_url,
-            deep_link=r.deep_link,
-            preview_url=r.preview_url,
-        )
-        for r in results
-    ]
+    result_models = [_result_model(r) for r in results]
     
     query_time_ms = (time.time() - start_time) * 1000
     
@@ -55,3 +48,126 @@ async def search_videos(request: SearchRequest):
         total=len(result_models),
         query_time_ms=query_time_ms,
     )
+
+
+@router.post("/search/batch", response_model=SearchBatchResponse)
+async def search_videos_batch(request: SearchBatchRequest, http_request: Request):
+    """
+    Run several searches in one request.
+    
+    Queries are embedded together, retrieved with one vector and one
+    full-text call, and their result videos are decorated once. Each query
+    counts against the search rate limit, so a batch may hold at most the
+    search burst of queries.
+    
+    Args:
+        request: Searches with queries and filters
+        http_request: Incoming request, used to identify the client
+    
+    Returns:
+        Results per search, in request order
+    """
+    start_time = time.time()
+    
+    max_queries = rate_limiter.max_cost(http_request.url.path)
+    if max_queries and len(request.queries) > max_queries:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {max_queries} queries per batch"
+        )
+    
+    # The middleware charged the first query
+    limited = await rate_limiter.charge_path(
+        http_request.url.path,
+        client_id(http_request),
+        len(request.queries) - 1
+    )
+    if limited and not limited.allowed:
+        return rate_limited_response(limited)
+    
+    results = await search_service.batch_search([
+        {
+            "query": search.q,
+            "top_k": search.top_k,
+            "tags": search.tags,
+            "platform": search.platform,
+            "fusion": search.fusion,
+            "vector_weight": search.vector_weight,
+            "text_weight": search.text_weight,
+        }
+        for search in request.queries
+    ])
+    
+    searches = [
+        SearchBatchItem(
+            results=[_result_model(r) for r in search_results],
+            total=len(search_results),
+        )
+        for search_results in results
+    ]
+    
+    return SearchBatchResponse(
+        searches=searches,
+        query_time_ms=(time.time() - start_time) * 1000,
+    )
+
+
+@router.post("/search/stream")
+async def search_videos_stream(request: SearchRequest, http_request: Request):
+    """
+    Search videos, streaming results as each stage completes.
+    
+    Emits keyword hits first, then fused results, then each decorated result
+    as its metadata resolves. Responds with Server-Sent Events when the client
+    accepts text/event-stream, and NDJSON otherwise.
+    
+    Args:
+        request: Search request with query and filters
+        http_request: Incoming request, used for content negotiation
+    
+    Returns:
+        Streaming response of search events
+    """
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    start_time = time.time()
+    
+    async def stream():
+        async for event in search_service.hybrid_search_stream(
+            query=request.q,
+            top_k=request.top_k,
+            tags=request.tags,
+            platform=request.platform,
+            fusion=request.fusion,
+            vector_weight=request.vector_weight,
+            text_weight=request.text_weight,
+        ):
+            event["elapsed_ms"] = (time.time() - start_time) * 1000
+            
+            if use_sse:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            else:
+                yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _result_model(r) -> SearchResultModel:
+    """Convert a search service result to its response model."""
+    return SearchResultModel(
+        video_id=r.video_id,
+        title=r.title,
+        platform=r.platform,
+        start_ms=r.start_ms,
+        end_ms=r.end_ms,
+        snippet=r.snippet,
+        score=r.score,
+        tags=r.tags,
+        chapter_title=r.chapter_title,
+        source_url=r.source_url,
+        deep_link=r.deep_link,
+        preview_url=r.preview_url,
+    )
@@ -0,0 +1,36 @@
+"""Search-as-you-type suggestion routes."""
+
+from fastapi import APIRouter, Query
+from models import SuggestResponse, SuggestionModel
+from services.suggest_index import suggest_index
+
+router = APIRouter()
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest(
+    prefix: str = Query(..., max_length=200),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Suggest completions for a partially typed query.
+    
+    Served entirely from the in-memory prefix index over titles, keywords,
+    chapter titles and entities.
+    
+    Args:
+        prefix: Typed text
+        limit: Maximum suggestions
+    
+    Returns:
+        Suggestions ranked by the number of videos they appear in
+    """
+    suggestions = suggest_index.lookup(prefix, limit=limit)
+    
+    return SuggestResponse(
+        prefix=prefix,
+        suggestions=[
+            SuggestionModel(text=s.text, kind=s.kind, video_count=s.video_count)
+            for s in suggestions
+        ],
+    )
@@ -3,6 +3,8 @@
 from fastapi import APIRouter, HTTPException
 from models import UpdateTagsRequest
 from supabase_client import supabase
+from services.search_cache import bump_corpus_version
+from services.suggest_index import suggest_index
 
 router = APIRouter()
 
@@ -36,4 +38,13 @@ async def update_tags(video_id: str, request: UpdateTagsRequest):
         {"video_id": video_id}
     )
     
+    # Tags are search filters and result fields; drop cached search results
+    await bump_corpus_version()
+    
+    # Reflect the new tags in this replica's suggestions right away
+    try:
+        await suggest_index.refresh_video(video_id)
+    except Exception:
+        pass
+    
     return {"message": "Tags updated successfully"}
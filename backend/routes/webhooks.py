@@ -0,0 +1,62 @@
+"""Webhook routes for asynchronous provider callbacks."""
+
+from fastapi import APIRouter, HTTPException, Request
+from supabase_client import supabase
+from services.transcription import transcription_service
+from workers.job_queue import enqueue_job
+from workers.pipeline import resume_video
+
+router = APIRouter()
+
+
+@router.post("/webhooks/deepgram")
+async def deepgram_callback(request: Request, video_id: str, token: str):
+    """
+    Receive a Deepgram callback result and resume the video pipeline.
+    
+    Deepgram may deliver a callback more than once, so results for videos
+    that are no longer waiting on transcription are acknowledged and ignored.
+    
+    Args:
+        request: Callback request carrying the Deepgram result body
+        video_id: Video ID from the signed callback URL
+        token: HMAC token from the signed callback URL
+    
+    Returns:
+        Acknowledgement
+    """
+    if not transcription_service.verify_callback_token(video_id, token):
+        raise HTTPException(status_code=403, detail="Invalid callback token")
+    
+    video = await supabase.select(
+        "videos",
+        columns="id,status,current_stage",
+        filters={"id": video_id},
+        limit=1
+    )
+    
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    video_data = video[0]
+    if video_data["status"] != "processing" or video_data.get("current_stage") != "transcribe":
+        return {"status": "ignored"}
+    
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid callback body")
+    
+    # Claim the result before enqueueing; the update only matches while the
+    # video is still parked, so of concurrent redeliveries only one wins
+    claimed = await supabase.update(
+        "videos",
+        {"current_stage": "notes"},
+        {"id": video_id, "status": "processing", "current_stage": "transcribe"}
+    )
+    if not claimed:
+        return {"status": "ignored"}
+    
+    enqueue_job(resume_video, video_id, payload)
+    
+    return {"status": "accepted"}
@@ -1,10 +1,18 @@
 """AI service using Google Gemini API."""
 
 import asyncio
+import hashlib
 import json
 import httpx
+from collections import Counter
 from dataclasses import dataclass
 from config import settings
+from supabase_client import supabase
+from services.transcription import TranscriptWords
+from services.embeddings import get_active_embedding_provider
+
+# Bump when the notes prompts change so cached notes are regenerated
+NOTES_PROMPT_VERSION = "1"
 
 
 @dataclass
@@ -20,6 +28,7 @@ class NotesResult:
     entities: dict | None = None
     raw_text: str | None = None
     error_message: str | None = None
+    degraded: bool = False  # Best-effort result, e.g. a window failed; never cached
 
 
 class AIService:
@@ -28,19 +37,24 @@ class AIService:
     def __init__(self):
         self.api_key = settings.gemini_api_key
         self.generation_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
-        self.embedding_url = "https://generativelanguage.googleapis.com/v1beta/models/text-embedding-004:embedContent"
     
     async def generate_notes(
         self,
         transcript: str,
-        duration_seconds: int
+        duration_seconds: int,
+        words: TranscriptWords | None = None
     ) -> NotesResult:
         """
         Generate structured notes from transcript.
         
+        Transcripts longer than the single-request limit are summarized
+        hierarchically when word timings are provided: windows of
+        timestamped lines are summarized concurrently, then merged.
+        
         Args:
             transcript: Full transcript text
             duration_seconds: Video duration in seconds
+            words: Transcript word timings (enables map-reduce mode)
         
         Returns:
             NotesResult with structured notes
@@ -48,15 +62,83 @@ class AIService:
         # Build prompt
         include_chapters = duration_seconds >= 300  # 5 minutes
         
-        system_prompt = self._build_notes_prompt(include_chapters)
+        map_reduce = bool(words) and len(transcript) > settings.notes_max_chars
+        
+        # Identical content never pays for generation twice
+        cache_key = self._notes_cache_key(transcript, include_chapters, map_reduce)
+        cached = await self._get_cached_notes(cache_key)
+        if cached:
+            return cached
+        
+        if map_reduce:
+            result = await self._generate_notes_map_reduce(words, include_chapters)
+        else:
+            system_prompt = self._build_notes_prompt(include_chapters)
+            result = await self._generate_notes_with_retry(transcript, system_prompt)
+        
+        # Degraded notes are stored with the video but regenerated next time
+        if result.success and not result.degraded:
+            await self._cache_notes(cache_key, result)
         
-        # Retry logic: 1 retry with clarifier prompt
+        return result
+    
+    @staticmethod
+    def _notes_cache_key(transcript: str, include_chapters: bool, map_reduce: bool = False) -> str:
+        """
+        Hash normalized transcript, prompt version and generation settings.
+        
+        Map-reduce notes depend on how the transcript is windowed, so their
+        key also covers the window and line sizes.
+        """
+        normalized = " ".join(transcript.lower().split())
+        mode = (
+            f"map:{settings.notes_window_chars}:{settings.chunk_duration_ms}:"
+            if map_reduce else ""
+        )
+        key_source = f"{NOTES_PROMPT_VERSION}:{int(include_chapters)}:{mode}{normalized}"
+        return hashlib.sha256(key_source.encode()).hexdigest()
+    
+    async def _get_cached_notes(self, cache_key: str) -> NotesResult | None:
+        """Look up cached notes; cache errors are treated as misses."""
+        try:
+            rows = await supabase.select(
+                "notes_cache",
+                columns="result",
+                filters={"cache_key": cache_key},
+                limit=1
+            )
+        except Exception:
+            return None
+        
+        if not rows:
+            return None
+        
+        return NotesResult(success=True, **rows[0]["result"])
+    
+    async def _cache_notes(self, cache_key: str, notes: NotesResult) -> None:
+        """Store notes in the cache (ignore duplicates and cache errors)."""
+        try:
+            await supabase.insert("notes_cache", {
+                "cache_key": cache_key,
+                "result": self._notes_to_dict(notes),
+            })
+        except Exception:
+            pass
+    
+    async def _generate_notes_with_retry(
+        self,
+        transcript: str,
+        system_prompt: str,
+        source_label: str = "Transcript"
+    ) -> NotesResult:
+        """Generate notes with 1 retry using a clarifier prompt."""
         for attempt in range(2):
             try:
                 result = await self._generate_notes_attempt(
                     transcript,
                     system_prompt,
-                    is_retry=attempt > 0
+                    is_retry=attempt > 0,
+                    source_label=source_label
                 )
                 
                 if result.success:
@@ -65,6 +147,8 @@ class AIService:
                 # First attempt failed, retry with clarifier
                 if attempt == 0:
                     await asyncio.sleep(5)
+                else:
+                    return result
             except Exception as e:
                 if attempt == 0:
                     await asyncio.sleep(5)
@@ -76,11 +160,163 @@ class AIService:
         
         return NotesResult(success=False, error_message="Notes generation failed")
     
+    async def _generate_notes_map_reduce(
+        self,
+        words: TranscriptWords,
+        include_chapters: bool
+    ) -> NotesResult:
+        """
+        Generate notes for a long transcript in map-reduce fashion.
+        
+        Args:
+            words: Transcript word timings
+            include_chapters: Whether to generate chapters
+        
+        Returns:
+            NotesResult covering the whole transcript
+        """
+        windows = self._build_notes_windows(
+            words,
+            settings.notes_window_chars,
+            settings.chunk_duration_ms
+        )
+        window_prompt = self._build_notes_prompt(include_chapters)
+        semaphore = asyncio.Semaphore(settings.notes_map_concurrency)
+        
+        async def summarize_window(index: int, window: str) -> NotesResult:
+            async with semaphore:
+                header = (
+                    f"Section {index + 1} of {len(windows)} of a longer video. "
+                    "Bracketed numbers are start times in milliseconds from the "
+                    "start of the video; use them for start_ms values.\n\n"
+                )
+                return await self._generate_notes_with_retry(header + window, window_prompt)
+        
+        results = await asyncio.gather(*(
+            summarize_window(i, window) for i, window in enumerate(windows)
+        ))
+        partials = [r for r in results if r.success]
+        
+        if not partials:
+            return NotesResult(
+                success=False,
+                raw_text="\n\n".join(r.raw_text for r in results if r.raw_text) or None,
+                error_message="Notes generation failed for all transcript windows"
+            )
+        
+        if len(partials) == 1:
+            result = partials[0]
+        else:
+            # Reduce: merge partial notes into the final schema
+            partial_notes = json.dumps([self._notes_to_dict(p) for p in partials])
+            if len(partial_notes) > settings.notes_max_chars:
+                result = self._merge_partial_notes(partials)
+            else:
+                result = await self._generate_notes_with_retry(
+                    partial_notes,
+                    self._build_merge_prompt(include_chapters),
+                    source_label="Partial notes"
+                )
+                
+                if not result.success:
+                    # Fall back to a deterministic merge rather than losing the partials
+                    result = self._merge_partial_notes(partials)
+                    result.degraded = True
+        
+        # Notes missing some windows cover only part of the video
+        if len(partials) < len(windows):
+            result.degraded = True
+        
+        return result
+    
+    @staticmethod
+    def _build_notes_windows(
+        words: TranscriptWords,
+        max_chars: int,
+        line_ms: int
+    ) -> list[str]:
+        """
+        Pack timestamped lines into windows of at most max_chars.
+        
+        Lines are consecutive runs of about line_ms of words, split without
+        overlap so no passage is summarized twice (search chunks overlap).
+        """
+        lines = []
+        first = 0
+        for i in range(len(words)):
+            if i == len(words) - 1 or words.ends[i] - words.starts[first] >= line_ms:
+                lines.append(f"[{words.starts[first]}] {words.span_text(first, i)}")
+                first = i + 1
+        
+        windows = []
+        window_lines = []
+        size = 0
+        
+        for line in lines:
+            if window_lines and size + len(line) + 1 > max_chars:
+                windows.append("\n".join(window_lines))
+                window_lines = []
+                size = 0
+            window_lines.append(line)
+            size += len(line) + 1
+        
+        if window_lines:
+            windows.append("\n".join(window_lines))
+        
+        return windows
+    
+    @staticmethod
+    def _notes_to_dict(notes: NotesResult) -> dict:
+        """Convert notes to the JSON schema used in prompts."""
+        return {
+            "summary": notes.summary,
+            "keywords": notes.keywords or [],
+            "chapters": notes.chapters or [],
+            "insights": notes.insights or [],
+            "steps": notes.steps or [],
+            "quotes": notes.quotes or [],
+            "entities": notes.entities or {},
+        }
+    
+    @staticmethod
+    def _merge_partial_notes(partials: list[NotesResult]) -> NotesResult:
+        """Merge partial notes without an API call."""
+        keyword_counts = Counter(
+            keyword.lower()
+            for p in partials
+            for keyword in (p.keywords or [])
+        )
+        
+        entities = {}
+        for p in partials:
+            for key, values in (p.entities or {}).items():
+                merged_values = entities.setdefault(key, [])
+                for value in values or []:
+                    if value not in merged_values:
+                        merged_values.append(value)
+        
+        insights = []
+        for p in partials:
+            for insight in p.insights or []:
+                if insight not in insights:
+                    insights.append(insight)
+        
+        return NotesResult(
+            success=True,
+            summary="\n".join(p.summary for p in partials if p.summary),
+            keywords=[keyword for keyword, _ in keyword_counts.most_common(12)],
+            chapters=[c for p in partials for c in (p.chapters or [])],
+            insights=insights,
+            steps=[s for p in partials for s in (p.steps or [])],
+            quotes=[q for p in partials for q in (p.quotes or [])],
+            entities=entities,
+        )
+    
     def _build_notes_prompt(self, include_chapters: bool) -> str:
         """Build system prompt for notes generation."""
         chapters_field = """
   "chapters": [{"title": "string", "start_ms": number}],""" if include_chapters else ""
-        
+  
         return f"""Extract structured information from this video transcript.
 Return ONLY valid JSON with this exact schema:
 {{
@@ -102,21 +338,32 @@ Rules:
 {"- chapters: Major sections with titles and start times (only for videos >= 5 minutes)" if include_chapters else ""}
 
 Return ONLY the JSON object, no markdown formatting."""
+
+    def _build_merge_prompt(self, include_chapters: bool) -> str:
+        """Build system prompt for merging partial notes of one video."""
+        return (
+            "The input is a JSON list of partial notes for consecutive sections "
+            "of one video, in order. Merge them into notes for the whole video: "
+            "deduplicate keywords, insights and entities, keep steps in order, "
+            "and keep chapter and quote start_ms values unchanged.\n\n"
+            + self._build_notes_prompt(include_chapters)
+        )
     
     async def _generate_notes_attempt(
         self,
         transcript: str,
         system_prompt: str,
-        is_retry: bool = False
+        is_retry: bool = False,
+        source_label: str = "Transcript"
     ) -> NotesResult:
         """Single notes generation attempt."""
         # Truncate transcript if too long (Gemini has token limits)
-        max_chars = 30000
+        max_chars = settings.notes_max_chars
         truncated_transcript = transcript[:max_chars]
         if len(transcript) > max_chars:
             truncated_transcript += "\n\n[Transcript truncated...]"
         
-        user_message = f"Transcript:\n\n{truncated_transcript}"
+        user_message = f"{source_label}:\n\n{truncated_transcript}"
         
         if is_retry:
             user_message += "\n\nIMPORTANT: Return ONLY valid JSON, no markdown code blocks."
@@ -196,7 +443,7 @@ Return ONLY the JSON object, no markdown formatting."""
     
     async def generate_embedding(self, text: str) -> list[float] | None:
         """
-        Generate embedding for text.
+        Generate embedding for text with the active embedding model.
         
         Args:
             text: Text to embed
@@ -204,53 +451,29 @@ Return ONLY the JSON object, no markdown formatting."""
         Returns:
             Embedding vector or None if failed
         """
-        payload = {
-            "model": "models/text-embedding-004",
-            "content": {
-                "parts": [{"text": text}]
-            }
-        }
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.embedding_url}?key={self.api_key}",
-                    json=payload,
-                )
-                
-                if response.status_code != 200:
-                    return None
-                
-                data = response.json()
-                embedding = data.get("embedding", {}).get("values", [])
-                return embedding if embedding else None
-        except Exception:
-            return None
+        provider = await get_active_embedding_provider()
+        return await provider.embed(text)
     
-    async def batch_embeddings(
-        self,
-        texts: list[str],
-        rate_limit_delay: float = 1.0
-    ) -> list[list[float] | None]:
+    async def batch_embeddings(self, texts: list[str]) -> list[list[float] | None]:
         """
-        Generate embeddings for multiple texts with rate limiting.
+        Generate embeddings for multiple texts in provider batches.
         
         Args:
             texts: List of texts to embed
-            rate_limit_delay: Delay between requests in seconds
         
         Returns:
             List of embedding vectors (None for failed embeddings)
         """
+        provider = await get_active_embedding_provider()
         embeddings = []
+        batch_size = settings.embedding_batch_size
         
-        for i, text in enumerate(texts):
-            embedding = await self.generate_embedding(text)
-            embeddings.append(embedding)
+        for i in range(0, len(texts), batch_size):
+            embeddings.extend(await provider.embed_batch(texts[i:i + batch_size]))
             
-            # Rate limiting: wait between requests (except last one)
-            if i < len(texts) - 1:
-                await asyncio.sleep(rate_limit_delay)
+            # Rate limiting: wait between batches (except last one)
+            if provider.rate_limit_delay and i + batch_size < len(texts):
+                await asyncio.sleep(provider.rate_limit_delay)
         
         return embeddings
 
@@ -0,0 +1,209 @@
+"""Audio fingerprinting service for content-level deduplication."""
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+from supabase_client import supabase
+
+# Decoding and spectrogram parameters
+SAMPLE_RATE = 8000
+FRAME_SIZE = 1024
+HOP_SIZE = 256  # 32 ms per frame
+FREQ_BINS = 512  # 9 bits per frequency in the landmark hash
+
+# Peak picking and landmark pairing parameters
+PEAK_NEIGHBORHOOD_FREQ = 41
+PEAK_NEIGHBORHOOD_TIME = 31
+MAX_PEAKS_PER_FRAME = 2
+FANOUT = 5
+MAX_DELTA_FRAMES = 63  # 6 bits per time delta in the landmark hash
+
+
+@dataclass
+class FingerprintMatch:
+    """An existing video whose audio matches the fingerprint."""
+    video_id: str
+    score: int
+    offset_ms: int
+    duration_seconds: int
+
+
+class AudioFingerprinter:
+    """Service for landmark-based audio fingerprinting using ffmpeg and NumPy."""
+    
+    async def fingerprint(self, file_path: Path) -> list[tuple[int, int]]:
+        """
+        Compute landmark hashes for a media file.
+        
+        Args:
+            file_path: Path to media file
+        
+        Returns:
+            List of (hash, frame_offset) pairs, empty if decoding fails
+        """
+        samples = await self._decode_pcm(file_path)
+        if samples is None or len(samples) < FRAME_SIZE:
+            return []
+        
+        # Spectrogram and peak picking are CPU-bound
+        return await asyncio.to_thread(self._landmarks, samples)
+    
+    async def find_match(
+        self,
+        landmarks: list[tuple[int, int]],
+        duration_seconds: int | None
+    ) -> FingerprintMatch | None:
+        """
+        Find a processed video with the same audio.
+        
+        A match needs enough landmark hashes agreeing on a single time offset,
+        relative to both fingerprints, and a duration close to the new
+        video's. A clip cut from a longer video matches its landmarks but not
+        its duration, so it is processed on its own rather than linked to
+        content it does not contain.
+        
+        Args:
+            landmarks: Landmark hashes from fingerprint()
+            duration_seconds: Duration of the new video
+        
+        Returns:
+            Best match or None
+        """
+        if not landmarks or not duration_seconds:
+            return None
+        
+        try:
+            rows = await supabase.rpc("match_audio_fingerprint", {
+                "p_hashes": [h for h, _ in landmarks],
+                "p_offsets": [offset for _, offset in landmarks],
+            })
+        except Exception:
+            # Lookup errors only cost deduplication, not the ingest
+            return None
+        
+        if not rows:
+            return None
+        
+        best = rows[0]
+        min_score = max(
+            settings.fingerprint_min_matches,
+            int(max(len(landmarks), best["source_landmarks"]) * settings.fingerprint_min_match_ratio)
+        )
+        if best["score"] < min_score:
+            return None
+        
+        source_duration = best.get("duration_seconds")
+        if (
+            not source_duration
+            or abs(source_duration - duration_seconds) > settings.fingerprint_max_duration_diff_seconds
+        ):
+            return None
+        
+        return FingerprintMatch(
+            video_id=best["video_id"],
+            score=best["score"],
+            offset_ms=best["delta_frames"] * HOP_SIZE * 1000 // SAMPLE_RATE,
+            duration_seconds=source_duration,
+        )
+    
+    async def store(self, video_id: str, landmarks: list[tuple[int, int]]) -> None:
+        """
+        Store landmark hashes for a processed video.
+        
+        Args:
+            video_id: Video ID
+            landmarks: Landmark hashes from fingerprint()
+        """
+        batch_size = 1000
+        for i in range(0, len(landmarks), batch_size):
+            await supabase.insert("audio_fingerprints", [
+                {"video_id": video_id, "hash": h, "offset_frames": offset}
+                for h, offset in landmarks[i:i + batch_size]
+            ])
+    
+    @staticmethod
+    async def _decode_pcm(file_path: Path) -> np.ndarray | None:
+        """Decode the start of a media file to mono 8 kHz float PCM."""
+        cmd = [
+            "ffmpeg",
+            "-v", "quiet",
+            "-i", str(file_path),
+            "-t", str(settings.fingerprint_max_seconds),
+            "-ac", "1",
+            "-ar", str(SAMPLE_RATE),
+            "-f", "s16le",
+            "-",
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            
+            stdout, _ = await process.communicate()
+            
+            if process.returncode != 0:
+                return None
+            
+            return np.frombuffer(stdout, dtype=np.int16).astype(np.float32) / 32768.0
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _landmarks(samples: np.ndarray) -> list[tuple[int, int]]:
+        """Compute (hash, frame_offset) landmarks from PCM samples."""
+        # Log-magnitude spectrogram
+        frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE]
+        spectrum = np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE), axis=1))[:, :FREQ_BINS]
+        spectrogram = np.log1p(spectrum * 1000.0)
+        
+        # Local maxima over a time/frequency neighborhood (separable max filter)
+        padded = np.pad(
+            spectrogram,
+            ((PEAK_NEIGHBORHOOD_TIME // 2,) * 2, (PEAK_NEIGHBORHOOD_FREQ // 2,) * 2),
+            constant_values=-np.inf,
+        )
+        local_max = np.lib.stride_tricks.sliding_window_view(
+            padded, PEAK_NEIGHBORHOOD_FREQ, axis=1
+        ).max(axis=-1)
+        local_max = np.lib.stride_tricks.sliding_window_view(
+            local_max, PEAK_NEIGHBORHOOD_TIME, axis=0
+        ).max(axis=-1)
+        
+        is_peak = (spectrogram == local_max) & (spectrogram > spectrogram.mean() + spectrogram.std())
+        
+        # Keep the strongest peaks per frame
+        peaks = []
+        for t in range(spectrogram.shape[0]):
+            freqs = np.flatnonzero(is_peak[t])
+            if len(freqs) > MAX_PEAKS_PER_FRAME:
+                freqs = freqs[np.argsort(spectrogram[t, freqs])[-MAX_PEAKS_PER_FRAME:]]
+            peaks.extend((t, int(f)) for f in freqs)
+        
+        # Pair each anchor with the next peaks in its target zone
+        landmarks = []
+        for i, (t1, f1) in enumerate(peaks):
+            paired = 0
+            for j in range(i + 1, len(peaks)):
+                t2, f2 = peaks[j]
+                delta = t2 - t1
+                if delta > MAX_DELTA_FRAMES:
+                    break
+                if delta == 0:
+                    continue
+                landmarks.append(((f1 << 15) | (f2 << 6) | delta, t1))
+                paired += 1
+                if paired == FANOUT:
+                    break
+        
+        return landmarks
+
+
+# Global audio fingerprinter instance
+audio_fingerprinter = AudioFingerprinter()
@@ -0,0 +1,181 @@
+"""Audio pre-processing service using ffmpeg."""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import settings
+
+
+@dataclass
+class PreprocessResult:
+    """Result of audio pre-processing."""
+    success: bool
+    file_path: Path | None = None
+    content_type: str = "audio/ogg"
+    leading_trim_ms: int = 0
+    error_message: str | None = None
+
+
+class AudioPreprocessor:
+    """Service for transcoding audio to compact speech-friendly Opus."""
+    
+    @staticmethod
+    async def preprocess(
+        input_file: Path,
+        duration_seconds: int | None = None
+    ) -> PreprocessResult:
+        """
+        Transcode media to mono low-bitrate Opus, optionally trimming silence.
+        
+        Args:
+            input_file: Path to downloaded media file
+            duration_seconds: Media duration, used to detect trailing silence
+        
+        Returns:
+            PreprocessResult with the transcoded file and leading trim offset
+        """
+        output_file = input_file.with_name(f"{input_file.stem}.speech.ogg")
+        
+        leading_trim_seconds = 0.0
+        keep_seconds = None
+        if settings.audio_trim_silence:
+            leading_trim_seconds, keep_seconds = await AudioPreprocessor._detect_silence_trim(
+                input_file,
+                duration_seconds
+            )
+        
+        cmd = ["ffmpeg", "-v", "quiet", "-i", str(input_file)]
+        if leading_trim_seconds:
+            cmd += ["-ss", f"{leading_trim_seconds:.3f}"]
+        if keep_seconds:
+            cmd += ["-t", f"{keep_seconds:.3f}"]
+        cmd += [
+            "-vn",
+            "-ac", "1",
+            "-ar", "16000",
+            "-c:a", "libopus",
+            "-b:a", settings.audio_transcode_bitrate,
+            "-application", "voip",
+            "-y",  # Overwrite output file
+            str(output_file)
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            
+            await process.communicate()
+            
+            if process.returncode != 0 or not output_file.exists():
+                return PreprocessResult(
+                    success=False,
+                    error_message=f"ffmpeg exited with code {process.returncode}"
+                )
+            
+            return PreprocessResult(
+                success=True,
+                file_path=output_file,
+                leading_trim_ms=int(leading_trim_seconds * 1000),
+            )
+        except Exception as e:
+            return PreprocessResult(success=False, error_message=str(e))
+    
+    @staticmethod
+    async def detect_silences(
+        input_file: Path,
+        min_silence_seconds: float | None = None
+    ) -> list[tuple[float, float | None]]:
+        """
+        Detect silent spans with ffmpeg silencedetect.
+        
+        Args:
+            input_file: Path to media file
+            min_silence_seconds: Minimum silence duration (default from settings)
+        
+        Returns:
+            List of (start, end) seconds; end is None for silence running to EOF
+        """
+        if min_silence_seconds is None:
+            min_silence_seconds = settings.silence_min_seconds
+        
+        cmd = [
+            "ffmpeg",
+            "-i", str(input_file),
+            "-vn",
+            "-af", (
+                f"silencedetect=noise={settings.silence_threshold_db}dB"
+                f":d={min_silence_seconds}"
+            ),
+            "-f", "null",
+            "-",
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            
+            _, stderr = await process.communicate()
+            
+            if process.returncode != 0:
+                return []
+        except Exception:
+            return []
+        
+        output = stderr.decode(errors="ignore")
+        starts = [max(0.0, float(v)) for v in re.findall(r"silence_start: (-?[\d.]+)", output)]
+        ends = [float(v) for v in re.findall(r"silence_end: ([\d.]+)", output)]
+        
+        return [
+            (start, ends[i] if i < len(ends) else None)
+            for i, start in enumerate(starts)
+        ]
+    
+    @staticmethod
+    async def _detect_silence_trim(
+        input_file: Path,
+        duration_seconds: int | None
+    ) -> tuple[float, float | None]:
+        """
+        Detect leading and trailing silence.
+        
+        Returns:
+            Seconds of leading silence, and seconds of audio to keep after it
+            (None to keep everything up to the end)
+        """
+        silences = await AudioPreprocessor.detect_silences(input_file)
+        if not silences:
+            return 0.0, None
+        
+        # Leading silence: the first silent span begins at the start of the file
+        leading = 0.0
+        first_start, first_end = silences[0]
+        if first_start <= 0.05 and first_end is not None:
+            leading = first_end
+        
+        # Trailing silence: the last silent span never ends, or ends at EOF
+        trailing_start = None
+        last_start, last_end = silences[-1]
+        if last_end is None:
+            trailing_start = last_start
+        elif duration_seconds and last_end >= duration_seconds - 0.05:
+            trailing_start = last_start
+        
+        if trailing_start is not None:
+            if trailing_start <= leading:
+                # Entirely silent, leave the file as is
+                return 0.0, None
+            return leading, trailing_start - leading
+        
+        return leading, None
+
+
+# Global audio preprocessor instance
+audio_preprocessor = AudioPreprocessor()
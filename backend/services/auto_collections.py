@@ -0,0 +1,112 @@
+"""Clustering of video centroids into suggested collections."""
+
+import math
+from collections import Counter
+
+import numpy as np
+
+from config import settings
+from supabase_client import supabase
+from services.vector_index import IVFIndex
+
+
+def cluster_videos(
+    centroids: np.ndarray,
+    clusters: int,
+    iterations: int,
+    seed: int = 0
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Spherical k-means over normalized video centroids.
+    
+    Args:
+        centroids: (n, d) normalized video centroid matrix
+        clusters: Number of clusters
+        iterations: k-means iterations
+        seed: Random seed for the initial cluster centers
+    
+    Returns:
+        (clusters, d) cluster centers, the cluster of each video and each
+        video's cosine similarity to its cluster center
+    """
+    rng = np.random.default_rng(seed)
+    centers = IVFIndex._train(centroids, clusters, iterations, rng)
+    assignments = IVFIndex._assign(centroids, centers)
+    similarities = np.einsum("ij,ij->i", centroids, centers[assignments])
+    return centers, assignments, similarities
+
+
+def label_clusters(
+    members: list[list[str]],
+    keywords: dict[str, list[str]],
+    terms: int = 3
+) -> list[str | None]:
+    """
+    Name clusters after their most distinctive keywords.
+    
+    Keywords are scored by how many of a cluster's videos carry them,
+    weighted by inverse document frequency across the library so that
+    terms common to every cluster do not dominate.
+    
+    Args:
+        members: Video IDs of each cluster
+        keywords: Note keywords per video ID
+        terms: Keywords per label
+    
+    Returns:
+        Label per cluster, None for clusters without keywords
+    """
+    document_frequency = Counter(
+        keyword
+        for video_keywords in keywords.values()
+        for keyword in set(video_keywords)
+    )
+    total = max(len(keywords), 1)
+    
+    labels = []
+    for video_ids in members:
+        frequency = Counter(
+            keyword
+            for video_id in video_ids
+            for keyword in set(keywords.get(video_id, []))
+        )
+        ranked = sorted(
+            frequency,
+            key=lambda keyword: (
+                -frequency[keyword] * math.log(1 + total / document_frequency[keyword]),
+                keyword,
+            ),
+        )
+        labels.append(", ".join(ranked[:terms]) or None)
+    
+    return labels
+
+
+def normalize_keywords(values: list[str] | None) -> list[str]:
+    """Lowercase, trim and de-duplicate note keywords."""
+    return list(dict.fromkeys(
+        value.strip().lower() for value in values or [] if value and value.strip()
+    ))
+
+
+async def assign_to_suggested_collections(video_ids: list[str]) -> None:
+    """
+    Add videos to the suggested collection with the nearest centroid.
+    
+    Incremental counterpart of the clustering job: new and re-chunked
+    videos join an existing cluster instead of triggering a re-cluster.
+    Videos too far from every cluster stay unassigned. Never raises.
+    
+    Args:
+        video_ids: Videos with up-to-date centroids
+    """
+    if not video_ids:
+        return
+    
+    try:
+        await supabase.rpc("assign_suggested_collections", {
+            "p_video_ids": video_ids,
+            "p_min_similarity": settings.auto_collections_min_similarity,
+        })
+    except Exception as e:
+        print(f"❌ Failed to assign suggested collections: {e}")
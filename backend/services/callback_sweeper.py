@@ -0,0 +1,60 @@
+"""Deadline for videos waiting on a Deepgram callback."""
+
+import asyncio
+
+from config import settings
+from supabase_client import supabase
+
+
+class CallbackSweeper:
+    """
+    Fails videos whose transcription callback is overdue.
+    
+    Runs in every API process; the expiry is a single conditional UPDATE,
+    so concurrent sweeps are harmless.
+    """
+    
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+    
+    async def sweep(self) -> int:
+        """
+        Fail videos parked longer than deepgram_callback_timeout_seconds.
+        
+        Returns:
+            Number of videos failed
+        """
+        expired = await supabase.rpc("expire_transcription_callbacks", {
+            "p_timeout_seconds": settings.deepgram_callback_timeout_seconds,
+        })
+        if expired:
+            print(f"❌ {expired} videos timed out waiting for a transcription callback")
+        return expired or 0
+    
+    async def start(self) -> None:
+        """Start the background sweep loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_loop())
+    
+    async def stop(self) -> None:
+        """Stop the background sweep loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _sweep_loop(self) -> None:
+        """Sweep periodically; errors are retried on the next pass."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"❌ Callback sweep failed: {e}")
+            await asyncio.sleep(settings.deepgram_callback_sweep_seconds)
+
+
+# Global callback sweeper instance
+callback_sweeper = CallbackSweeper()
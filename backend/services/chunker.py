@@ -1,8 +1,16 @@
 """Transcript chunking service."""
 
 import hashlib
+from bisect import bisect_left
 from dataclasses import dataclass
-from services.transcription import WordTimestamp
+from typing import Literal
+from config import settings
+from services.transcription import TranscriptWords, WordTimestamp
+
+ChunkingMode = Literal["time", "sentence"]
+
+# Punctuation that ends a sentence in Deepgram's punctuated words
+SENTENCE_END_CHARS = (".", "?", "!")
 
 
 @dataclass
@@ -14,6 +22,14 @@ class TranscriptChunk:
     text_hash: str
 
 
+def _first_at_least(values: list[int], target: int, lo: int, hi: int) -> int:
+    """Linear counterpart of bisect_left for values that are not sorted."""
+    for i in range(lo, hi):
+        if values[i] >= target:
+            return i
+    return hi
+
+
 class TranscriptChunker:
     """Service for chunking transcripts into time-based segments."""
     
@@ -21,83 +37,161 @@ class TranscriptChunker:
         self,
         chunk_duration_ms: int = 12500,  # 12.5 seconds
         overlap_ms: int = 1500,  # 1.5 seconds
+        mode: ChunkingMode = "time",
+        min_chunk_ms: int = 6000,  # 6 seconds
+        target_chunk_ms: int = 15000,  # 15 seconds
+        max_chunk_ms: int = 20000,  # 20 seconds
+        pause_ms: int = 700,
     ):
         """
         Initialize chunker.
         
         Args:
-            chunk_duration_ms: Target chunk duration in milliseconds
-            overlap_ms: Overlap between chunks in milliseconds
+            chunk_duration_ms: Target chunk duration in milliseconds (time mode)
+            overlap_ms: Overlap between chunks in milliseconds (time mode)
+            mode: "time" for fixed windows, "sentence" for sentence/pause boundaries
+            min_chunk_ms: Minimum chunk duration before cutting (sentence mode)
+            target_chunk_ms: Duration up to which sentences are merged into
+                one chunk (sentence mode)
+            max_chunk_ms: Maximum chunk duration (sentence mode)
+            pause_ms: Inter-word gap treated as a pause boundary (sentence mode)
         """
         self.chunk_duration_ms = chunk_duration_ms
         self.overlap_ms = overlap_ms
+        self.mode = mode
+        self.min_chunk_ms = min_chunk_ms
+        self.target_chunk_ms = target_chunk_ms
+        self.max_chunk_ms = max_chunk_ms
+        self.pause_ms = pause_ms
     
     def chunk_transcript(
         self,
-        word_timestamps: list[WordTimestamp]
+        word_timestamps: list[WordTimestamp] | TranscriptWords | None
     ) -> list[TranscriptChunk]:
         """
-        Chunk transcript into time-based segments.
+        Chunk transcript into segments using the configured mode.
         
         Args:
-            word_timestamps: List of words with timestamps
+            word_timestamps: Words with timestamps, as a list or TranscriptWords
         
         Returns:
             List of transcript chunks
         """
-        if not word_timestamps:
+        if not isinstance(word_timestamps, TranscriptWords):
+            word_timestamps = TranscriptWords.from_word_timestamps(word_timestamps or [])
+        
+        if not len(word_timestamps):
             return []
         
+        if self.mode == "sentence":
+            return self._chunk_by_boundaries(word_timestamps)
+        
+        return self._chunk_by_time(word_timestamps)
+    
+    def _chunk_by_time(self, words: TranscriptWords) -> list[TranscriptChunk]:
+        """
+        Chunk transcript into fixed time windows with overlap.
+        
+        Word timings are normally non-decreasing, so both chunk ends and
+        overlap starts are found with bisect instead of scanning words. The
+        cost is O(chunks * log words) plus one slice of the text buffer per
+        chunk. Transcripts with out-of-order times are scanned linearly
+        instead, which finds the same first word a bisect would on sorted
+        times.
+        """
+        starts = words.starts
+        ends = words.ends
+        n = len(starts)
+        find = bisect_left if words.ordered else _first_at_least
         chunks = []
-        current_chunk_words = []
-        chunk_start_ms = word_timestamps[0].start_ms
+        first = 0
+        lo = 0
         
-        for i, word in enumerate(word_timestamps):
-            current_chunk_words.append(word)
+        while True:
+            chunk_start_ms = starts[first]
+            
+            # First word that brings the chunk to the target duration
+            last = min(find(ends, chunk_start_ms + self.chunk_duration_ms, lo, n), n - 1)
             
-            # Check if we should end this chunk
-            chunk_duration = word.end_ms - chunk_start_ms
-            is_last_word = i == len(word_timestamps) - 1
+            chunk_text = words.span_text(first, last)
+            chunks.append(TranscriptChunk(
+                start_ms=chunk_start_ms,
+                end_ms=ends[last],
+                text=chunk_text,
+                text_hash=self._generate_text_hash(chunk_text),
+            ))
             
-            should_end_chunk = (
-                chunk_duration >= self.chunk_duration_ms or
-                is_last_word
-            )
+            if last == n - 1:
+                return chunks
             
-            if should_end_chunk and current_chunk_words:
-                # Create chunk
-                chunk_text = " ".join(w.word for w in current_chunk_words)
-                chunk_end_ms = current_chunk_words[-1].end_ms
+            # Start new chunk with the words that fall within the overlap period
+            first = find(starts, ends[last] - self.overlap_ms, first, last + 1)
+            lo = last + 1
+    
+    def _chunk_by_boundaries(self, words: TranscriptWords) -> list[TranscriptChunk]:
+        """
+        Chunk transcript at sentence or pause boundaries.
+        
+        Short sentences are merged: a chunk grows past each boundary until the
+        next word would take it beyond target_chunk_ms, and is then cut at the
+        last sentence end or pause that left it at least min_chunk_ms long. A
+        chunk with no such boundary by then is cut at the next one, or, if
+        none appears before max_chunk_ms, at the largest inter-word gap seen
+        past min_chunk_ms. Chunks do not overlap, since they no longer split
+        sentences.
+        """
+        starts = words.starts
+        ends = words.ends
+        n = len(starts)
+        chunks = []
+        start = 0
+        
+        while start < n:
+            chunk_start_ms = starts[start]
+            end = n - 1
+            boundary_index = None
+            best_gap_index = None
+            best_gap_ms = -1
+            
+            for i in range(start, n - 1):
+                duration = ends[i] - chunk_start_ms
+                gap_ms = starts[i + 1] - ends[i]
+                next_duration = ends[i + 1] - chunk_start_ms
                 
-                chunk = TranscriptChunk(
-                    start_ms=chunk_start_ms,
-                    end_ms=chunk_end_ms,
-                    text=chunk_text,
-                    text_hash=self._generate_text_hash(chunk_text),
-                )
-                chunks.append(chunk)
+                if duration >= self.min_chunk_ms:
+                    if gap_ms >= self.pause_ms or self._ends_sentence(words.word(i)):
+                        boundary_index = i
+                    elif gap_ms > best_gap_ms:
+                        best_gap_ms = gap_ms
+                        best_gap_index = i
                 
-                # Start new chunk with overlap
-                if not is_last_word:
-                    # Find words that fall within overlap period
-                    overlap_start_ms = chunk_end_ms - self.overlap_ms
-                    overlap_words = [
-                        w for w in current_chunk_words
-                        if w.start_ms >= overlap_start_ms
-                    ]
-                    
-                    # Start next chunk
-                    if overlap_words:
-                        current_chunk_words = overlap_words
-                        chunk_start_ms = overlap_words[0].start_ms
-                    else:
-                        # No overlap, start fresh
-                        current_chunk_words = []
-                        if i + 1 < len(word_timestamps):
-                            chunk_start_ms = word_timestamps[i + 1].start_ms
+                # Adding the next word would pass the target: cut at the last boundary
+                if next_duration > self.target_chunk_ms and boundary_index is not None:
+                    end = boundary_index
+                    break
+                
+                # Adding the next word would exceed the maximum duration
+                if next_duration > self.max_chunk_ms:
+                    end = best_gap_index if best_gap_index is not None else i
+                    break
+            
+            chunk_text = words.span_text(start, end)
+            chunks.append(TranscriptChunk(
+                start_ms=chunk_start_ms,
+                end_ms=ends[end],
+                text=chunk_text,
+                text_hash=self._generate_text_hash(chunk_text),
+            ))
+            
+            start = end + 1
         
         return chunks
     
+    @staticmethod
+    def _ends_sentence(word: str) -> bool:
+        """Check if a punctuated word ends a sentence."""
+        return word.rstrip("\"')]").endswith(SENTENCE_END_CHARS)
+    
     @staticmethod
     def _generate_text_hash(text: str) -> str:
         """
@@ -115,4 +209,12 @@ class TranscriptChunker:
 
 
 # Global chunker instance
-chunker = TranscriptChunker()
+chunker = TranscriptChunker(
+    chunk_duration_ms=settings.chunk_duration_ms,
+    overlap_ms=settings.chunk_overlap_ms,
+    mode=settings.chunking_mode,
+    min_chunk_ms=settings.chunk_min_ms,
+    target_chunk_ms=settings.chunk_target_ms,
+    max_chunk_ms=settings.chunk_max_ms,
+    pause_ms=settings.chunk_pause_ms,
+)
@@ -0,0 +1,333 @@
+"""Embedding providers for transcript chunks and search queries."""
+
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import httpx
+import numpy as np
+
+from config import settings
+from supabase_client import supabase
+
+GEMINI_MODEL = "text-embedding-004"
+
+# Gemini batchEmbedContents accepts at most 100 requests per call
+GEMINI_MAX_BATCH = 100
+
+
+class EmbeddingProvider(ABC):
+    """
+    Interface for embedding models.
+    
+    Every provider returns vectors of a fixed dimension and exposes a model_id
+    that is stored next to each chunk embedding, so vectors from different
+    models are never compared with each other.
+    """
+    
+    model_id: str
+    dimension: int
+    
+    # Delay between batches for rate-limited remote APIs
+    rate_limit_delay: float = 0.0
+    
+    @abstractmethod
+    async def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """
+        Embed a batch of texts.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            One vector per text (None for failed embeddings)
+        """
+    
+    async def embed(self, text: str) -> list[float] | None:
+        """
+        Embed a single text.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Embedding vector or None if failed
+        """
+        return (await self.embed_batch([text]))[0]
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """Embedding provider using Gemini text-embedding-004."""
+    
+    model_id = f"gemini/{GEMINI_MODEL}"
+    dimension = 768
+    rate_limit_delay = 1.0
+    
+    def __init__(self):
+        self.api_key = settings.gemini_api_key
+        self.batch_url = (
+            "https://generativelanguage.googleapis.com/v1beta/models/"
+            f"{GEMINI_MODEL}:batchEmbedContents"
+        )
+    
+    async def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """Embed texts with one batchEmbedContents request per 100 texts."""
+        embeddings = []
+        for i in range(0, len(texts), GEMINI_MAX_BATCH):
+            embeddings.extend(await self._embed_request(texts[i:i + GEMINI_MAX_BATCH]))
+        return embeddings
+    
+    async def _embed_request(self, texts: list[str]) -> list[list[float] | None]:
+        """Single batchEmbedContents request."""
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{GEMINI_MODEL}",
+                    "content": {"parts": [{"text": text}]}
+                }
+                for text in texts
+            ]
+        }
+        
+        try:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                response = await client.post(
+                    f"{self.batch_url}?key={self.api_key}",
+                    json=payload,
+                )
+                
+                if response.status_code != 200:
+                    return [None] * len(texts)
+                
+                data = response.json()
+        except Exception:
+            return [None] * len(texts)
+        
+        embeddings = [item.get("values") or None for item in data.get("embeddings", [])]
+        if len(embeddings) != len(texts):
+            return [None] * len(texts)
+        return embeddings
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider running a sentence-transformers model on local CPUs.
+    
+    Each batch is encoded in a single forward pass, optionally through the
+    ONNX Runtime backend, and produces L2-normalized float32 vectors.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "onnx",
+        dimension: int = 768,
+        batch_size: int = 64
+    ):
+        """
+        Initialize provider. The model is loaded on first use.
+        
+        Args:
+            model_name: sentence-transformers model name or path
+            backend: "onnx" or "torch"
+            dimension: Expected embedding dimension
+            batch_size: Maximum texts per forward pass
+        """
+        self.model_name = model_name
+        self.backend = backend
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.model_id = f"local/{model_name}"
+        self._model = None
+        self._lock = threading.Lock()
+    
+    async def embed_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """Embed texts on a worker thread so inference never blocks the event loop."""
+        if not texts:
+            return []
+        
+        try:
+            vectors = await asyncio.to_thread(self._encode, texts)
+        except Exception:
+            return [None] * len(texts)
+        
+        return [vector.tolist() for vector in vectors]
+    
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Encode texts into a (len(texts), dimension) float32 array."""
+        model = self._get_model()
+        
+        # The model is shared by request handlers and is not thread-safe
+        with self._lock:
+            vectors = model.encode(
+                texts,
+                batch_size=min(len(texts), self.batch_size),
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+        
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"{self.model_id} produced {vectors.shape[-1]}-dimensional vectors, "
+                f"expected {self.dimension}"
+            )
+        return vectors
+    
+    def _get_model(self):
+        """Load the model on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    
+                    self._model = SentenceTransformer(
+                        self.model_name,
+                        device="cpu",
+                        backend=self.backend,
+                    )
+        return self._model
+
+
+async def embed_missing(rows: list[dict], provider: EmbeddingProvider | None = None) -> int:
+    """
+    Fill in embeddings for chunk rows that have none, in batches.
+    
+    Rows sharing a text_hash are embedded once. Each filled row also gets
+    the provider's embedding_model.
+    
+    Args:
+        rows: Chunk rows with text, text_hash and embedding keys
+        provider: Provider to use (default: the active provider)
+    
+    Returns:
+        Number of texts sent to the provider
+    """
+    provider = provider or await get_active_embedding_provider()
+    
+    pending: dict[str, list[dict]] = {}
+    for row in rows:
+        if row.get("embedding") is None:
+            pending.setdefault(row["text_hash"], []).append(row)
+    
+    text_hashes = list(pending)
+    batch_size = settings.embedding_batch_size
+    
+    for i in range(0, len(text_hashes), batch_size):
+        batch = text_hashes[i:i + batch_size]
+        vectors = await provider.embed_batch([pending[h][0]["text"] for h in batch])
+        
+        for text_hash, vector in zip(batch, vectors):
+            for row in pending[text_hash]:
+                row["embedding"] = vector
+                row["embedding_model"] = provider.model_id if vector is not None else None
+        
+        # Rate limiting
+        if provider.rate_limit_delay and i + batch_size < len(text_hashes):
+            await asyncio.sleep(provider.rate_limit_delay)
+    
+    return len(text_hashes)
+
+
+def provider_for_model(model_id: str, dimension: int | None = None) -> EmbeddingProvider:
+    """
+    Build the provider for a model identity.
+    
+    Args:
+        model_id: "gemini/text-embedding-004" or "local/<sentence-transformers model>"
+        dimension: Expected dimension (local models only)
+    
+    Returns:
+        Embedding provider producing vectors for model_id
+    
+    Raises:
+        ValueError: If the model is not supported
+    """
+    if model_id == GeminiEmbeddingProvider.model_id:
+        if dimension not in (None, GeminiEmbeddingProvider.dimension):
+            raise ValueError(f"{model_id} produces {GeminiEmbeddingProvider.dimension}-dimensional vectors")
+        return GeminiEmbeddingProvider()
+    
+    if model_id.startswith("local/") and len(model_id) > len("local/"):
+        return LocalEmbeddingProvider(
+            model_id[len("local/"):],
+            backend=settings.local_embedding_runtime,
+            dimension=dimension or settings.embedding_dimension,
+            batch_size=settings.embedding_batch_size,
+        )
+    
+    raise ValueError(f"Unsupported embedding model: {model_id}")
+
+
+# Active provider cache: (expires_at, provider)
+_active_provider: tuple[float, EmbeddingProvider] | None = None
+_providers: dict[str, EmbeddingProvider] = {}
+
+
+async def get_active_embedding_provider() -> EmbeddingProvider:
+    """
+    Get the provider of the active embedding model.
+    
+    The active model is recorded in the embedding_models table and switched
+    by a re-embed cutover; the lookup is cached for
+    embedding_model_cache_seconds. Without an active model, the provider
+    configured by EMBEDDING_BACKEND is used.
+    
+    Returns:
+        Provider whose vectors are currently served by search
+    """
+    global _active_provider
+    
+    now = time.monotonic()
+    if _active_provider and _active_provider[0] > now:
+        return _active_provider[1]
+    
+    provider = embedding_provider
+    try:
+        rows = await supabase.select(
+            "embedding_models",
+            columns="model_id,dimension",
+            filters={"is_active": True},
+            limit=1
+        )
+        if rows and rows[0]["model_id"] != embedding_provider.model_id:
+            model_id = rows[0]["model_id"]
+            if model_id not in _providers:
+                _providers[model_id] = provider_for_model(model_id, rows[0]["dimension"])
+            provider = _providers[model_id]
+    except Exception:
+        # Keep serving with the last known provider
+        if _active_provider:
+            provider = _active_provider[1]
+    
+    _active_provider = (now + settings.embedding_model_cache_seconds, provider)
+    return provider
+
+
+def reset_active_embedding_provider() -> None:
+    """Drop the cached active provider so the next lookup reads the database."""
+    global _active_provider
+    _active_provider = None
+
+
+def create_embedding_provider() -> EmbeddingProvider:
+    """
+    Create the embedding provider selected by settings.
+    
+    Returns:
+        Gemini provider, or the local CPU provider when configured
+    """
+    if settings.embedding_backend == "local":
+        return LocalEmbeddingProvider(
+            settings.local_embedding_model,
+            backend=settings.local_embedding_runtime,
+            dimension=settings.embedding_dimension,
+            batch_size=settings.embedding_batch_size,
+        )
+    
+    return GeminiEmbeddingProvider()
+
+
+# Global embedding provider instance
+embedding_provider = create_embedding_provider()
@@ -0,0 +1,163 @@
+"""Local CPU transcription backend using faster-whisper."""
+
+import asyncio
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from pathlib import Path
+
+from config import settings
+from services.transcription import TranscriptionBackend, TranscriptResult, TranscriptWords
+
+# Loaded models per worker process, keyed by (model, compute_type, cpu_threads)
+_models: OrderedDict = OrderedDict()
+
+MISSING_DEPENDENCY_MESSAGE = (
+    "TRANSCRIPTION_BACKEND=local requires faster-whisper; "
+    "install it with: pip install -r requirements-local.txt"
+)
+
+
+def check_dependencies() -> None:
+    """
+    Fail fast when the local backend is selected without faster-whisper.
+    
+    Raises:
+        RuntimeError: If faster-whisper is not installed
+    """
+    if importlib.util.find_spec("faster_whisper") is None:
+        raise RuntimeError(MISSING_DEPENDENCY_MESSAGE)
+
+
+def _load_model(model_name: str, compute_type: str, cpu_threads: int, cache_size: int):
+    """Get a model from this process's cache, loading and evicting as needed."""
+    key = (model_name, compute_type, cpu_threads)
+    if key in _models:
+        _models.move_to_end(key)
+        return _models[key]
+    
+    from faster_whisper import WhisperModel
+    
+    model = WhisperModel(
+        model_name,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+    )
+    _models[key] = model
+    
+    # Bound memory: each model instance holds its full weights
+    while len(_models) > cache_size:
+        _models.popitem(last=False)
+    
+    return model
+
+
+def _transcribe_in_process(
+    file_path: str,
+    model_name: str,
+    compute_type: str,
+    cpu_threads: int,
+    cache_size: int,
+    beam_size: int
+) -> TranscriptResult:
+    """Transcribe a file inside a pool worker process."""
+    try:
+        model = _load_model(model_name, compute_type, cpu_threads, cache_size)
+    except ImportError:
+        return TranscriptResult(
+            success=False,
+            error_message=MISSING_DEPENDENCY_MESSAGE
+        )
+    
+    try:
+        segments, info = model.transcribe(
+            file_path,
+            beam_size=beam_size,
+            word_timestamps=True,
+            vad_filter=True,
+        )
+        
+        texts = []
+        words, starts, ends = [], [], []
+        for segment in segments:
+            texts.append(segment.text.strip())
+            for word in segment.words or []:
+                text = word.word.strip()
+                if not text:
+                    continue
+                words.append(text)
+                starts.append(int(word.start * 1000))
+                ends.append(int(word.end * 1000))
+        
+        return TranscriptResult(
+            success=True,
+            full_text=" ".join(t for t in texts if t),
+            words=TranscriptWords.from_parts(words, starts, ends),
+            language=info.language,
+        )
+    except Exception as e:
+        return TranscriptResult(success=False, error_message=str(e))
+
+
+class LocalTranscriptionBackend(TranscriptionBackend):
+    """
+    Transcription backend running faster-whisper (CTranslate2) on local CPUs.
+    
+    Files are transcribed in a process pool so decoding and inference never
+    block the event loop, and each pool process keeps a small LRU cache of
+    loaded models so repeated jobs skip model loading. The pool lives as
+    long as the process that created it, so the RQ worker runs jobs without
+    forking when this backend is selected (see workers/worker.py).
+    """
+    
+    name = "local"
+    
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+    
+    async def transcribe_file(self, file_path: Path) -> TranscriptResult:
+        """
+        Transcribe a local audio or video file.
+        
+        Args:
+            file_path: Path to local media file
+        
+        Returns:
+            TranscriptResult with full text and word timestamps
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(),
+                _transcribe_in_process,
+                str(file_path),
+                settings.local_transcription_model,
+                settings.local_transcription_compute_type,
+                settings.local_transcription_cpu_threads,
+                settings.local_transcription_model_cache_size,
+                settings.local_transcription_beam_size,
+            )
+        except BrokenProcessPool as e:
+            # A pool process died (e.g. out of memory); the next file gets a new pool
+            self._executor = None
+            return TranscriptResult(success=False, error_message=f"Transcription process died: {e}")
+        except Exception as e:
+            return TranscriptResult(success=False, error_message=str(e))
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._executor is None:
+            # Spawn rather than fork: the worker process has threads of its
+            # own and CTranslate2 thread pools do not survive forking
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.local_transcription_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+
+# Global local transcription backend instance
+local_transcription_backend = LocalTranscriptionBackend()
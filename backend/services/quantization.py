@@ -0,0 +1,74 @@
+"""Scalar quantization of embedding vectors."""
+
+import base64
+
+import numpy as np
+
+# Largest int8 code; symmetric so zero stays exactly representable
+INT8_MAX = 127
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize vectors to int8 with one scale per vector.
+    
+    Each vector is divided by max(|v|) / 127 and rounded, so a vector keeps
+    its direction to within half a step per dimension.
+    
+    Args:
+        vectors: (n, d) float matrix
+    
+    Returns:
+        (n, d) int8 codes and (n,) float32 scales; v ≈ codes * scale
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / INT8_MAX
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -INT8_MAX, INT8_MAX).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    Reconstruct float32 vectors from int8 codes and scales.
+    
+    Args:
+        codes: (n, d) int8 codes
+        scales: (n,) per-vector scales
+    
+    Returns:
+        (n, d) float32 matrix
+    """
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def encode_q8(vector: np.ndarray) -> str:
+    """
+    Encode one vector in the binary transport format.
+    
+    Base64 of a big-endian float32 scale followed by one signed byte per
+    dimension, matching the quantize_embedding SQL function.
+    
+    Args:
+        vector: Float vector
+    
+    Returns:
+        Base64 text
+    """
+    codes, scales = quantize_int8(vector)
+    return base64.b64encode(scales.astype(">f4").tobytes() + codes.tobytes()).decode()
+
+
+def decode_q8(value: str) -> np.ndarray:
+    """
+    Decode a vector from the binary transport format.
+    
+    Args:
+        value: Base64 text from encode_q8 or quantize_embedding
+    
+    Returns:
+        Dequantized float32 vector
+    """
+    raw = base64.b64decode(value)
+    scale = np.frombuffer(raw[:4], dtype=">f4")[0]
+    return np.frombuffer(raw[4:], dtype=np.int8).astype(np.float32) * np.float32(scale)
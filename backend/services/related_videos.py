@@ -0,0 +1,290 @@
+"""Resident matrix of video centroid embeddings for related-video lookups."""
+
+import asyncio
+import time
+
+import numpy as np
+
+from config import settings
+from supabase_client import supabase
+from services.embeddings import get_active_embedding_provider
+from services.quantization import decode_q8
+from services.search_cache import search_cache
+
+# Centroids per video_centroids call, within PostgREST's max-rows
+CENTROID_PAGE_SIZE = 1000
+
+
+async def update_video_centroids(video_ids: list[str], model_id: str | None = None) -> None:
+    """
+    Recompute the centroid embeddings of some videos in the database.
+    
+    The mean is taken in SQL, so no vectors leave the database. Never
+    raises: a missing centroid only hides the video from related lookups
+    until the next update.
+    
+    Args:
+        video_ids: Videos whose chunks changed
+        model_id: Model of the chunk vectors (default: active model)
+    """
+    if not video_ids:
+        return
+    
+    try:
+        if model_id is None:
+            model_id = (await get_active_embedding_provider()).model_id
+        await supabase.rpc("compute_video_centroids", {
+            "p_video_ids": video_ids,
+            "p_embedding_model": model_id,
+        })
+    except Exception as e:
+        print(f"❌ Failed to update video centroids: {e}")
+
+
+async def load_video_centroids(model_id: str, video_ids: list[str] | None = None) -> list[dict]:
+    """
+    Read quantized video centroids, paging by video ID.
+    
+    Args:
+        model_id: Model of the centroids
+        video_ids: Videos to read (default: all done videos)
+    
+    Returns:
+        video_centroids rows, ordered by video ID
+    """
+    rows = []
+    after = None
+    
+    while True:
+        page = await supabase.rpc("video_centroids", {
+            "p_embedding_model": model_id,
+            "p_video_ids": video_ids,
+            "p_after": after,
+            "p_limit": CENTROID_PAGE_SIZE,
+        })
+        if not page:
+            return rows
+        
+        rows.extend(page)
+        after = page[-1]["id"]
+
+
+class RelatedVideoIndex:
+    """
+    Normalized centroids of all done videos, one row per video.
+    
+    A related-video lookup is one matrix-vector product over videos rather
+    than a scan over chunks, and needs no embedding call. A background task
+    keeps the matrix current by watching the search corpus version.
+    """
+    
+    def __init__(self):
+        self._ids: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._model_id: str | None = None
+        self._version: int | None = None
+        self._last_full_build = 0.0
+        self._task: asyncio.Task | None = None
+    
+    @property
+    def model_id(self) -> str | None:
+        """Model of the loaded centroids."""
+        return self._model_id
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def centroids(self) -> tuple[list[str], np.ndarray]:
+        """Video IDs and their normalized centroid matrix."""
+        return list(self._ids), self._matrix
+    
+    def related(self, video_id: str, limit: int = 10) -> list[tuple[str, float]] | None:
+        """
+        Find the videos whose centroids are closest to a video's.
+        
+        Args:
+            video_id: Video ID
+            limit: Maximum related videos
+        
+        Returns:
+            (video_id, similarity) pairs, best first, or None if the video
+            has no centroid in the index
+        """
+        position = self._positions.get(video_id)
+        if position is None:
+            return None
+        return self.nearest(self._matrix[position], limit, exclude=video_id)
+    
+    def nearest(
+        self,
+        centroid: np.ndarray,
+        limit: int = 10,
+        exclude: str | None = None
+    ) -> list[tuple[str, float]]:
+        """
+        Find the videos closest to a centroid.
+        
+        Args:
+            centroid: Centroid embedding
+            limit: Maximum videos
+            exclude: Video to leave out, usually the one being looked up
+        
+        Returns:
+            (video_id, similarity) pairs, best first
+        """
+        ids, matrix = self._ids, self._matrix
+        if not ids:
+            return []
+        
+        scores = matrix @ _normalize(centroid)
+        if exclude is not None and exclude in self._positions:
+            scores[self._positions[exclude]] = -np.inf
+        
+        limit = min(limit, len(ids))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        
+        return [(ids[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+    
+    async def lookup(self, video_id: str, limit: int = 10) -> list[tuple[str, float]] | None:
+        """
+        Related videos, loading the video's centroid if it is not resident.
+        
+        Args:
+            video_id: Video ID
+            limit: Maximum related videos
+        
+        Returns:
+            (video_id, similarity) pairs, or None if the video has no centroid
+        """
+        related = self.related(video_id, limit)
+        if related is not None or self._model_id is None:
+            return related
+        
+        # Finished after the last refresh
+        rows = await supabase.rpc("video_centroids", {
+            "p_embedding_model": self._model_id,
+            "p_video_ids": [video_id],
+        })
+        if not rows:
+            return None
+        return self.nearest(decode_q8(rows[0]["centroid_q8"]), limit, exclude=video_id)
+    
+    def set_centroids(self, video_ids: list[str], centroids: np.ndarray) -> None:
+        """
+        Add or replace the centroids of some videos.
+        
+        Args:
+            video_ids: Video IDs
+            centroids: (n, d) centroid matrix
+        """
+        if not video_ids:
+            return
+        
+        self.remove_videos(video_ids)
+        centroids = np.stack([_normalize(c) for c in centroids])
+        matrix = centroids if not self._ids else np.concatenate([self._matrix, centroids])
+        self._set(self._ids + list(video_ids), matrix)
+    
+    def remove_videos(self, video_ids: list[str]) -> None:
+        """
+        Remove videos from the index.
+        
+        Args:
+            video_ids: Video IDs
+        """
+        drop = {self._positions[v] for v in video_ids if v in self._positions}
+        if not drop:
+            return
+        
+        keep = [i for i in range(len(self._ids)) if i not in drop]
+        self._set([self._ids[i] for i in keep], self._matrix[keep])
+    
+    async def refresh(self) -> None:
+        """
+        Bring the matrix up to date with the corpus.
+        
+        Only runs when the corpus version changed. Newly done videos are
+        added and removed ones dropped; a full reload runs when the active
+        model changes and every related_full_rebuild_seconds, picking up
+        centroids recomputed after re-chunking.
+        """
+        model_id = (await get_active_embedding_provider()).model_id
+        version = await search_cache.corpus_version()
+        full_build_due = (
+            model_id != self._model_id
+            or time.monotonic() - self._last_full_build > settings.related_full_rebuild_seconds
+        )
+        
+        if version is not None and version == self._version and not full_build_due:
+            return
+        
+        if full_build_due:
+            rows = await load_video_centroids(model_id)
+            self._set([], np.zeros((0, 0), dtype=np.float32))
+            self.set_centroids(*self._decode(rows))
+            self._model_id = model_id
+            self._last_full_build = time.monotonic()
+        else:
+            videos = await supabase.select_all(
+                "videos",
+                columns="id",
+                filters={"status": "done"}
+            )
+            done_ids = {video["id"] for video in videos}
+            self.remove_videos([video_id for video_id in self._ids if video_id not in done_ids])
+            
+            new_ids = [video_id for video_id in done_ids if video_id not in self._positions]
+            if new_ids:
+                rows = await load_video_centroids(model_id, new_ids)
+                self.set_centroids(*self._decode(rows))
+        
+        self._version = version
+    
+    async def start(self) -> None:
+        """Start the background refresh loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _refresh_loop(self) -> None:
+        """Refresh periodically; errors keep the previous matrix in service."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"❌ Related video index refresh failed: {e}")
+            await asyncio.sleep(settings.related_refresh_seconds)
+    
+    def _set(self, ids: list[str], matrix: np.ndarray) -> None:
+        """Swap in new rows."""
+        self._matrix = matrix
+        self._ids = ids
+        self._positions = {video_id: i for i, video_id in enumerate(ids)}
+    
+    @staticmethod
+    def _decode(rows: list[dict] | None) -> tuple[list[str], list[np.ndarray]]:
+        """Video IDs and centroids from video_centroids rows."""
+        rows = rows or []
+        return [row["id"] for row in rows], [decode_q8(row["centroid_q8"]) for row in rows]
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    """L2-normalize a vector so inner product is cosine similarity."""
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# Global related video index instance
+related_video_index = RelatedVideoIndex()
@@ -0,0 +1,159 @@
+"""Search result cache with corpus-version invalidation."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any
+
+import redis.asyncio as redis
+
+from config import settings
+
+CORPUS_VERSION_KEY = "search:corpus_version"
+RESULT_KEY_PREFIX = "search:results:"
+
+
+async def bump_corpus_version() -> None:
+    """
+    Invalidate cached search results after the searchable corpus changed.
+    
+    Called when a video is marked done, when tags change, and after chunk or
+    embedding rewrites. Failures are ignored: cached entries still expire
+    after search_cache_ttl_seconds.
+    """
+    try:
+        r = redis.from_url(settings.redis_url, decode_responses=True)
+        try:
+            await r.incr(CORPUS_VERSION_KEY)
+        finally:
+            await r.aclose()
+    except Exception:
+        pass
+
+
+class SearchCache:
+    """
+    Two-level cache of decorated search results.
+    
+    Keys combine the normalized request with the corpus version counter, so
+    bumping the counter makes every older entry unreachable. Entries live in
+    an in-process LRU and, optionally, in Redis so API replicas share them.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int, use_redis: bool = False):
+        """
+        Initialize cache.
+        
+        Args:
+            max_entries: Maximum entries in the in-process LRU
+            ttl_seconds: Entry lifetime; keep below signed_url_ttl_seconds
+                so cached preview URLs are still valid when served
+            use_redis: Also store entries in Redis
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+        self._redis = None
+    
+    def _get_redis(self):
+        """Create the Redis client on first use."""
+        if self._redis is None:
+            self._redis = redis.from_url(settings.redis_url, decode_responses=True)
+        return self._redis
+    
+    async def corpus_version(self) -> int | None:
+        """
+        Get the current corpus version.
+        
+        Returns:
+            Version counter, or None if Redis is unavailable (cache bypassed)
+        """
+        try:
+            return int(await self._get_redis().get(CORPUS_VERSION_KEY) or 0)
+        except Exception:
+            return None
+    
+    @staticmethod
+    def make_key(version: int, **request: Any) -> str:
+        """
+        Build a cache key from the corpus version and normalized request.
+        
+        The query is lowercased with whitespace collapsed, and tags are
+        de-duplicated and sorted, so equivalent requests share an entry.
+        """
+        normalized = dict(request)
+        normalized["query"] = " ".join(str(request.get("query", "")).lower().split())
+        if request.get("tags"):
+            normalized["tags"] = sorted(set(request["tags"]))
+        
+        digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+        return f"{version}:{digest}"
+    
+    async def get(self, key: str, result_type: type) -> list | None:
+        """
+        Look up cached results.
+        
+        Args:
+            key: Key from make_key()
+            result_type: Dataclass to rebuild results from Redis with
+        
+        Returns:
+            Cached results, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, results = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return results
+            del self._entries[key]
+        
+        if self.use_redis:
+            try:
+                data = await self._get_redis().get(RESULT_KEY_PREFIX + key)
+            except Exception:
+                data = None
+            if data:
+                results = [result_type(**item) for item in json.loads(data)]
+                self._remember(key, results)
+                return results
+        
+        return None
+    
+    async def set(self, key: str, results: list) -> None:
+        """
+        Store results.
+        
+        Args:
+            key: Key from make_key()
+            results: List of dataclass results
+        """
+        self._remember(key, results)
+        
+        if self.use_redis:
+            try:
+                await self._get_redis().set(
+                    RESULT_KEY_PREFIX + key,
+                    json.dumps([asdict(r) for r in results]),
+                    ex=self.ttl_seconds
+                )
+            except Exception:
+                pass
+    
+    def _remember(self, key: str, results: list) -> None:
+        """Insert into the in-process LRU, evicting the oldest entries."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Global search cache instance
+search_cache = SearchCache(
+    max_entries=settings.search_cache_size,
+    ttl_seconds=settings.search_cache_ttl_seconds,
+    use_redis=settings.search_cache_redis,
+)
@@ -1,12 +1,19 @@
 """Search service with hybrid ranking."""
 
 import asyncio
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Literal
+from config import settings
 from supabase_client import supabase
-from services.ai_service import ai_service
+from services.embeddings import get_active_embedding_provider
+from services.search_cache import search_cache
+from services.vector_index import vector_index_service
 from storage import storage_service
 
 
+FusionMode = Literal["rrf", "weighted"]
+
+
 @dataclass
 class SearchResult:
     """Single search result."""
@@ -32,7 +39,10 @@ class SearchService:
         query: str,
         top_k: int = 20,
         tags: list[str] | None = None,
-        platform: str | None = None
+        platform: str | None = None,
+        fusion: FusionMode | None = None,
+        vector_weight: float | None = None,
+        text_weight: float | None = None
     ) -> list[SearchResult]:
         """
         Perform hybrid search combining vector similarity and full-text search.
@@ -42,42 +52,308 @@ class SearchService:
             top_k: Number of results to return
             tags: Filter by tags
             platform: Filter by platform
+            fusion: Rank fusion mode (default from settings)
+            vector_weight: Weight of vector results (default from settings)
+            text_weight: Weight of full-text results (default from settings)
         
         Returns:
             List of search results sorted by score
         """
-        # Generate query embedding
-        query_embedding = await ai_service.generate_embedding(query)
+        # Serve repeated requests from the cache while the corpus is unchanged
+        cache_key = await self._cache_key(
+            query=query,
+            top_k=top_k,
+            tags=tags,
+            platform=platform,
+            fusion=fusion,
+            vector_weight=vector_weight,
+            text_weight=text_weight
+        )
+        if cache_key:
+            cached = await search_cache.get(cache_key, SearchResult)
+            if cached is not None:
+                return cached
         
-        # Run both searches in parallel
-        vector_results, text_results = await asyncio.gather(
-            self.vector_search(query_embedding, top_k=50) if query_embedding else asyncio.sleep(0, result=[]),
-            self.fulltext_search(query, top_k=50)
+        vector_results, text_results = await self.retrieve_candidates(
+            query,
+            tags=tags,
+            platform=platform
         )
         
         # Merge and rank results
         merged_results = self.merge_results(
             vector_results,
             text_results,
+            mode=fusion,
+            vector_weight=vector_weight,
+            text_weight=text_weight
+        )
+        
+        # Decorate with metadata
+        decorated_results = await self._decorate_results(self.rank_results(merged_results, top_k))
+        
+        if cache_key:
+            await search_cache.set(cache_key, decorated_results)
+        
+        return decorated_results
+    
+    async def batch_search(self, requests: list[dict]) -> list[list[SearchResult]]:
+        """
+        Run many hybrid searches with shared round trips.
+        
+        Uncached queries are embedded in one batch request, retrieved with
+        one vector and one full-text call for the whole batch, and the union
+        of their result videos is decorated once.
+        
+        Args:
+            requests: Keyword arguments of hybrid_search, one dict per search
+        
+        Returns:
+            Results per request, in request order
+        """
+        results = [None] * len(requests)
+        
+        cache_keys = [None] * len(requests)
+        version = await search_cache.corpus_version() if settings.search_cache_enabled else None
+        if version is not None:
+            cache_keys = [search_cache.make_key(version, **request) for request in requests]
+            for i, cache_key in enumerate(cache_keys):
+                results[i] = await search_cache.get(cache_key, SearchResult)
+        
+        pending = [i for i, cached in enumerate(results) if cached is None]
+        if not pending:
+            return results
+        
+        queries = [requests[i]["query"] for i in pending]
+        filters = [(requests[i].get("tags"), requests[i].get("platform")) for i in pending]
+        
+        # One embedding request for every query in the batch
+        provider = await get_active_embedding_provider()
+        embeddings, text_lists = await asyncio.gather(
+            provider.embed_batch(queries),
+            self.fulltext_search_batch(queries, top_k=settings.search_candidates, filters=filters)
+        )
+        vector_lists = await self.vector_search_batch(
+            embeddings,
+            top_k=settings.search_candidates,
+            embedding_model=provider.model_id,
+            filters=filters
+        )
+        
+        ranked_lists = []
+        for i, vector_results, text_results in zip(pending, vector_lists, text_lists):
+            request = requests[i]
+            merged_results = self.merge_results(
+                vector_results,
+                text_results,
+                mode=request.get("fusion"),
+                vector_weight=request.get("vector_weight"),
+                text_weight=request.get("text_weight")
+            )
+            ranked_lists.append(self.rank_results(merged_results, request.get("top_k", 20)))
+        
+        for i, decorated in zip(pending, await self._decorate_batch(ranked_lists)):
+            results[i] = decorated
+            if cache_keys[i]:
+                await search_cache.set(cache_keys[i], decorated)
+        
+        return results
+    
+    async def retrieve_candidates(
+        self,
+        query: str,
+        tags: list[str] | None = None,
+        platform: str | None = None
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Retrieve vector and full-text candidates for a query in parallel.
+        
+        Filters are applied inside both retrievals, so each returns a full
+        candidate list of matching chunks.
+        
+        Args:
+            query: Search query
+            tags: Only videos whose keywords include all these tags
+            platform: Only videos from this platform
+        
+        Returns:
+            Vector results and full-text results
+        """
+        # Text retrieval does not wait for the query embedding
+        return await asyncio.gather(
+            self._vector_candidates(query, tags=tags, platform=platform),
+            self.fulltext_search(query, top_k=settings.search_candidates, tags=tags, platform=platform)
+        )
+    
+    async def hybrid_search_stream(
+        self,
+        query: str,
+        top_k: int = 20,
+        tags: list[str] | None = None,
+        platform: str | None = None,
+        fusion: FusionMode | None = None,
+        vector_weight: float | None = None,
+        text_weight: float | None = None
+    ):
+        """
+        Hybrid search yielding progressively better results as they are ready.
+        
+        Yields events as dictionaries:
+            {"event": "text", "results": [...]}: keyword hits, as soon as
+                full-text retrieval finishes
+            {"event": "ranked", "results": [...]}: fused and grouped results
+                without metadata
+            {"event": "result", "rank": i, "result": {...}}: a fully decorated
+                result, in the order decoration completes
+            {"event": "done", "total": n}
+        
+        A cached search yields its decorated results and "done" directly.
+        
+        Args:
+            Same as hybrid_search
+        """
+        cache_key = await self._cache_key(
+            query=query,
+            top_k=top_k,
+            tags=tags,
+            platform=platform,
+            fusion=fusion,
+            vector_weight=vector_weight,
+            text_weight=text_weight
+        )
+        if cache_key:
+            cached = await search_cache.get(cache_key, SearchResult)
+            if cached is not None:
+                for rank, result in enumerate(cached):
+                    yield {"event": "result", "rank": rank, "result": asdict(result)}
+                yield {"event": "done", "total": len(cached)}
+                return
+        
+        vector_task = asyncio.create_task(
+            self._vector_candidates(query, tags=tags, platform=platform)
+        )
+        try:
+            text_results = await self.fulltext_search(
+                query,
+                top_k=settings.search_candidates,
+                tags=tags,
+                platform=platform
+            )
+            yield {
+                "event": "text",
+                "results": [self._partial_result(r, r["score"]) for r in text_results[:top_k]]
+            }
+            
+            vector_results = await vector_task
+        finally:
+            vector_task.cancel()
+        
+        merged_results = self.merge_results(
+            vector_results,
+            text_results,
+            mode=fusion,
+            vector_weight=vector_weight,
+            text_weight=text_weight
+        )
+        ranked_results = self.rank_results(merged_results, top_k)
+        yield {
+            "event": "ranked",
+            "results": [self._partial_result(r, r["final_score"]) for r in ranked_results]
+        }
+        
+        # Decorate each video's results as soon as its metadata resolves
+        ranks_by_video = {}
+        for rank, result in enumerate(ranked_results):
+            ranks_by_video.setdefault(result["video_id"], []).append(rank)
+        
+        decorated = [None] * len(ranked_results)
+        tasks = [
+            asyncio.create_task(self._decorate_video(video_id, [ranked_results[i] for i in ranks]))
+            for video_id, ranks in ranks_by_video.items()
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                video_results = await task
+                for rank, result in zip(ranks_by_video[video_results[0].video_id], video_results):
+                    decorated[rank] = result
+                    yield {"event": "result", "rank": rank, "result": asdict(result)}
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        if cache_key:
+            await search_cache.set(cache_key, decorated)
+        
+        yield {"event": "done", "total": len(decorated)}
+    
+    async def _vector_candidates(
+        self,
+        query: str,
+        tags: list[str] | None = None,
+        platform: str | None = None
+    ) -> list[dict]:
+        """Embed the query and retrieve vector candidates."""
+        # Generate query embedding with the model whose vectors are served
+        provider = await get_active_embedding_provider()
+        query_embedding = await provider.embed(query)
+        if not query_embedding:
+            return []
+        
+        return await self.vector_search(
+            query_embedding,
+            top_k=settings.search_candidates,
+            embedding_model=provider.model_id,
             tags=tags,
             platform=platform
         )
+    
+    async def _cache_key(self, **request) -> str | None:
+        """Cache key for a search request, or None when caching is off."""
+        if not settings.search_cache_enabled:
+            return None
         
+        version = await search_cache.corpus_version()
+        if version is None:
+            return None
+        
+        return search_cache.make_key(version, **request)
+    
+    @staticmethod
+    def _partial_result(result: dict, score: float) -> dict:
+        """Undecorated result for streaming before metadata is loaded."""
+        return {
+            "video_id": result["video_id"],
+            "start_ms": result["start_ms"],
+            "end_ms": result["end_ms"],
+            "snippet": result["text"],
+            "score": score,
+        }
+    
+    def rank_results(self, merged_results: list[dict], top_k: int) -> list[dict]:
+        """
+        Group merged results by video and keep the best top_k spans.
+        
+        Args:
+            merged_results: Results from merge_results
+            top_k: Number of results to return
+        
+        Returns:
+            Results sorted by final score
+        """
         # Group by video and keep top spans
         grouped_results = self._group_by_video(merged_results, max_per_video=3)
         
         # Sort by score and limit
-        grouped_results.sort(key=lambda x: x.score, reverse=True)
-        
-        # Decorate with metadata
-        decorated_results = await self._decorate_results(grouped_results[:top_k])
-        
-        return decorated_results
+        grouped_results.sort(key=lambda x: x["final_score"], reverse=True)
+        return grouped_results[:top_k]
     
     async def vector_search(
         self,
         query_embedding: list[float],
-        top_k: int = 50
+        top_k: int = 50,
+        embedding_model: str | None = None,
+        tags: list[str] | None = None,
+        platform: str | None = None
     ) -> list[dict]:
         """
         Perform vector similarity search.
@@ -85,45 +361,119 @@ class SearchService:
         Args:
             query_embedding: Query embedding vector
             top_k: Number of results to return
+            embedding_model: Model of the query vector (default: active model)
+            tags: Only videos whose keywords include all these tags
+            platform: Only videos from this platform
         
         Returns:
             List of results with similarity scores
         """
-        # Use Supabase RPC for vector search
-        # Note: This requires a custom PostgreSQL function
-        # For now, we'll use a simplified approach
-        
-        # Get all chunks (in production, use pgvector KNN)
-        chunks = await supabase.select(
-            "transcript_chunks",
-            columns="id,video_id,start_ms,end_ms,text,embedding"
-        )
+        if embedding_model is None:
+            embedding_model = (await get_active_embedding_provider()).model_id
+        
+        if settings.vector_index_enabled:
+            results = await vector_index_service.search(
+                query_embedding,
+                top_k,
+                embedding_model,
+                tags=tags,
+                platform=platform
+            )
+            # No index for this model yet: fall back to the database
+            if results is not None:
+                return results
+        
+        # Nearest chunks from the query's model, filtered before the top_k cut
+        chunks = await supabase.rpc("match_chunks", {
+            "p_query_embedding": query_embedding,
+            "p_embedding_model": embedding_model,
+            "p_platform": platform,
+            "p_tags": tags or None,
+            "p_limit": top_k,
+        })
+        
+        return [
+            {
+                "chunk_id": chunk["id"],
+                "video_id": chunk["video_id"],
+                "start_ms": chunk["start_ms"],
+                "end_ms": chunk["end_ms"],
+                "text": chunk["text"],
+                "score": chunk["similarity"],
+                "source": "vector"
+            }
+            for chunk in chunks or []
+        ]
+    
+    async def vector_search_batch(
+        self,
+        query_embeddings: list[list[float] | None],
+        top_k: int = 50,
+        embedding_model: str | None = None,
+        filters: list[tuple[list[str] | None, str | None]] | None = None
+    ) -> list[list[dict]]:
+        """
+        Perform vector similarity search for many queries in one call.
         
-        # Calculate cosine similarity
-        results = []
-        for chunk in chunks:
-            if chunk.get("embedding"):
-                similarity = self._cosine_similarity(
-                    query_embedding,
-                    chunk["embedding"]
-                )
-                results.append({
-                    "video_id": chunk["video_id"],
-                    "start_ms": chunk["start_ms"],
-                    "end_ms": chunk["end_ms"],
-                    "text": chunk["text"],
-                    "score": similarity,
-                    "source": "vector"
-                })
-        
-        # Sort by similarity and return top_k
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+        Args:
+            query_embeddings: Query embedding vectors (None for failed embeddings)
+            top_k: Number of results per query
+            embedding_model: Model of the query vectors (default: active model)
+            filters: (tags, platform) per query
+        
+        Returns:
+            Results per query with similarity scores
+        """
+        if embedding_model is None:
+            embedding_model = (await get_active_embedding_provider()).model_id
+        filters = filters or [(None, None)] * len(query_embeddings)
+        
+        results = [[] for _ in query_embeddings]
+        embedded = [i for i, embedding in enumerate(query_embeddings) if embedding]
+        if not embedded:
+            return results
+        
+        if settings.vector_index_enabled:
+            # One matrix-matrix product over the resident index
+            index_results = await vector_index_service.search_batch(
+                [query_embeddings[i] for i in embedded],
+                top_k,
+                embedding_model,
+                [filters[i] for i in embedded]
+            )
+            if index_results is not None:
+                for i, query_results in zip(embedded, index_results):
+                    results[i] = query_results
+                return results
+        
+        chunks = await supabase.rpc("match_chunks_batch", {
+            "p_queries": [
+                {"embedding": query_embeddings[i], "tags": filters[i][0] or None, "platform": filters[i][1]}
+                for i in embedded
+            ],
+            "p_embedding_model": embedding_model,
+            "p_limit": top_k,
+        })
+        
+        for chunk in chunks or []:
+            results[embedded[chunk["query_index"]]].append({
+                "chunk_id": chunk["id"],
+                "video_id": chunk["video_id"],
+                "start_ms": chunk["start_ms"],
+                "end_ms": chunk["end_ms"],
+                "text": chunk["text"],
+                "score": chunk["similarity"],
+                "source": "vector"
+            })
+        
+        return results
     
     async def fulltext_search(
         self,
         query: str,
-        top_k: int = 50
+        top_k: int = 50,
+        tags: list[str] | None = None,
+        platform: str | None = None
     ) -> list[dict]:
         """
         Perform full-text search.
@@ -131,98 +481,147 @@ class SearchService:
         Args:
             query: Search query
             top_k: Number of results to return
+            tags: Only videos whose keywords include all these tags
+            platform: Only videos from this platform
         
         Returns:
             List of results with relevance scores
         """
-        # Search in transcripts
-        # Note: This is simplified; production should use PostgreSQL full-text search
+        if not query.strip():
+            return []
+        
+        # Chunks containing the query phrase, so text hits carry real
+        # timestamps and fuse with vector hits on the same chunk
+        chunks = await supabase.rpc("search_chunks_text", {
+            "p_query": query,
+            "p_platform": platform,
+            "p_tags": tags or None,
+            "p_limit": top_k,
+        })
+        
+        return [
+            {
+                "chunk_id": chunk["id"],
+                "video_id": chunk["video_id"],
+                "start_ms": chunk["start_ms"],
+                "end_ms": chunk["end_ms"],
+                "text": chunk["text"],
+                # Calculate simple relevance score
+                "score": min(1.0, chunk["occurrences"] / 10.0),
+                "source": "text"
+            }
+            for chunk in chunks or []
+        ]
+    
+    async def fulltext_search_batch(
+        self,
+        queries: list[str],
+        top_k: int = 50,
+        filters: list[tuple[list[str] | None, str | None]] | None = None
+    ) -> list[list[dict]]:
+        """
+        Perform full-text search for many queries in one call.
         
-        transcripts = await supabase.select(
-            "transcripts",
-            columns="video_id,full_text"
-        )
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            filters: (tags, platform) per query
         
-        results = []
-        query_lower = query.lower()
+        Returns:
+            Results per query with relevance scores
+        """
+        filters = filters or [(None, None)] * len(queries)
         
-        for transcript in transcripts:
-            full_text = transcript.get("full_text", "")
-            full_text_lower = full_text.lower()
-            
-            # Simple keyword matching
-            if query_lower in full_text_lower:
-                # Find position
-                pos = full_text_lower.find(query_lower)
-                
-                # Extract snippet
-                snippet_start = max(0, pos - 100)
-                snippet_end = min(len(full_text), pos + 100)
-                snippet = full_text[snippet_start:snippet_end]
-                
-                # Calculate simple relevance score
-                count = full_text_lower.count(query_lower)
-                score = min(1.0, count / 10.0)
-                
-                results.append({
-                    "video_id": transcript["video_id"],
-                    "start_ms": 0,
-                    "end_ms": 0,
-                    "text": snippet,
-                    "score": score,
-                    "source": "text"
-                })
-        
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+        results = [[] for _ in queries]
+        searchable = [i for i, query in enumerate(queries) if query.strip()]
+        if not searchable:
+            return results
+        
+        chunks = await supabase.rpc("search_chunks_text_batch", {
+            "p_queries": [
+                {"query": queries[i], "tags": filters[i][0] or None, "platform": filters[i][1]}
+                for i in searchable
+            ],
+            "p_limit": top_k,
+        })
+        
+        for chunk in chunks or []:
+            results[searchable[chunk["query_index"]]].append({
+                "chunk_id": chunk["id"],
+                "video_id": chunk["video_id"],
+                "start_ms": chunk["start_ms"],
+                "end_ms": chunk["end_ms"],
+                "text": chunk["text"],
+                "score": min(1.0, chunk["occurrences"] / 10.0),
+                "source": "text"
+            })
+        
+        return results
     
     def merge_results(
         self,
         vector_results: list[dict],
         text_results: list[dict],
-        tags: list[str] | None = None,
-        platform: str | None = None
+        mode: FusionMode | None = None,
+        vector_weight: float | None = None,
+        text_weight: float | None = None
     ) -> list[dict]:
         """
         Merge and rank results from vector and text search.
         
+        Results are keyed by chunk ID, so a chunk found by both searches is
+        fused into one result. In "rrf" mode each list contributes
+        weight / (rrf_k + rank); in "weighted" mode scores are min-max
+        normalized per list and combined with the weights.
+        
         Args:
             vector_results: Results from vector search
             text_results: Results from full-text search
-            tags: Filter by tags
-            platform: Filter by platform
+            mode: Fusion mode (default from settings)
+            vector_weight: Weight of vector results (default from settings)
+            text_weight: Weight of full-text results (default from settings)
         
         Returns:
             Merged and ranked results
         """
-        # Normalize scores to [0, 1]
-        vector_results = self._normalize_scores(vector_results)
-        text_results = self._normalize_scores(text_results)
+        mode = mode or settings.search_fusion_mode
+        if vector_weight is None:
+            vector_weight = settings.search_vector_weight
+        if text_weight is None:
+            text_weight = settings.search_text_weight
         
-        # Combine results
         combined = {}
         
-        # Add vector results with weight 0.6
-        for result in vector_results:
-            key = f"{result['video_id']}_{result['start_ms']}"
-            combined[key] = {
-                **result,
-                "final_score": result["score"] * 0.6
-            }
-        
-        # Add text results with weight 0.4
-        for result in text_results:
-            key = f"{result['video_id']}_{result['start_ms']}"
-            if key in combined:
-                combined[key]["final_score"] += result["score"] * 0.4
+        for results, weight in ((vector_results, vector_weight), (text_results, text_weight)):
+            if mode == "rrf":
+                ranked = sorted(results, key=lambda x: x["score"], reverse=True)
+                contributions = [
+                    weight / (settings.search_rrf_k + rank)
+                    for rank in range(1, len(ranked) + 1)
+                ]
             else:
-                combined[key] = {
-                    **result,
-                    "final_score": result["score"] * 0.4
-                }
+                ranked = results
+                contributions = [score * weight for score in self._normalize_scores(results)]
+            
+            for result, contribution in zip(ranked, contributions):
+                key = self._result_key(result)
+                if key in combined:
+                    combined[key]["final_score"] += contribution
+                else:
+                    combined[key] = {
+                        **result,
+                        "final_score": contribution
+                    }
         
         return list(combined.values())
     
+    @staticmethod
+    def _result_key(result: dict) -> str:
+        """Key identifying the chunk a result points at."""
+        if result.get("chunk_id"):
+            return result["chunk_id"]
+        return f"{result['video_id']}_{result['start_ms']}"
+    
     def _group_by_video(
         self,
         results: list[dict],
@@ -249,39 +648,68 @@ class SearchService:
         self,
         results: list[dict]
     ) -> list[SearchResult]:
-        """Decorate results with metadata."""
-        # Get video metadata
-        video_ids = list(set(r["video_id"] for r in results))
-        
-        videos_data = {}
-        notes_data = {}
+        """Decorate results with metadata, loading each video concurrently."""
+        return (await self._decorate_batch([results]))[0]
+    
+    async def _decorate_batch(
+        self,
+        result_lists: list[list[dict]]
+    ) -> list[list[SearchResult]]:
+        """Decorate several result lists, loading each video once across all."""
+        positions_by_video = {}
+        for i, results in enumerate(result_lists):
+            for rank, result in enumerate(results):
+                positions_by_video.setdefault(result["video_id"], []).append((i, rank))
+        
+        per_video = await asyncio.gather(*(
+            self._decorate_video(video_id, [result_lists[i][rank] for i, rank in positions])
+            for video_id, positions in positions_by_video.items()
+        ))
+        
+        # Restore rank order
+        decorated = [[None] * len(results) for results in result_lists]
+        for positions, video_results in zip(positions_by_video.values(), per_video):
+            for (i, rank), result in zip(positions, video_results):
+                decorated[i][rank] = result
         
-        for video_id in video_ids:
-            video = await supabase.select(
+        return decorated
+    
+    async def _decorate_video(
+        self,
+        video_id: str,
+        results: list[dict]
+    ) -> list[SearchResult]:
+        """Decorate results from a single video with its metadata."""
+        # Get video metadata
+        video_rows, notes_rows = await asyncio.gather(
+            supabase.select(
                 "videos",
                 columns="id,title,platform,source_url,storage_path",
                 filters={"id": video_id},
                 limit=1
-            )
-            if video:
-                videos_data[video_id] = video[0]
-            
-            notes = await supabase.select(
+            ),
+            supabase.select(
                 "notes",
                 columns="keywords,chapters",
                 filters={"video_id": video_id},
                 limit=1
             )
-            if notes:
-                notes_data[video_id] = notes[0]
+        )
+        video = video_rows[0] if video_rows else {}
+        notes = notes_rows[0] if notes_rows else {}
+        
+        # Generate signed URL for preview
+        preview_url = None
+        if video.get("storage_path"):
+            try:
+                preview_url = await storage_service.generate_signed_url(
+                    video["storage_path"]
+                )
+            except Exception:
+                pass
         
-        # Decorate results
         decorated = []
         for result in results:
-            video_id = result["video_id"]
-            video = videos_data.get(video_id, {})
-            notes = notes_data.get(video_id, {})
-            
             # Generate deep link
             deep_link = self._generate_deep_link(
                 video.get("source_url", ""),
@@ -289,16 +717,6 @@ class SearchService:
                 result["start_ms"]
             )
             
-            # Generate signed URL for preview
-            preview_url = None
-            if video.get("storage_path"):
-                try:
-                    preview_url = await storage_service.generate_signed_url(
-                        video["storage_path"]
-                    )
-                except Exception:
-                    pass
-            
             # Find chapter title
             chapter_title = self._find_chapter(
                 notes.get("chapters", []),
@@ -323,35 +741,19 @@ class SearchService:
         return decorated
     
     @staticmethod
-    def _cosine_similarity(a: list[float], b: list[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        dot_product = sum(x * y for x, y in zip(a, b))
-        magnitude_a = sum(x * x for x in a) ** 0.5
-        magnitude_b = sum(x * x for x in b) ** 0.5
-        
-        if magnitude_a == 0 or magnitude_b == 0:
-            return 0.0
-        
-        return dot_product / (magnitude_a * magnitude_b)
-    
-    @staticmethod
-    def _normalize_scores(results: list[dict]) -> list[dict]:
-        """Normalize scores to [0, 1] range."""
+    def _normalize_scores(results: list[dict]) -> list[float]:
+        """Min-max normalize result scores to the [0, 1] range."""
         if not results:
-            return results
+            return []
         
         scores = [r["score"] for r in results]
         min_score = min(scores)
         max_score = max(scores)
         
         if max_score == min_score:
-            for r in results:
-                r["score"] = 1.0
-        else:
-            for r in results:
-                r["score"] = (r["score"] - min_score) / (max_score - min_score)
+            return [1.0] * len(scores)
         
-        return results
+        return [(score - min_score) / (max_score - min_score) for score in scores]
     
     @staticmethod
     def _generate_deep_link(
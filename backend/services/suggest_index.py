@@ -0,0 +1,372 @@
+"""In-memory prefix index for search-as-you-type suggestions."""
+
+import asyncio
+import heapq
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+
+from config import settings
+from supabase_client import supabase
+from services.search_cache import search_cache
+
+# Suggestion kinds, in tie-break order
+KINDS = ("title", "keyword", "chapter", "entity")
+
+# Entity groups from notes worth suggesting (URLs are not)
+ENTITY_GROUPS = ("people", "tools")
+
+# A term is findable from the start of each of its first words
+MAX_WORD_STARTS = 8
+MAX_KEY_LENGTH = 120
+
+# Sorts after every character, so (prefix + PREFIX_END,) bounds a prefix range
+PREFIX_END = chr(0x10FFFF)
+
+# Prefixes this short match much of the vocabulary, so their top suggestions
+# are precomputed instead of ranked per lookup
+SHORT_PREFIX_LENGTH = 2
+SHORT_PREFIX_TOP_K = 50
+
+# New videos above this count are loaded with one notes query, not one per video
+BULK_LOAD_THRESHOLD = 50
+
+
+@dataclass
+class Suggestion:
+    """A suggested completion."""
+    text: str
+    kind: str
+    video_count: int
+
+
+@dataclass
+class _Term:
+    """An indexed term and the videos it appears in."""
+    text: str
+    kind: str
+    video_ids: set[str] = field(default_factory=set)
+
+
+class SuggestIndex:
+    """
+    Prefix index over video titles, keywords, chapter titles and entities.
+    
+    Terms are stored in one sorted array of (key, kind, term) tuples, with a
+    key for every word start in the term, so "learn" finds both "Learning
+    Rust" and "Machine Learning". Lookups bisect both ends of the prefix
+    range, so every match is ranked, and never leave the process. Ranked
+    suggestions for one- and two-character prefixes, whose ranges span much
+    of the vocabulary, are kept precomputed and recomputed only for prefixes
+    whose terms changed. A background task keeps the index current by
+    watching the search corpus version.
+    """
+    
+    def __init__(self):
+        self._entries: list[tuple[str, str, str]] = []
+        self._terms: dict[tuple[str, str], _Term] = {}
+        self._video_terms: dict[str, set[tuple[str, str]]] = {}
+        self._short_top: dict[str, list[_Term]] = {}
+        self._stale_prefixes: set[str] = set()
+        self._version: int | None = None
+        self._last_full_build = 0.0
+        self._task: asyncio.Task | None = None
+    
+    def lookup(self, prefix: str, limit: int = 10) -> list[Suggestion]:
+        """
+        Find suggestions starting with a prefix.
+        
+        Args:
+            prefix: Typed text
+            limit: Maximum suggestions
+        
+        Returns:
+            Suggestions ranked by the number of videos they appear in
+        """
+        normalized = self._normalize(prefix)
+        if not normalized:
+            return []
+        
+        if len(normalized) <= SHORT_PREFIX_LENGTH and limit <= SHORT_PREFIX_TOP_K:
+            ranked = self._short_top.get(normalized)
+            if ranked is None:
+                ranked = self._short_top[normalized] = self._rank(normalized, SHORT_PREFIX_TOP_K)
+                self._stale_prefixes.discard(normalized)
+            ranked = ranked[:limit]
+        else:
+            ranked = self._rank(normalized, limit)
+        
+        return [
+            Suggestion(text=t.text, kind=t.kind, video_count=len(t.video_ids))
+            for t in ranked
+        ]
+    
+    def _rank(self, prefix: str, limit: int) -> list[_Term]:
+        """Top terms with an index key starting with a normalized prefix."""
+        entries = self._entries
+        start = bisect_left(entries, (prefix,))
+        end = bisect_left(entries, (prefix + PREFIX_END,), start)
+        
+        # A term is keyed once per word start, so several entries may share it
+        matches = {
+            (kind, term_key): self._terms[(kind, term_key)]
+            for _, kind, term_key in entries[start:end]
+        }
+        
+        return heapq.nsmallest(
+            limit,
+            matches.values(),
+            key=lambda t: (-len(t.video_ids), KINDS.index(t.kind), len(t.text))
+        )
+    
+    def _invalidate(self, term_key: str) -> None:
+        """Drop the precomputed short prefixes a term ranks under."""
+        for entry_key in self._entry_keys(term_key):
+            for length in range(1, min(len(entry_key), SHORT_PREFIX_LENGTH) + 1):
+                prefix = entry_key[:length]
+                self._short_top.pop(prefix, None)
+                self._stale_prefixes.add(prefix)
+    
+    def _warm_short_prefixes(self) -> None:
+        """Recompute the short prefixes invalidated since the last call."""
+        stale, self._stale_prefixes = self._stale_prefixes, set()
+        for prefix in stale:
+            self._short_top[prefix] = self._rank(prefix, SHORT_PREFIX_TOP_K)
+    
+    def add_video(
+        self,
+        video_id: str,
+        title: str | None,
+        notes: dict | None
+    ) -> None:
+        """
+        Index (or re-index) one video's terms.
+        
+        Args:
+            video_id: Video ID
+            title: Video title
+            notes: Notes row with keywords, chapters and entities
+        """
+        self.remove_video(video_id)
+        self._index_video(
+            video_id,
+            title,
+            notes,
+            lambda entry: insort(self._entries, entry)
+        )
+    
+    def remove_video(self, video_id: str) -> None:
+        """
+        Remove a video's terms from the index.
+        
+        Args:
+            video_id: Video ID
+        """
+        for key in self._video_terms.pop(video_id, ()):
+            term = self._terms[key]
+            term.video_ids.discard(video_id)
+            self._invalidate(key[1])
+            if term.video_ids:
+                continue
+            
+            # Last video using the term: drop it and its entries
+            del self._terms[key]
+            kind, term_key = key
+            for entry_key in self._entry_keys(term_key):
+                entry = (entry_key, kind, term_key)
+                i = bisect_left(self._entries, entry)
+                if i < len(self._entries) and self._entries[i] == entry:
+                    del self._entries[i]
+    
+    async def refresh_video(self, video_id: str) -> None:
+        """
+        Re-index one video from the database, e.g. after a tag edit.
+        
+        Args:
+            video_id: Video ID
+        """
+        video, notes = await asyncio.gather(
+            supabase.select(
+                "videos",
+                columns="id,title,status",
+                filters={"id": video_id},
+                limit=1
+            ),
+            self._load_notes(video_id)
+        )
+        
+        if not video or video[0]["status"] != "done":
+            self.remove_video(video_id)
+        else:
+            self.add_video(video_id, video[0].get("title"), notes)
+    
+    async def refresh(self) -> None:
+        """
+        Bring the index up to date with the corpus.
+        
+        Only runs when the corpus version changed. Newly done videos are
+        added and removed ones dropped; a full rebuild runs every
+        suggest_full_rebuild_seconds to pick up edits made on other replicas.
+        """
+        version = await search_cache.corpus_version()
+        full_build_due = time.monotonic() - self._last_full_build > settings.suggest_full_rebuild_seconds
+        
+        if version is not None and version == self._version and not full_build_due:
+            return
+        
+        videos = await supabase.select_all(
+            "videos",
+            columns="id,title",
+            filters={"status": "done"}
+        )
+        titles = {video["id"]: video.get("title") for video in videos}
+        
+        if full_build_due:
+            await self._rebuild(titles)
+        else:
+            new_ids = [video_id for video_id in titles if video_id not in self._video_terms]
+            removed_ids = [video_id for video_id in self._video_terms if video_id not in titles]
+            
+            if len(new_ids) > BULK_LOAD_THRESHOLD:
+                notes_by_video = await self._load_all_notes()
+            else:
+                loaded = await asyncio.gather(*(self._load_notes(video_id) for video_id in new_ids))
+                notes_by_video = dict(zip(new_ids, loaded))
+            
+            for video_id in removed_ids:
+                self.remove_video(video_id)
+            for video_id in new_ids:
+                self.add_video(video_id, titles[video_id], notes_by_video.get(video_id))
+            self._warm_short_prefixes()
+        
+        self._version = version
+    
+    async def start(self) -> None:
+        """Start the background refresh loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _refresh_loop(self) -> None:
+        """Refresh periodically; errors keep the previous index in service."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"❌ Suggest index refresh failed: {e}")
+            await asyncio.sleep(settings.suggest_refresh_seconds)
+    
+    async def _rebuild(self, titles: dict[str, str | None]) -> None:
+        """Build a fresh index off to the side and swap it in."""
+        notes_by_video = await self._load_all_notes()
+        
+        fresh = SuggestIndex()
+        for video_id, title in titles.items():
+            # Entries are sorted once at the end instead of inserted in order
+            fresh._index_video(video_id, title, notes_by_video.get(video_id), fresh._entries.append)
+        fresh._entries.sort()
+        
+        fresh._warm_short_prefixes()
+        
+        self._entries = fresh._entries
+        self._terms = fresh._terms
+        self._video_terms = fresh._video_terms
+        self._short_top = fresh._short_top
+        self._stale_prefixes = set()
+        self._last_full_build = time.monotonic()
+    
+    def _index_video(
+        self,
+        video_id: str,
+        title: str | None,
+        notes: dict | None,
+        add_entry
+    ) -> None:
+        """Add a video's terms, creating entries via add_entry for new terms."""
+        term_keys = set()
+        for kind, text in self._video_terms_from(title, notes):
+            term_key = self._normalize(text)
+            if not term_key:
+                continue
+            
+            key = (kind, term_key)
+            term = self._terms.get(key)
+            if term is None:
+                term = self._terms[key] = _Term(text=text.strip(), kind=kind)
+                for entry_key in self._entry_keys(term_key):
+                    add_entry((entry_key, kind, term_key))
+            
+            term.video_ids.add(video_id)
+            term_keys.add(key)
+            self._invalidate(term_key)
+        
+        self._video_terms[video_id] = term_keys
+    
+    @staticmethod
+    async def _load_notes(video_id: str) -> dict | None:
+        """Load one video's notes."""
+        notes = await supabase.select(
+            "notes",
+            columns="video_id,keywords,chapters,entities",
+            filters={"video_id": video_id},
+            limit=1
+        )
+        return notes[0] if notes else None
+    
+    @staticmethod
+    async def _load_all_notes() -> dict[str, dict]:
+        """Load notes for all videos, keyed by video ID."""
+        notes = await supabase.select_all(
+            "notes",
+            columns="id,video_id,keywords,chapters,entities"
+        )
+        return {row["video_id"]: row for row in notes}
+    
+    @staticmethod
+    def _video_terms_from(title: str | None, notes: dict | None) -> list[tuple[str, str]]:
+        """Extract (kind, text) terms from a video's title and notes."""
+        terms = []
+        if title:
+            terms.append(("title", title))
+        
+        notes = notes or {}
+        for keyword in notes.get("keywords") or []:
+            terms.append(("keyword", keyword))
+        for chapter in notes.get("chapters") or []:
+            if isinstance(chapter, dict) and chapter.get("title"):
+                terms.append(("chapter", chapter["title"]))
+        
+        entities = notes.get("entities") or {}
+        for group in ENTITY_GROUPS:
+            for entity in entities.get(group) or []:
+                if isinstance(entity, str):
+                    terms.append(("entity", entity))
+        
+        return [(kind, text) for kind, text in terms if isinstance(text, str)]
+    
+    @staticmethod
+    def _entry_keys(term_key: str) -> list[str]:
+        """Index keys for a term: the term from each of its first word starts."""
+        words = term_key.split(" ")
+        return [
+            " ".join(words[i:])[:MAX_KEY_LENGTH]
+            for i in range(min(len(words), MAX_WORD_STARTS))
+        ]
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Case-fold and collapse whitespace."""
+        return " ".join(text.casefold().split())
+
+
+# Global suggest index instance
+suggest_index = SuggestIndex()
@@ -1,9 +1,18 @@
 """Transcription service using Deepgram API."""
 
 import asyncio
+import hashlib
+import hmac
 import httpx
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import cached_property
+from itertools import accumulate, islice
+from operator import le
+from pathlib import Path
 from config import settings
+from services.audio_preprocessor import audio_preprocessor
+from services.media_inspector import MediaInspector
 
 
 @dataclass
@@ -14,22 +23,136 @@ class WordTimestamp:
     end_ms: int
 
 
+@dataclass
+class TranscriptWords:
+    """
+    Word timings stored as parallel arrays over a single text buffer.
+    
+    Word i spans text[offsets[i]:offsets[i + 1] - 1]; words are joined by
+    single spaces, so any run of words i..j is the slice
+    text[offsets[i]:offsets[j + 1] - 1] with no per-chunk join.
+    """
+    starts: list[int]
+    ends: list[int]
+    text: str
+    offsets: list[int]
+    
+    @cached_property
+    def ordered(self) -> bool:
+        """
+        Whether start and end times are both non-decreasing.
+        
+        Engines emit words in order, but a word may still end after the next
+        one. Checked once per transcript; shift() keeps the order.
+        """
+        return (
+            all(map(le, self.starts, islice(self.starts, 1, None)))
+            and all(map(le, self.ends, islice(self.ends, 1, None)))
+        )
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def word(self, i: int) -> str:
+        """Get the text of word i."""
+        return self.text[self.offsets[i]:self.offsets[i + 1] - 1]
+    
+    def span_text(self, first: int, last: int) -> str:
+        """Get the text of words first..last (inclusive)."""
+        return self.text[self.offsets[first]:self.offsets[last + 1] - 1]
+    
+    def shift(self, offset_ms: int) -> None:
+        """
+        Shift all word timings by a fixed offset.
+        
+        Used to map timestamps of trimmed or segmented audio back onto the
+        original media timeline.
+        
+        Args:
+            offset_ms: Offset to add in milliseconds
+        """
+        self.starts = [start + offset_ms for start in self.starts]
+        self.ends = [end + offset_ms for end in self.ends]
+    
+    def serialize(self) -> list[list]:
+        """
+        Serialize into a compact JSON-friendly form.
+        
+        Returns:
+            List of [word, start_ms, end_ms] triples
+        """
+        return [
+            [self.word(i), start, end]
+            for i, (start, end) in enumerate(zip(self.starts, self.ends))
+        ]
+    
+    @classmethod
+    def from_parts(
+        cls,
+        words: list[str],
+        starts: list[int],
+        ends: list[int]
+    ) -> "TranscriptWords":
+        """Build from parallel lists of words, start times and end times."""
+        offsets = list(accumulate((len(word) + 1 for word in words), initial=0))
+        return cls(starts=starts, ends=ends, text=" ".join(words), offsets=offsets)
+    
+    @classmethod
+    def from_word_timestamps(cls, words: list[WordTimestamp]) -> "TranscriptWords":
+        """Build from a list of WordTimestamp objects."""
+        return cls.from_parts(
+            [w.word for w in words],
+            [w.start_ms for w in words],
+            [w.end_ms for w in words],
+        )
+    
+    @classmethod
+    def from_serialized(cls, data: list[list] | None) -> "TranscriptWords":
+        """Build from persisted [word, start_ms, end_ms] triples."""
+        data = data or []
+        return cls.from_parts(
+            [w[0] for w in data],
+            [w[1] for w in data],
+            [w[2] for w in data],
+        )
+
+
 @dataclass
 class TranscriptResult:
     """Transcription result."""
     success: bool
     full_text: str | None = None
-    word_timestamps: list[WordTimestamp] | None = None
+    words: TranscriptWords | None = None
     language: str | None = None
     error_message: str | None = None
 
 
-class TranscriptionService:
+class TranscriptionBackend(ABC):
+    """Interface for engines that turn a local media file into a transcript."""
+    
+    name: str
+    
+    @abstractmethod
+    async def transcribe_file(self, file_path: Path) -> TranscriptResult:
+        """
+        Transcribe a local media file.
+        
+        Args:
+            file_path: Path to local audio or video file
+        
+        Returns:
+            TranscriptResult with full text and word timestamps
+        """
+
+
+class TranscriptionService(TranscriptionBackend):
     """Service for transcribing audio using Deepgram."""
     
+    name = "deepgram"
+    
     def __init__(self):
         self.api_key = settings.deepgram_api_key
-        self.base_url = "https://api.deepgram.com/v1/listen"
+        self.base_url = settings.deepgram_base_url
     
     async def transcribe(self, audio_url: str) -> TranscriptResult:
         """
@@ -41,10 +164,183 @@ class TranscriptionService:
         Returns:
             TranscriptResult with full text and word timestamps
         """
-        # Retry logic: 1 retry with 10-second delay
+        return await self._with_retry(lambda: self._transcribe_attempt(audio_url))
+    
+    async def transcribe_file(self, file_path: Path) -> TranscriptResult:
+        """
+        Transcribe a local audio file by uploading it to Deepgram.
+        
+        Args:
+            file_path: Path to local audio file
+        
+        Returns:
+            TranscriptResult with full text and word timestamps
+        """
+        return await self._with_retry(lambda: self._transcribe_file_attempt(file_path))
+    
+    async def submit_with_callback(self, audio_url: str, video_id: str) -> str | None:
+        """
+        Submit audio for asynchronous transcription.
+        
+        Deepgram accepts the request immediately and later POSTs the result to
+        the /webhooks/deepgram route, so no worker waits on the transcription.
+        
+        Args:
+            audio_url: Signed URL to audio file
+            video_id: Video the result belongs to
+        
+        Returns:
+            Deepgram request ID, or None if submission failed
+        """
+        headers = {
+            "Authorization": f"Token {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        
+        params = self._request_params()
+        params["callback"] = self.callback_url(video_id)
+        
         for attempt in range(2):
             try:
-                result = await self._transcribe_attempt(audio_url)
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.post(
+                        self.base_url,
+                        headers=headers,
+                        params=params,
+                        json={"url": audio_url},
+                    )
+                
+                if response.status_code == 200:
+                    return response.json().get("request_id")
+            except Exception:
+                pass
+            
+            if attempt == 0:
+                await asyncio.sleep(10)
+        
+        return None
+    
+    def callback_url(self, video_id: str) -> str:
+        """
+        Build the signed webhook URL Deepgram posts results to.
+        
+        Args:
+            video_id: Video the result belongs to
+        
+        Returns:
+            Callback URL carrying the video ID and its token
+        """
+        base_url = settings.public_base_url.rstrip("/")
+        token = self.callback_token(video_id)
+        return f"{base_url}/webhooks/deepgram?video_id={video_id}&token={token}"
+    
+    @staticmethod
+    def callback_token(video_id: str) -> str:
+        """HMAC token binding a callback URL to a video ID."""
+        return hmac.new(
+            settings.deepgram_callback_secret.encode(),
+            video_id.encode(),
+            hashlib.sha256
+        ).hexdigest()
+    
+    def verify_callback_token(self, video_id: str, token: str) -> bool:
+        """Check a callback token in constant time."""
+        if not settings.deepgram_callback_secret:
+            return False
+        return hmac.compare_digest(self.callback_token(video_id), token)
+    
+    async def transcribe_segmented(
+        self,
+        file_path: Path,
+        duration_seconds: int | None = None
+    ) -> TranscriptResult:
+        """
+        Transcribe a long local file as concurrent segments.
+        
+        The file is split near silence points into segments of about
+        transcription_segment_seconds, each padded with a small overlap. Segments
+        are transcribed concurrently, their word timestamps are shifted back
+        onto the file timeline, and words in the overlaps are de-duplicated by
+        keeping each word in the segment that owns its midpoint.
+        
+        Args:
+            file_path: Path to local audio file
+            duration_seconds: Fallback duration if the file cannot be inspected
+        
+        Returns:
+            TranscriptResult with full text and word timestamps
+        """
+        # The local file may be shorter than the source after silence trimming
+        media_info = await MediaInspector.inspect(file_path)
+        duration_seconds = media_info.duration_seconds or duration_seconds
+        if not duration_seconds:
+            return TranscriptResult(
+                success=False,
+                error_message="Unknown media duration for segmented transcription"
+            )
+        
+        boundaries = await self._plan_segments(file_path, duration_seconds)
+        overlap = settings.transcription_segment_overlap_seconds
+        semaphore = asyncio.Semaphore(settings.transcription_segment_concurrency)
+        
+        async def transcribe_segment(index: int) -> TranscriptResult:
+            start = max(0.0, boundaries[index] - overlap)
+            end = boundaries[index + 1] + overlap
+            segment_path = file_path.with_name(f"{file_path.stem}.seg{index}.ogg")
+            
+            async with semaphore:
+                try:
+                    if not await self._extract_segment(file_path, segment_path, start, end - start):
+                        return TranscriptResult(
+                            success=False,
+                            error_message=f"Failed to extract segment {index}"
+                        )
+                    
+                    result = await self._with_retry(
+                        lambda: self._transcribe_file_attempt(segment_path)
+                    )
+                finally:
+                    segment_path.unlink(missing_ok=True)
+            
+            if result.success and result.words:
+                result.words.shift(int(start * 1000))
+            return result
+        
+        results = await asyncio.gather(*(
+            transcribe_segment(i) for i in range(len(boundaries) - 1)
+        ))
+        
+        failed = next((r for r in results if not r.success), None)
+        if failed:
+            return failed
+        
+        # Stitch segments, keeping each word in the segment owning its midpoint
+        words, starts, ends = [], [], []
+        for i, result in enumerate(results):
+            owner_start_ms = boundaries[i] * 1000 if i > 0 else float("-inf")
+            owner_end_ms = boundaries[i + 1] * 1000 if i < len(results) - 1 else float("inf")
+            segment_words = result.words or TranscriptWords.from_parts([], [], [])
+            
+            for j, (start_ms, end_ms) in enumerate(zip(segment_words.starts, segment_words.ends)):
+                midpoint_ms = (start_ms + end_ms) / 2
+                if owner_start_ms <= midpoint_ms < owner_end_ms:
+                    words.append(segment_words.word(j))
+                    starts.append(start_ms)
+                    ends.append(end_ms)
+        
+        stitched = TranscriptWords.from_parts(words, starts, ends)
+        return TranscriptResult(
+            success=True,
+            full_text=stitched.text,
+            words=stitched,
+            language=results[0].language,
+        )
+    
+    async def _with_retry(self, attempt_fn) -> TranscriptResult:
+        """Run a transcription attempt with 1 retry after a 10-second delay."""
+        for attempt in range(2):
+            try:
+                result = await attempt_fn()
                 if result.success:
                     return result
                 
@@ -64,21 +360,83 @@ class TranscriptionService:
         
         return TranscriptResult(success=False, error_message="Transcription failed")
     
-    async def _transcribe_attempt(self, audio_url: str) -> TranscriptResult:
-        """Single transcription attempt."""
-        headers = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "application/json",
-        }
+    async def _plan_segments(self, file_path: Path, duration_seconds: int) -> list[float]:
+        """
+        Choose segment boundaries in seconds, preferring silence midpoints.
         
-        # Request parameters
-        params = {
+        Returns:
+            Sorted boundaries starting at 0 and ending at the file duration
+        """
+        target = settings.transcription_segment_seconds
+        search_window = target / 10
+        
+        silences = await audio_preprocessor.detect_silences(file_path, min_silence_seconds=0.3)
+        midpoints = [
+            (start + (end if end is not None else duration_seconds)) / 2
+            for start, end in silences
+        ]
+        
+        boundaries = [0.0]
+        while duration_seconds - boundaries[-1] > target * 1.5:
+            ideal = boundaries[-1] + target
+            candidates = [m for m in midpoints if abs(m - ideal) <= search_window]
+            boundaries.append(min(candidates, key=lambda m: abs(m - ideal)) if candidates else ideal)
+        boundaries.append(float(duration_seconds))
+        
+        return boundaries
+    
+    @staticmethod
+    async def _extract_segment(
+        input_file: Path,
+        output_file: Path,
+        start_seconds: float,
+        duration_seconds: float
+    ) -> bool:
+        """Cut a segment as mono 16 kHz Opus with sample-accurate start."""
+        cmd = [
+            "ffmpeg",
+            "-v", "quiet",
+            "-i", str(input_file),
+            "-ss", f"{start_seconds:.3f}",
+            "-t", f"{duration_seconds:.3f}",
+            "-vn",
+            "-ac", "1",
+            "-ar", "16000",
+            "-c:a", "libopus",
+            "-b:a", "32k",
+            "-y",  # Overwrite output file
+            str(output_file)
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            
+            await process.communicate()
+            
+            return process.returncode == 0 and output_file.exists()
+        except Exception:
+            return False
+    
+    def _request_params(self) -> dict:
+        """Deepgram request parameters."""
+        return {
             "model": "nova-2",
             "smart_format": "true",
             "punctuate": "true",
             "utterances": "true",
             "diarize": "false",
         }
+    
+    async def _transcribe_attempt(self, audio_url: str) -> TranscriptResult:
+        """Single transcription attempt."""
+        headers = {
+            "Authorization": f"Token {self.api_key}",
+            "Content-Type": "application/json",
+        }
         
         payload = {
             "url": audio_url
@@ -88,57 +446,113 @@ class TranscriptionService:
             response = await client.post(
                 self.base_url,
                 headers=headers,
-                params=params,
+                params=self._request_params(),
                 json=payload,
             )
             
-            if response.status_code != 200:
-                return TranscriptResult(
-                    success=False,
-                    error_message=f"Deepgram API error: {response.status_code}"
-                )
-            
-            data = response.json()
-            
-            # Extract transcript
-            results = data.get("results", {})
-            channels = results.get("channels", [])
-            
-            if not channels:
-                return TranscriptResult(
-                    success=False,
-                    error_message="No transcript data in response"
-                )
-            
-            alternatives = channels[0].get("alternatives", [])
-            if not alternatives:
-                return TranscriptResult(
-                    success=False,
-                    error_message="No alternatives in response"
+            return self._parse_response(response)
+    
+    async def _transcribe_file_attempt(self, file_path: Path) -> TranscriptResult:
+        """Single transcription attempt uploading a local audio file."""
+        headers = {
+            "Authorization": f"Token {self.api_key}",
+            "Content-Type": "audio/ogg",
+        }
+        
+        async with httpx.AsyncClient(timeout=300.0) as client:
+            with open(file_path, "rb") as f:
+                response = await client.post(
+                    self.base_url,
+                    headers=headers,
+                    params=self._request_params(),
+                    content=f.read(),
                 )
             
-            alternative = alternatives[0]
-            full_text = alternative.get("transcript", "")
-            
-            # Extract word timestamps
-            word_timestamps = []
-            for word_data in alternative.get("words", []):
-                word_timestamps.append(WordTimestamp(
-                    word=word_data.get("word", ""),
-                    start_ms=int(word_data.get("start", 0) * 1000),
-                    end_ms=int(word_data.get("end", 0) * 1000),
-                ))
-            
-            # Detect language
-            language = results.get("channels", [{}])[0].get("detected_language")
-            
+            return self._parse_response(response)
+    
+    @classmethod
+    def _parse_response(cls, response: httpx.Response) -> TranscriptResult:
+        """Parse a Deepgram response into a TranscriptResult."""
+        if response.status_code != 200:
             return TranscriptResult(
-                success=True,
-                full_text=full_text,
-                word_timestamps=word_timestamps,
-                language=language,
+                success=False,
+                error_message=f"Deepgram API error: {response.status_code}"
             )
+        
+        return cls.parse_result(response.json())
+    
+    @staticmethod
+    def parse_result(data: dict) -> TranscriptResult:
+        """
+        Parse a Deepgram result body into a TranscriptResult.
+        
+        Used for both synchronous responses and callback payloads.
+        
+        Args:
+            data: Deepgram JSON result
+        
+        Returns:
+            TranscriptResult with full text and word timestamps
+        """
+        if data.get("err_code") or data.get("error"):
+            return TranscriptResult(
+                success=False,
+                error_message=f"Deepgram error: {data.get('err_msg') or data.get('error')}"
+            )
+        
+        # Extract transcript
+        results = data.get("results", {})
+        channels = results.get("channels", [])
+        
+        if not channels:
+            return TranscriptResult(
+                success=False,
+                error_message="No transcript data in response"
+            )
+        
+        alternatives = channels[0].get("alternatives", [])
+        if not alternatives:
+            return TranscriptResult(
+                success=False,
+                error_message="No alternatives in response"
+            )
+        
+        alternative = alternatives[0]
+        full_text = alternative.get("transcript", "")
+        
+        # Extract word timestamps straight into the arrays the chunker reads;
+        # prefer the punctuated form so chunking can find sentence ends
+        word_data = alternative.get("words", [])
+        words = TranscriptWords.from_parts(
+            [w.get("punctuated_word") or w.get("word", "") for w in word_data],
+            [int(w.get("start", 0) * 1000) for w in word_data],
+            [int(w.get("end", 0) * 1000) for w in word_data],
+        )
+        
+        # Detect language
+        language = results.get("channels", [{}])[0].get("detected_language")
+        
+        return TranscriptResult(
+            success=True,
+            full_text=full_text,
+            words=words,
+            language=language,
+        )
 
 
 # Global transcription service instance
 transcription_service = TranscriptionService()
+
+
+def get_transcription_backend() -> TranscriptionBackend:
+    """
+    Get the transcription backend selected by settings.
+    
+    Returns:
+        Deepgram service, or the local CPU backend when configured
+    """
+    if settings.transcription_backend == "local":
+        from services.local_transcription import local_transcription_backend
+        return local_transcription_backend
+    
+    return transcription_service
@@ -0,0 +1,1124 @@
+"""In-process approximate nearest-neighbour index over chunk embeddings."""
+
+import asyncio
+import copy
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from config import settings
+from supabase_client import supabase
+from services.embeddings import get_active_embedding_provider
+from services.quantization import decode_q8, dequantize_int8, quantize_int8
+
+# Training sample per list for k-means; more adds build time, not recall
+TRAIN_POINTS_PER_LIST = 256
+
+# Rows scored per matrix product when assigning vectors to lists
+ASSIGN_BLOCK = 65536
+
+# Snapshot layout: version directories and a pointer file naming the current one
+SNAPSHOT_POINTER = "CURRENT"
+SNAPSHOT_VERSION_PREFIX = "v-"
+SNAPSHOT_FILES = (
+    "centroids.npy", "offsets.npy", "vectors.npy", "scales.npy",
+    "ids.npy", "video_codes.npy", "videos.npy", "meta.json",
+)
+
+
+def parse_vector(value) -> np.ndarray | None:
+    """Parse a pgvector value, which PostgREST returns as a "[...]" string."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so inner product is cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@dataclass(frozen=True)
+class _Delta:
+    """Vectors inserted since the build, replaced as a whole on each insert."""
+    vectors: np.ndarray
+    lists: np.ndarray
+    codes: np.ndarray
+    ids: list[str]
+    
+    @classmethod
+    def empty(cls, dimension: int) -> "_Delta":
+        """Delta with no vectors."""
+        return cls(
+            vectors=np.zeros((0, dimension), dtype=np.float32),
+            lists=np.zeros(0, dtype=np.int32),
+            codes=np.zeros(0, dtype=np.int32),
+            ids=[],
+        )
+
+
+class IVFIndex:
+    """
+    Inverted-file index: vectors bucketed by their nearest k-means centroid.
+    
+    A query scores the centroids, then only the vectors in the nprobe
+    closest lists, so latency depends on list size rather than corpus
+    size. nprobe trades recall for latency; nprobe >= nlist is exact.
+    Vectors are stored sorted by list, so each list is one contiguous slice
+    of a matrix that can be memory-mapped from disk. Stored vectors may be
+    float32, float16, or int8 with a per-vector scale.
+    
+    Inserts after the build go to a small in-memory delta, assigned to the
+    existing centroids and searched with their list. Re-inserting a video
+    replaces its vectors: the old rows are masked out and the video gets a
+    new code.
+    """
+    
+    def __init__(
+        self,
+        model_id: str,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        video_codes: np.ndarray,
+        videos: list[str],
+        build_id: str | None = None,
+        merged_changes: list[str] | None = None,
+        scales: np.ndarray | None = None,
+    ):
+        """
+        Initialize from prebuilt arrays (see build() and load()).
+        
+        Args:
+            model_id: Embedding model of the vectors
+            centroids: (nlist, d) normalized list centroids
+            offsets: (nlist + 1,) start row of each list in vectors
+            vectors: (n, d) normalized vectors, sorted by list
+            ids: (n,) chunk IDs
+            video_codes: (n,) index into videos for each row
+            videos: Video IDs
+            build_id: Identity of the build the arrays came from
+            merged_changes: Change log entries already reflected in the arrays
+            scales: (n,) per-vector scales when vectors are int8 codes
+        """
+        self.model_id = model_id
+        self.centroids = centroids
+        self.offsets = offsets
+        self.vectors = vectors
+        self.scales = scales
+        self.ids = ids
+        self.video_codes = video_codes
+        self.videos = list(videos)
+        self.build_id = build_id or uuid.uuid4().hex
+        self.merged_changes = list(merged_changes or [])
+        self._video_index = {video_id: code for code, video_id in enumerate(self.videos)}
+        
+        # Replaced rather than mutated, so searches in other threads see a
+        # consistent state
+        self._removed_codes: frozenset[int] = frozenset()
+        self._delta = _Delta.empty(self.dimension)
+    
+    @property
+    def dimension(self) -> int:
+        """Vector dimension."""
+        return self.centroids.shape[1]
+    
+    @property
+    def nlist(self) -> int:
+        """Number of inverted lists."""
+        return self.centroids.shape[0]
+    
+    def __len__(self) -> int:
+        return len(self.ids) + len(self._delta.ids)
+    
+    @property
+    def delta_size(self) -> int:
+        """Vectors inserted since the build."""
+        return len(self._delta.ids)
+    
+    def has_video(self, video_id: str) -> bool:
+        """Check whether a video's vectors are in the index."""
+        code = self._video_index.get(video_id)
+        return code is not None and code not in self._removed_codes
+    
+    def indexed_videos(self) -> set[str]:
+        """IDs of all videos with vectors in the index."""
+        return {
+            video_id for video_id, code in self._video_index.items()
+            if code not in self._removed_codes
+        }
+    
+    @classmethod
+    def build(
+        cls,
+        model_id: str,
+        ids: list[str],
+        video_ids: list[str],
+        vectors: np.ndarray,
+        nlist: int = 0,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Train centroids with spherical k-means and bucket the vectors.
+        
+        Args:
+            model_id: Embedding model of the vectors
+            ids: Chunk ID per row
+            video_ids: Video ID per row
+            vectors: (n, d) embedding matrix
+            nlist: Number of lists (0: about sqrt(n))
+            iterations: k-means iterations
+            seed: Random seed for reproducible builds
+        
+        Returns:
+            Built index
+        """
+        vectors = _normalize_rows(vectors)
+        n = len(vectors)
+        if nlist <= 0:
+            nlist = int(np.sqrt(n))
+        nlist = max(1, min(nlist, n))
+        
+        rng = np.random.default_rng(seed)
+        centroids = cls._train(vectors, nlist, iterations, rng)
+        assignments = cls._assign(vectors, centroids)
+        
+        order = np.argsort(assignments, kind="stable")
+        offsets = np.searchsorted(assignments[order], np.arange(nlist + 1)).astype(np.int64)
+        
+        videos, video_codes = np.unique(np.asarray(video_ids, dtype=str), return_inverse=True)
+        
+        return cls(
+            model_id=model_id,
+            centroids=centroids,
+            offsets=offsets,
+            vectors=vectors[order],
+            ids=np.asarray(ids, dtype=str)[order],
+            video_codes=video_codes.astype(np.int32)[order],
+            videos=videos.tolist(),
+        )
+    
+    def copy(self) -> "IVFIndex":
+        """
+        Copy that can be changed without affecting searches on this index.
+        
+        Arrays, the delta and the removed codes are never written in place,
+        so they are shared; only the video bookkeeping is duplicated.
+        """
+        index = copy.copy(self)
+        index.videos = list(self.videos)
+        index.merged_changes = list(self.merged_changes)
+        index._video_index = dict(self._video_index)
+        return index
+    
+    def add(self, ids: list[str], video_ids: list[str], vectors: np.ndarray) -> None:
+        """
+        Insert vectors without retraining, each into its nearest list.
+        
+        Args:
+            ids: Chunk ID per row
+            video_ids: Video ID per row
+            vectors: (n, d) embedding matrix
+        """
+        if not len(ids):
+            return
+        
+        vectors = _normalize_rows(vectors)
+        codes = np.empty(len(video_ids), dtype=np.int32)
+        for i, video_id in enumerate(video_ids):
+            code = self._video_index.get(video_id)
+            if code is None or code in self._removed_codes:
+                # New code, so the video's removed rows stay hidden
+                self.videos.append(video_id)
+                code = self._video_index[video_id] = len(self.videos) - 1
+            codes[i] = code
+        
+        delta = self._delta
+        self._delta = _Delta(
+            vectors=np.concatenate([delta.vectors, vectors]),
+            lists=np.concatenate([delta.lists, self._assign(vectors, self.centroids)]),
+            codes=np.concatenate([delta.codes, codes]),
+            ids=delta.ids + list(ids),
+        )
+    
+    def replace_videos(
+        self,
+        video_ids: list[str],
+        chunk_ids: list[str],
+        chunk_video_ids: list[str],
+        vectors: np.ndarray
+    ) -> None:
+        """
+        Replace all vectors of some videos.
+        
+        Args:
+            video_ids: Videos whose previous vectors are dropped
+            chunk_ids: Chunk ID per new row
+            chunk_video_ids: Video ID per new row
+            vectors: (n, d) new embedding matrix
+        """
+        for video_id in video_ids:
+            self.remove_video(video_id)
+        self.add(chunk_ids, chunk_video_ids, vectors)
+    
+    def remove_video(self, video_id: str) -> None:
+        """
+        Hide a video's vectors from searches.
+        
+        Args:
+            video_id: Video ID
+        """
+        code = self._video_index.get(video_id)
+        if code is not None:
+            self._removed_codes = self._removed_codes | {code}
+    
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: int | None = None,
+        allowed_video_ids: list[str] | None = None,
+    ) -> list[tuple[str, str, float]]:
+        """
+        Find the k nearest chunks by cosine similarity.
+        
+        With a video filter, lists are probed beyond nprobe until k allowed
+        vectors were scored, so selective filters still fill the top k.
+        
+        Args:
+            query: Query embedding
+            k: Number of results
+            nprobe: Lists to probe (default from settings)
+            allowed_video_ids: Only return chunks of these videos
+        
+        Returns:
+            (chunk_id, video_id, similarity) tuples, best first
+        """
+        if nprobe is None:
+            nprobe = settings.vector_index_nprobe
+        
+        query = _normalize_rows(query)
+        allowed = None
+        if allowed_video_ids is not None:
+            codes = [self._video_index.get(video_id) for video_id in allowed_video_ids]
+            allowed = np.array(sorted(c for c in codes if c is not None), dtype=np.int32)
+            if not len(allowed):
+                return []
+        
+        delta = self._delta
+        removed_codes = self._removed_codes
+        removed = np.fromiter(removed_codes, dtype=np.int32) if removed_codes else None
+        
+        list_order = np.argsort(-(self.centroids @ query))
+        scores = []
+        rows = []
+        found = 0
+        probed = 0
+        
+        for lst in list_order:
+            if probed >= nprobe and found >= k:
+                break
+            probed += 1
+            start, end = self.offsets[lst], self.offsets[lst + 1]
+            if start == end:
+                continue
+            
+            # float16 snapshots are upcast one list at a time
+            list_scores = np.asarray(self.vectors[start:end] @ query, dtype=np.float32)
+            if self.scales is not None:
+                list_scores *= self.scales[start:end]
+            list_rows = np.arange(start, end)
+            keep = self._keep(self.video_codes[start:end], allowed, removed)
+            if keep is not None:
+                list_scores = list_scores[keep]
+                list_rows = list_rows[keep]
+            
+            scores.append(list_scores)
+            rows.append(list_rows)
+            found += len(list_rows)
+        
+        # Inserted vectors of the probed lists
+        if delta.ids:
+            in_probed = np.isin(delta.lists, list_order[:probed])
+            keep = self._keep(delta.codes, allowed, removed)
+            if keep is not None:
+                in_probed &= keep
+            delta_rows = np.flatnonzero(in_probed)
+            scores.append(delta.vectors[delta_rows] @ query)
+            rows.append(delta_rows + len(self.ids))
+        
+        return self._top_k(delta, scores, rows, k)
+    
+    def search_batch(
+        self,
+        queries: np.ndarray,
+        k: int,
+        nprobe: int | None = None
+    ) -> list[list[tuple[str, str, float]]]:
+        """
+        Find the k nearest chunks for many queries at once.
+        
+        Centroids are scored for all queries in one matrix product, and each
+        probed list against every query probing it in another, so a list is
+        read once per batch instead of once per query.
+        
+        Args:
+            queries: (m, d) query embeddings
+            k: Number of results per query
+            nprobe: Lists to probe per query (default from settings)
+        
+        Returns:
+            Per query, (chunk_id, video_id, similarity) tuples, best first
+        """
+        if nprobe is None:
+            nprobe = settings.vector_index_nprobe
+        
+        queries = _normalize_rows(queries)
+        delta = self._delta
+        removed_codes = self._removed_codes
+        removed = np.fromiter(removed_codes, dtype=np.int32) if removed_codes else None
+        
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :nprobe]
+        scores = [[] for _ in queries]
+        rows = [[] for _ in queries]
+        
+        for lst in np.unique(probes):
+            start, end = self.offsets[lst], self.offsets[lst + 1]
+            if start == end:
+                continue
+            probing = np.flatnonzero((probes == lst).any(axis=1))
+            
+            block = np.asarray(self.vectors[start:end] @ queries[probing].T, dtype=np.float32)
+            if self.scales is not None:
+                block *= self.scales[start:end, None]
+            list_rows = np.arange(start, end)
+            keep = self._keep(self.video_codes[start:end], None, removed)
+            if keep is not None:
+                block = block[keep]
+                list_rows = list_rows[keep]
+            
+            for column, q in enumerate(probing):
+                scores[q].append(block[:, column])
+                rows[q].append(list_rows)
+        
+        if delta.ids:
+            delta_block = delta.vectors @ queries.T
+            keep = self._keep(delta.codes, None, removed)
+            for q in range(len(queries)):
+                in_probed = np.isin(delta.lists, probes[q])
+                if keep is not None:
+                    in_probed &= keep
+                delta_rows = np.flatnonzero(in_probed)
+                scores[q].append(delta_block[delta_rows, q])
+                rows[q].append(delta_rows + len(self.ids))
+        
+        results = []
+        for q, query in enumerate(queries):
+            if sum(len(r) for r in rows[q]) < k and nprobe < self.nlist:
+                # Probed lists too small: widen this query alone
+                results.append(self.search(query, k, nprobe))
+            else:
+                results.append(self._top_k(delta, scores[q], rows[q], k))
+        return results
+    
+    def compact(self) -> "IVFIndex":
+        """
+        Merge inserted vectors into the lists and drop removed videos.
+        
+        Centroids are kept; rebuild to retrain them after large growth.
+        
+        Returns:
+            New index with an empty delta
+        """
+        delta = self._delta
+        removed_codes = self._removed_codes
+        lists = np.concatenate([
+            np.repeat(np.arange(self.nlist, dtype=np.int32), np.diff(self.offsets)),
+            delta.lists,
+        ])
+        codes = np.concatenate([np.asarray(self.video_codes), delta.codes])
+        ids = np.concatenate([np.asarray(self.ids), np.asarray(delta.ids, dtype=str)])
+        vectors = np.concatenate([self.float_vectors(), delta.vectors])
+        
+        rows = np.arange(len(lists))
+        if removed_codes:
+            rows = rows[~np.isin(codes, np.fromiter(removed_codes, dtype=np.int32))]
+        rows = rows[np.argsort(lists[rows], kind="stable")]
+        
+        # Renumber codes so dropped videos and replaced generations go away
+        present, codes = np.unique(codes[rows], return_inverse=True)
+        
+        return IVFIndex(
+            model_id=self.model_id,
+            centroids=self.centroids,
+            offsets=np.searchsorted(lists[rows], np.arange(self.nlist + 1)).astype(np.int64),
+            vectors=vectors[rows],
+            ids=ids[rows],
+            video_codes=codes.astype(np.int32),
+            videos=[self.videos[code] for code in present],
+            merged_changes=self.merged_changes,
+        )
+    
+    def float_vectors(self) -> np.ndarray:
+        """Stored vectors as a float32 matrix (dequantized if int8)."""
+        if self.scales is not None:
+            return dequantize_int8(self.vectors, self.scales)
+        return np.asarray(self.vectors, dtype=np.float32)
+    
+    def save(self, path: Path, dtype: str | None = None) -> None:
+        """
+        Write the index as a new snapshot version and make it current.
+        
+        The snapshot is plain .npy files: the vector matrix sorted by list,
+        with chunk IDs and video codes as sidecar arrays. Each save writes a
+        fresh version directory under path and then replaces the CURRENT
+        pointer file naming it in one os.replace, so a loader that resolved
+        the pointer reads every file from the same version. The version the
+        pointer named before is kept for loaders still reading it; older ones
+        are removed. Readers that already memory-mapped removed files keep
+        working.
+        
+        Args:
+            path: Index directory
+            dtype: Stored vector type, "float32", "float16" or "int8" (default
+                from settings); float16 halves the file and page cache
+                footprint, int8 with per-vector scales quarters it
+        """
+        dtype = dtype or settings.vector_snapshot_dtype
+        index = self.compact() if self._delta.ids or self._removed_codes else self
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        version = f"{SNAPSHOT_VERSION_PREFIX}{time.time_ns()}-{os.getpid()}"
+        staging = path / f".{version}"
+        staging.mkdir()
+        
+        np.save(staging / "centroids.npy", index.centroids)
+        np.save(staging / "offsets.npy", index.offsets)
+        if dtype == "int8":
+            codes, scales = quantize_int8(index.float_vectors())
+            np.save(staging / "vectors.npy", codes)
+            np.save(staging / "scales.npy", scales)
+        else:
+            np.save(staging / "vectors.npy", np.ascontiguousarray(index.float_vectors(), dtype=dtype))
+        np.save(staging / "ids.npy", np.asarray(index.ids))
+        np.save(staging / "video_codes.npy", np.asarray(index.video_codes))
+        np.save(staging / "videos.npy", np.asarray(index.videos, dtype=str))
+        (staging / "meta.json").write_text(json.dumps({
+            "model_id": index.model_id,
+            "build_id": index.build_id,
+            "count": len(index.ids),
+            "dimension": index.dimension,
+            "nlist": index.nlist,
+            "dtype": dtype,
+            "merged_changes": index.merged_changes,
+            "built_at": time.time(),
+        }))
+        staging.rename(path / version)
+        
+        previous = IVFIndex._resolve(path)
+        pointer = path / f".{SNAPSHOT_POINTER}.{version}"
+        pointer.write_text(version)
+        os.replace(pointer, path / SNAPSHOT_POINTER)
+        
+        # Files of the pre-versioning layout, read only when no pointer existed
+        for name in SNAPSHOT_FILES:
+            (path / name).unlink(missing_ok=True)
+        for entry in path.iterdir():
+            if entry.name.startswith(SNAPSHOT_VERSION_PREFIX) and entry not in (path / version, previous):
+                shutil.rmtree(entry, ignore_errors=True)
+    
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "IVFIndex":
+        """
+        Load the current index written by save().
+        
+        Args:
+            path: Index directory
+            mmap: Memory-map the vector and ID arrays read-only instead of
+                reading them, so startup is a file open and the pages are
+                shared between processes
+        
+        Returns:
+            Loaded index
+        """
+        path = cls._resolve(Path(path))
+        mmap_mode = "r" if mmap else None
+        meta = json.loads((path / "meta.json").read_text())
+        scales_path = path / "scales.npy"
+        
+        return cls(
+            model_id=meta["model_id"],
+            centroids=np.load(path / "centroids.npy"),
+            offsets=np.load(path / "offsets.npy"),
+            vectors=np.load(path / "vectors.npy", mmap_mode=mmap_mode),
+            ids=np.load(path / "ids.npy", mmap_mode=mmap_mode),
+            video_codes=np.load(path / "video_codes.npy", mmap_mode=mmap_mode),
+            videos=np.load(path / "videos.npy").tolist(),
+            build_id=meta["build_id"],
+            merged_changes=meta.get("merged_changes"),
+            scales=np.load(scales_path, mmap_mode=mmap_mode) if scales_path.exists() else None,
+        )
+    
+    @staticmethod
+    def read_build_id(path: Path) -> str | None:
+        """Build ID of the current index on disk, or None if there is none."""
+        try:
+            return json.loads((IVFIndex._resolve(Path(path)) / "meta.json").read_text())["build_id"]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    @staticmethod
+    def _resolve(path: Path) -> Path:
+        """Version directory the pointer names, or path itself for old snapshots."""
+        try:
+            return path / (path / SNAPSHOT_POINTER).read_text().strip()
+        except FileNotFoundError:
+            return path
+    
+    def _top_k(
+        self,
+        delta: _Delta,
+        scores: list[np.ndarray],
+        rows: list[np.ndarray],
+        k: int
+    ) -> list[tuple[str, str, float]]:
+        """Best k of the scored rows, resolved to (chunk_id, video_id, score)."""
+        if not scores:
+            return []
+        
+        scores = np.concatenate(scores)
+        rows = np.concatenate(rows)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            scores, rows = scores[top], rows[top]
+        order = np.argsort(-scores, kind="stable")
+        
+        return [self._row(delta, int(rows[i]), float(scores[i])) for i in order]
+    
+    def _row(self, delta: _Delta, row: int, score: float) -> tuple[str, str, float]:
+        """Resolve a main or delta row to (chunk_id, video_id, score)."""
+        n = len(self.ids)
+        if row < n:
+            return str(self.ids[row]), self.videos[self.video_codes[row]], score
+        row -= n
+        return delta.ids[row], self.videos[delta.codes[row]], score
+    
+    @staticmethod
+    def _keep(
+        codes: np.ndarray,
+        allowed: np.ndarray | None,
+        removed: np.ndarray | None
+    ) -> np.ndarray | None:
+        """Mask of rows passing the video filter, or None to keep all."""
+        keep = None
+        if allowed is not None:
+            keep = np.isin(codes, allowed)
+        if removed is not None:
+            not_removed = ~np.isin(codes, removed)
+            keep = not_removed if keep is None else keep & not_removed
+        return keep
+    
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid of each vector, in blocks to bound memory."""
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_BLOCK):
+            block = vectors[start:start + ASSIGN_BLOCK]
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return assignments
+    
+    @classmethod
+    def _train(
+        cls,
+        vectors: np.ndarray,
+        nlist: int,
+        iterations: int,
+        rng: np.random.Generator
+    ) -> np.ndarray:
+        """Spherical k-means on a sample of the vectors."""
+        sample_size = min(len(vectors), nlist * TRAIN_POINTS_PER_LIST)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        
+        for _ in range(iterations):
+            assignments = cls._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=nlist)
+            
+            # Reseed empty lists with random sample points
+            empty = np.flatnonzero(counts == 0)
+            sums[empty] = sample[rng.choice(sample_size, len(empty))]
+            centroids = _normalize_rows(sums)
+        
+        return centroids
+
+
+@dataclass
+class VectorChange:
+    """One change log entry: the full new vector set of some videos."""
+    name: str
+    model_id: str
+    video_ids: list[str]
+    chunk_ids: list[str]
+    chunk_video_ids: list[str]
+    vectors: np.ndarray
+
+
+class VectorChangeLog:
+    """
+    Append-only log of vector changes next to the index snapshot.
+    
+    Workers append one entry per batch of finished or re-chunked videos;
+    API processes apply entries they have not seen on top of the snapshot.
+    Each entry replaces the vectors of its videos, so applying an entry
+    twice is harmless. Once the log grows past vector_snapshot_compact_entries,
+    the appending worker folds it into a new snapshot.
+    """
+    
+    def __init__(self, snapshot_path: str | Path | None = None):
+        self.snapshot_path = Path(snapshot_path or settings.vector_index_path)
+        self.path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.changes")
+        self.lock_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.lock")
+        self.build_lock_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.build.lock")
+    
+    def append(
+        self,
+        model_id: str,
+        video_ids: list[str],
+        chunk_ids: list[str],
+        chunk_video_ids: list[str],
+        vectors: np.ndarray
+    ) -> str:
+        """
+        Append an entry replacing the vectors of some videos.
+        
+        Args:
+            model_id: Embedding model of the vectors
+            video_ids: Videos the entry replaces
+            chunk_ids: Chunk ID per row
+            chunk_video_ids: Video ID per row
+            vectors: (n, d) embedding matrix
+        
+        Returns:
+            Entry name
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        staging = self.path / f".{name}.npz"
+        
+        with open(staging, "wb") as f:
+            np.savez(
+                f,
+                model_id=np.asarray(model_id),
+                video_ids=np.asarray(video_ids, dtype=str),
+                chunk_ids=np.asarray(chunk_ids, dtype=str),
+                chunk_video_ids=np.asarray(chunk_video_ids, dtype=str),
+                vectors=np.asarray(vectors, dtype=np.float32),
+            )
+        
+        # Readers only list complete entries
+        staging.rename(self.path / f"{name}.npz")
+        return name
+    
+    def entries(self) -> list[str]:
+        """Names of the entries in the log, oldest first."""
+        try:
+            return sorted(
+                entry.stem for entry in self.path.iterdir()
+                if entry.suffix == ".npz" and not entry.name.startswith(".")
+            )
+        except FileNotFoundError:
+            return []
+    
+    def read(self, name: str) -> VectorChange | None:
+        """
+        Read an entry.
+        
+        Returns:
+            The entry, or None if compaction removed it meanwhile
+        """
+        try:
+            with np.load(self.path / f"{name}.npz") as data:
+                return VectorChange(
+                    name=name,
+                    model_id=str(data["model_id"]),
+                    video_ids=data["video_ids"].tolist(),
+                    chunk_ids=data["chunk_ids"].tolist(),
+                    chunk_video_ids=data["chunk_video_ids"].tolist(),
+                    vectors=data["vectors"],
+                )
+        except FileNotFoundError:
+            return None
+    
+    def remove(self, names: list[str]) -> None:
+        """Delete entries folded into a snapshot."""
+        for name in names:
+            (self.path / f"{name}.npz").unlink(missing_ok=True)
+    
+    def apply(self, index: IVFIndex, names: list[str]) -> list[str]:
+        """
+        Apply entries to an index, skipping ones for other models.
+        
+        Returns:
+            Names of the entries that were read
+        """
+        applied = []
+        for name in names:
+            change = self.read(name)
+            if change is None:
+                continue
+            if change.model_id == index.model_id:
+                index.replace_videos(
+                    change.video_ids,
+                    change.chunk_ids,
+                    change.chunk_video_ids,
+                    change.vectors
+                )
+            applied.append(name)
+        return applied
+    
+    def lock(self, blocking: bool = True):
+        """
+        Exclusive lock for rewriting the snapshot.
+        
+        Yields:
+            True if the lock was taken (always, when blocking)
+        """
+        return self._flock(self.lock_path, blocking)
+    
+    def build_lock(self, blocking: bool = True):
+        """
+        Exclusive lock held by a snapshot build from its corpus read to its save.
+        
+        Compaction skips while it is held: entries it folded in and removed
+        would be lost when the build's snapshot replaced its own.
+        
+        Yields:
+            True if the lock was taken (always, when blocking)
+        """
+        return self._flock(self.build_lock_path, blocking)
+    
+    @staticmethod
+    @contextmanager
+    def _flock(path: Path, blocking: bool):
+        """Hold an flock on a lock file for the duration of the block."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def compact(self) -> bool:
+        """
+        Fold the log into a new snapshot if it grew past the threshold.
+        
+        Skipped when another process is already rewriting the snapshot or
+        a build is in progress.
+        
+        Returns:
+            True if a new snapshot was written
+        """
+        if len(self.entries()) < settings.vector_snapshot_compact_entries:
+            return False
+        
+        with self.build_lock(blocking=False) as unbuilt, self.lock(blocking=False) as locked:
+            if not unbuilt or not locked or IVFIndex.read_build_id(self.snapshot_path) is None:
+                return False
+            
+            index = IVFIndex.load(self.snapshot_path)
+            pending = [name for name in self.entries() if name not in set(index.merged_changes)]
+            applied = self.apply(index, pending)
+            index.merged_changes = applied
+            index.save(self.snapshot_path)
+            self.remove(applied)
+        
+        return True
+
+
+async def record_video_vectors(video_ids: list[str], chunks: list[dict] | None = None) -> None:
+    """
+    Append the current chunk vectors of some videos to the change log.
+    
+    Called by workers after each batch of finished or re-chunked videos.
+    Does nothing when the vector index is disabled, and never raises: a
+    missed entry only delays the videos until the next snapshot build.
+    
+    Args:
+        video_ids: Videos whose chunk set changed
+        chunks: Their chunk rows with id, video_id, embedding and
+            embedding_model, if already at hand (loaded in quantized form
+            otherwise)
+    """
+    if not settings.vector_index_enabled or not video_ids:
+        return
+    
+    try:
+        model_id = (await get_active_embedding_provider()).model_id
+        rows = []
+        
+        if chunks is None:
+            # int8 transport: ~1 KB per 768-d vector instead of ~9 KB of JSON
+            quantized = await supabase.rpc("chunk_embeddings_for_videos", {
+                "p_video_ids": video_ids,
+                "p_embedding_model": model_id,
+            })
+            for chunk in quantized or []:
+                rows.append((chunk["id"], chunk["video_id"], decode_q8(chunk["embedding_q8"])))
+        else:
+            for chunk in chunks:
+                embedding = parse_vector(chunk.get("embedding"))
+                if embedding is not None and chunk.get("embedding_model") == model_id:
+                    rows.append((chunk["id"], chunk["video_id"], embedding))
+        
+        vectors = np.stack([row[2] for row in rows]) if rows else np.zeros((0, 0), dtype=np.float32)
+        await asyncio.to_thread(
+            vector_change_log.append,
+            model_id,
+            video_ids,
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            vectors
+        )
+        await asyncio.to_thread(vector_change_log.compact)
+    except Exception as e:
+        print(f"❌ Failed to record vector changes: {e}")
+
+
+class VectorIndexService:
+    """
+    Keeps the API's copy of the vector index loaded and current.
+    
+    The snapshot is memory-mapped read-only, so startup is a file open and
+    all uvicorn workers on a host share its pages. A background task reloads
+    it when a new snapshot lands and applies change log entries written by
+    workers since, so searches see new videos without waiting for a build.
+    Entries are applied to a copy of the live index, which then replaces it
+    in one step, so searches never see a half-applied entry.
+    """
+    
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path or settings.vector_index_path)
+        self.change_log = VectorChangeLog(self.path)
+        self._index: IVFIndex | None = None
+        self._applied: set[str] = set()
+        self._swap_lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+    
+    @property
+    def index(self) -> IVFIndex | None:
+        """Loaded index, if any."""
+        return self._index
+    
+    async def search(
+        self,
+        query_embedding: list[float],
+        top_k: int,
+        embedding_model: str,
+        tags: list[str] | None = None,
+        platform: str | None = None
+    ) -> list[dict] | None:
+        """
+        Search the index, in the same result shape as vector_search.
+        
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results to return
+            embedding_model: Model of the query vector
+            tags: Only videos whose keywords include all these tags
+            platform: Only videos from this platform
+        
+        Returns:
+            Results, or None when no index for embedding_model is loaded
+        """
+        results = await self.search_batch(
+            [query_embedding],
+            top_k,
+            embedding_model,
+            [(tags, platform)]
+        )
+        return None if results is None else results[0]
+    
+    async def search_batch(
+        self,
+        query_embeddings: list[list[float]],
+        top_k: int,
+        embedding_model: str,
+        filters: list[tuple[list[str] | None, str | None]]
+    ) -> list[list[dict]] | None:
+        """
+        Search the index for many queries, with one database round trip for
+        chunk rows and rescoring.
+        
+        Args:
+            query_embeddings: Query embedding vectors
+            top_k: Number of results per query
+            embedding_model: Model of the query vectors
+            filters: (tags, platform) per query
+        
+        Returns:
+            Results per query, or None when no index for embedding_model is loaded
+        """
+        index = self._index
+        if index is None or index.model_id != embedding_model:
+            return None
+        
+        # Videos passing each distinct filter
+        distinct_filters = {
+            (tuple(tags or ()), platform)
+            for tags, platform in filters
+            if tags or platform
+        }
+        allowed_rows = await asyncio.gather(*(
+            supabase.rpc("filter_video_ids", {
+                "p_platform": platform,
+                "p_tags": list(tags) or None,
+            })
+            for tags, platform in distinct_filters
+        ))
+        allowed = {
+            key: [row["id"] for row in rows or []]
+            for key, rows in zip(distinct_filters, allowed_rows)
+        }
+        allowed_per_query = [
+            allowed[(tuple(tags or ()), platform)] if tags or platform else None
+            for tags, platform in filters
+        ]
+        
+        # Over-fetch from the quantized index, then rescore at full precision
+        rescore = settings.vector_index_rescore_factor > 1
+        candidates = top_k * settings.vector_index_rescore_factor if rescore else top_k
+        
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        hits = await asyncio.to_thread(self._search_all, index, queries, candidates, allowed_per_query)
+        chunk_ids = list({chunk_id for query_hits in hits for chunk_id, _, _ in query_hits})
+        if not chunk_ids:
+            return [[] for _ in hits]
+        
+        # Texts, timestamps and full-precision vectors live in the database
+        chunks = await supabase.rpc("get_chunks_batch", {
+            "p_ids": chunk_ids,
+            "p_query_embeddings": query_embeddings if rescore else [],
+        })
+        by_id = {chunk["id"]: chunk for chunk in chunks or []}
+        
+        results = []
+        for q, query_hits in enumerate(hits):
+            query_results = [
+                {
+                    "chunk_id": chunk_id,
+                    "video_id": video_id,
+                    "start_ms": by_id[chunk_id]["start_ms"],
+                    "end_ms": by_id[chunk_id]["end_ms"],
+                    "text": by_id[chunk_id]["text"],
+                    "score": by_id[chunk_id]["similarities"][q] if rescore else score,
+                    "source": "vector"
+                }
+                # Chunks replaced since the last applied change are skipped
+                for chunk_id, video_id, score in query_hits
+                if chunk_id in by_id
+            ]
+            if rescore:
+                query_results.sort(key=lambda r: r["score"], reverse=True)
+            results.append(query_results[:top_k])
+        
+        return results
+    
+    @staticmethod
+    def _search_all(
+        index: IVFIndex,
+        queries: np.ndarray,
+        k: int,
+        allowed_per_query: list[list[str] | None]
+    ) -> list[list[tuple[str, str, float]]]:
+        """Batch-search unfiltered queries and search filtered ones singly."""
+        hits = [None] * len(queries)
+        unfiltered = [q for q, allowed in enumerate(allowed_per_query) if allowed is None]
+        if unfiltered:
+            for q, query_hits in zip(unfiltered, index.search_batch(queries[unfiltered], k)):
+                hits[q] = query_hits
+        
+        for q, allowed in enumerate(allowed_per_query):
+            if allowed is not None:
+                hits[q] = index.search(queries[q], k, allowed_video_ids=allowed)
+        
+        return hits
+    
+    def refresh(self) -> None:
+        """Load a new snapshot if there is one, then apply new change log entries."""
+        build_id = IVFIndex.read_build_id(self.path)
+        if build_id is None:
+            return
+        
+        current = self._index
+        if current is None or current.build_id != build_id:
+            index = IVFIndex.load(self.path)
+            applied = set(index.merged_changes)
+            print(f"✅ Loaded vector index {build_id} ({len(index)} vectors, {index.nlist} lists)")
+        else:
+            index = current
+            applied = set(self._applied)
+        
+        pending = [name for name in self.change_log.entries() if name not in applied]
+        if index is current:
+            if not pending:
+                return
+            index = current.copy()
+        applied.update(self.change_log.apply(index, pending))
+        
+        with self._swap_lock:
+            self._index = index
+            self._applied = applied
+    
+    async def start(self) -> None:
+        """Load the index and start the background refresh loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _refresh_loop(self) -> None:
+        """Refresh periodically; errors keep the previous index in service."""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                print(f"❌ Vector index refresh failed: {e}")
+            await asyncio.sleep(settings.vector_index_refresh_seconds)
+
+
+# Global vector change log instance
+vector_change_log = VectorChangeLog()
+
+# Global vector index service instance
+vector_index_service = VectorIndexService()
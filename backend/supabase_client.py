@@ -4,6 +4,9 @@ import httpx
 from typing import Any
 from config import settings
 
+# Rows per request in select_all, within PostgREST's default max-rows
+PAGE_SIZE = 1000
+
 
 class SupabaseClient:
     """Client for interacting with Supabase REST API."""
@@ -60,19 +63,70 @@ class SupabaseClient:
         response.raise_for_status()
         return response.json()
     
-    async def insert(self, table: str, data: dict | list[dict]) -> list[dict]:
+    async def select_all(
+        self,
+        table: str,
+        columns: str = "*",
+        filters: dict[str, Any] | None = None,
+        key: str = "id",
+        page_size: int = PAGE_SIZE
+    ) -> list[dict]:
+        """
+        Select every matching row, paging by a unique key.
+        
+        A plain select is cut off at PostgREST's max-rows; this reads pages
+        ordered by key, each starting after the last key seen.
+        
+        Args:
+            table: Table name
+            columns: Columns to select; must include key
+            filters: Dictionary of column:value filters
+            key: Unique column to page by
+            page_size: Rows per request
+        
+        Returns:
+            List of rows as dictionaries, ordered by key
+        """
+        url = f"{self.base_url}/{table}"
+        rows = []
+        after = None
+        
+        while True:
+            params = {"select": columns, "order": f"{key}.asc", "limit": str(page_size)}
+            for column, value in (filters or {}).items():
+                params[column] = f"eq.{value}"
+            if after is not None:
+                params[key] = f"gt.{after}"
+            
+            response = await self.client.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            page = response.json()
+            if not page:
+                return rows
+            
+            rows.extend(page)
+            after = page[-1][key]
+    
+    async def insert(
+        self,
+        table: str,
+        data: dict | list[dict],
+        columns: str | None = None
+    ) -> list[dict]:
         """
         Insert row(s) into a table.
         
         Args:
             table: Table name
             data: Dictionary or list of dictionaries to insert
+            columns: Columns to return for inserted rows (default: all)
         
         Returns:
             Inserted row(s)
         """
         url = f"{self.base_url}/{table}"
-        response = await self.client.post(url, headers=self.headers, json=data)
+        params = {"select": columns} if columns else None
+        response = await self.client.post(url, headers=self.headers, params=params, json=data)
         response.raise_for_status()
         return response.json()
     
@@ -0,0 +1,13 @@
+"""Shared test setup: import path and placeholder settings."""
+
+import os
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Tests never talk to external services; placeholders satisfy settings validation
+for key in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "DEEPGRAM_API_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(key, "test")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
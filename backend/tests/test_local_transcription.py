@@ -0,0 +1,162 @@
+"""Contract tests for the local transcription backend against a stub model."""
+
+import asyncio
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from services import local_transcription
+from services.chunker import TranscriptChunker
+from services.local_transcription import LocalTranscriptionBackend, check_dependencies
+from services.transcription import TranscriptionBackend, TranscriptWords
+
+
+@dataclass
+class StubWord:
+    word: str
+    start: float
+    end: float
+
+
+@dataclass
+class StubSegment:
+    text: str
+    words: list[StubWord]
+
+
+class StubWhisperModel:
+    """Stands in for faster_whisper.WhisperModel with a fixed transcript."""
+    
+    calls = []
+    
+    def __init__(self, model_name, device, compute_type, cpu_threads):
+        self.model_name = model_name
+    
+    def transcribe(self, file_path, beam_size, word_timestamps, vad_filter):
+        self.calls.append({"file_path": file_path, "word_timestamps": word_timestamps})
+        segments = [
+            StubSegment(" Hello there.", [StubWord(" Hello", 0.0, 0.42), StubWord(" there.", 0.42, 0.9)]),
+            StubSegment(" How are you?", [
+                StubWord(" How", 1.5, 1.7),
+                StubWord(" ", 1.7, 1.7),
+                StubWord(" are", 1.7, 1.85),
+                StubWord(" you?", 1.85, 2.301),
+            ]),
+        ]
+        return iter(segments), types.SimpleNamespace(language="en")
+
+
+@pytest.fixture
+def stub_whisper(monkeypatch):
+    """Install a stub faster_whisper module and an empty model cache."""
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = StubWhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(local_transcription, "_models", local_transcription.OrderedDict())
+    StubWhisperModel.calls = []
+    return module
+
+
+@pytest.fixture
+def backend():
+    """Local backend running jobs in a thread, so it sees the stub module."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    backend = LocalTranscriptionBackend()
+    backend._executor = executor
+    yield backend
+    executor.shutdown()
+
+
+def test_is_a_transcription_backend(backend):
+    assert isinstance(backend, TranscriptionBackend)
+    assert backend.name == "local"
+
+
+def test_transcribe_file_returns_word_arrays(stub_whisper, backend, tmp_path):
+    path = tmp_path / "audio.ogg"
+    
+    result = asyncio.run(backend.transcribe_file(path))
+    
+    assert result.success
+    assert result.language == "en"
+    assert result.full_text == "Hello there. How are you?"
+    assert isinstance(result.words, TranscriptWords)
+    assert StubWhisperModel.calls == [{"file_path": str(path), "word_timestamps": True}]
+
+
+def test_words_keep_punctuation_and_millisecond_times(stub_whisper, backend, tmp_path):
+    result = asyncio.run(backend.transcribe_file(tmp_path / "audio.ogg"))
+    
+    # Blank words are dropped, surrounding whitespace stripped and punctuation
+    # kept, as with Deepgram's punctuated_word
+    assert result.words.serialize() == [
+        ["Hello", 0, 420],
+        ["there.", 420, 900],
+        ["How", 1500, 1700],
+        ["are", 1700, 1850],
+        ["you?", 1850, 2301],
+    ]
+    assert result.words.ordered
+
+
+def test_sentence_chunking_sees_sentence_ends(stub_whisper, backend, tmp_path):
+    result = asyncio.run(backend.transcribe_file(tmp_path / "audio.ogg"))
+    chunker = TranscriptChunker(mode="sentence", min_chunk_ms=500, target_chunk_ms=500, max_chunk_ms=5000)
+    
+    chunks = chunker.chunk_transcript(result.words)
+    
+    assert [chunk.text for chunk in chunks] == ["Hello there.", "How are you?"]
+    assert [(chunk.start_ms, chunk.end_ms) for chunk in chunks] == [(0, 900), (1500, 2301)]
+
+
+def test_model_is_loaded_once_per_process(stub_whisper, backend, tmp_path):
+    asyncio.run(backend.transcribe_file(tmp_path / "a.ogg"))
+    asyncio.run(backend.transcribe_file(tmp_path / "b.ogg"))
+    
+    assert len(local_transcription._models) == 1
+    assert len(StubWhisperModel.calls) == 2
+
+
+def test_missing_dependency_fails_with_install_hint(monkeypatch, backend, tmp_path):
+    monkeypatch.setitem(sys.modules, "faster_whisper", None)
+    monkeypatch.setattr(local_transcription, "_models", local_transcription.OrderedDict())
+    
+    result = asyncio.run(backend.transcribe_file(tmp_path / "audio.ogg"))
+    
+    assert not result.success
+    assert "requirements-local.txt" in result.error_message
+
+
+def test_check_dependencies_raises_without_faster_whisper(monkeypatch):
+    monkeypatch.setattr(local_transcription.importlib.util, "find_spec", lambda name: None)
+    
+    with pytest.raises(RuntimeError, match="faster-whisper"):
+        check_dependencies()
+
+
+def test_broken_pool_is_replaced_on_next_file(backend, tmp_path):
+    class BrokenExecutor(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            raise local_transcription.BrokenProcessPool("worker died")
+    
+    backend._executor = BrokenExecutor(max_workers=1)
+    
+    result = asyncio.run(backend.transcribe_file(tmp_path / "audio.ogg"))
+    
+    assert not result.success
+    assert "died" in result.error_message
+    assert backend._executor is None
+
+
+def test_local_backend_runs_jobs_without_forking(monkeypatch):
+    from rq import SimpleWorker, Worker
+    from workers import worker
+    
+    monkeypatch.setattr(worker.settings, "transcription_backend", "local")
+    assert worker.worker_class() is SimpleWorker
+    
+    monkeypatch.setattr(worker.settings, "transcription_backend", "deepgram")
+    assert worker.worker_class() is Worker
@@ -0,0 +1,101 @@
+"""Rate limiter tests against an in-memory GCRA script."""
+
+import asyncio
+import math
+
+import pytest
+
+from middleware.rate_limit import RateLimiter
+
+
+class FakeGCRA:
+    """Python port of GCRA_SCRIPT with a controllable clock."""
+    
+    def __init__(self):
+        self.now_ms = 1_000_000
+        self.tats: dict[str, int] = {}
+        self.calls = 0
+    
+    async def __call__(self, keys, args):
+        self.calls += 1
+        interval, burst, cost, partial = int(args[0]), int(args[1]), int(args[2]), args[3] == 1
+        now = self.now_ms
+        tat = max(self.tats.get(keys[0], now), now)
+        
+        available = math.floor((now - tat) / interval) + burst
+        granted = cost
+        if available < cost:
+            if partial and available >= 1:
+                granted = available
+            else:
+                needed = 1 if partial else cost
+                return [0, 0, tat + (needed - burst) * interval - now, tat - now]
+        
+        new_tat = tat + interval * granted
+        self.tats[keys[0]] = new_tat
+        return [granted, available - granted, 0, new_tat - now]
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter()
+    limiter._script = FakeGCRA()
+    return limiter
+
+
+def test_idle_client_can_send_a_full_batch(limiter):
+    rule = limiter.match("/search/batch")
+    max_queries = limiter.max_cost("/search/batch")
+    assert max_queries == rule.burst
+    
+    async def batch():
+        # The middleware admits the first query, the route charges the rest
+        first = await limiter.acquire(rule, "1.2.3.4")
+        rest = await limiter.charge_path("/search/batch", "1.2.3.4", max_queries - 1)
+        return first, rest
+    
+    first, rest = asyncio.run(batch())
+    
+    assert first.allowed
+    assert rest.allowed
+    assert rest.granted == max_queries - 1
+    assert rest.remaining == 0
+
+
+def test_denied_batch_keeps_the_local_lease(limiter):
+    rule = limiter.match("/search/batch")
+    
+    async def run():
+        await limiter.acquire(rule, "1.2.3.4")
+        # Exhaust Redis from another process's point of view
+        await limiter.charge(rule, "1.2.3.4", rule.burst - rule.lease)
+        denied = await limiter.charge_path("/search/batch", "1.2.3.4", rule.burst - 1)
+        follow_up = await limiter.acquire(rule, "1.2.3.4")
+        return denied, follow_up
+    
+    denied, follow_up = asyncio.run(run())
+    
+    assert not denied.allowed
+    assert denied.retry_after > 0
+    # The refunded lease still admits single requests without Redis
+    assert follow_up.allowed
+
+
+def test_small_batch_is_paid_from_the_lease(limiter):
+    rule = limiter.match("/search/batch")
+    
+    async def run():
+        await limiter.acquire(rule, "1.2.3.4")
+        calls = limiter._script.calls
+        result = await limiter.charge_path("/search/batch", "1.2.3.4", rule.lease - 1)
+        return result, limiter._script.calls - calls
+    
+    result, redis_calls = asyncio.run(run())
+    
+    assert result.allowed
+    assert redis_calls == 0
+
+
+def test_unlimited_path_is_not_charged(limiter):
+    assert asyncio.run(limiter.charge_path("/healthz", "1.2.3.4", 5)) is None
+    assert limiter.max_cost("/healthz") is None
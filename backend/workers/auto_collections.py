@@ -0,0 +1,142 @@
+"""Admin job for clustering videos into suggested collections."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from rq import get_current_job
+
+from config import settings
+from supabase_client import supabase
+from services.embeddings import get_active_embedding_provider
+from services.quantization import decode_q8
+from services.vector_index import _normalize_rows
+from services.auto_collections import cluster_videos, label_clusters, normalize_keywords
+from services.related_videos import load_video_centroids
+from workers.rechunk import _report_progress
+
+# Longest collection name the API accepts
+MAX_NAME_LENGTH = 100
+
+
+async def build_auto_collections_async(
+    clusters: int | None = None,
+    min_size: int | None = None
+) -> dict:
+    """
+    Re-cluster the library and replace the suggested collections.
+    
+    Clusters the centroids of all done videos, names each cluster after its
+    notes keywords and stores the clusters large enough as suggested
+    collections, together with their centers for incremental assignment.
+    Manual and accepted collections are left alone.
+    
+    Args:
+        clusters: Number of clusters (default from settings, 0 for sqrt(n / 2))
+        min_size: Smallest cluster kept as a collection (default from settings)
+    
+    Returns:
+        Progress counters
+    """
+    model_id = (await get_active_embedding_provider()).model_id
+    job = get_current_job()
+    
+    if min_size is None:
+        min_size = settings.auto_collections_min_size
+    
+    progress = {"model_id": model_id, "videos": 0, "clusters": 0, "collections": 0, "unassigned": 0}
+    _report_progress(job, progress)
+    
+    rows = await load_video_centroids(model_id)
+    video_ids = [row["id"] for row in rows]
+    progress["videos"] = len(video_ids)
+    
+    if clusters is None:
+        clusters = settings.auto_collections_clusters
+    if not clusters:
+        clusters = int(np.sqrt(len(video_ids) / 2))
+    clusters = min(clusters, len(video_ids) // max(min_size, 1))
+    
+    if clusters < 1:
+        raise RuntimeError(f"Too few videos with {model_id} centroids to cluster")
+    
+    matrix = _normalize_rows(np.stack([decode_q8(row["centroid_q8"]) for row in rows]))
+    centers, assignments, similarities = await asyncio.to_thread(
+        cluster_videos,
+        matrix,
+        clusters,
+        settings.auto_collections_iterations,
+    )
+    progress["clusters"] = clusters
+    _report_progress(job, progress)
+    
+    # Outliers join no collection, as in incremental assignment
+    close = similarities >= settings.auto_collections_min_similarity
+    members = [
+        [video_ids[i] for i in np.flatnonzero((assignments == cluster) & close)]
+        for cluster in range(clusters)
+    ]
+    
+    notes = await supabase.select_all("notes", columns="id,video_id,keywords")
+    keywords = {note["video_id"]: normalize_keywords(note.get("keywords")) for note in notes}
+    labels = label_clusters(members, keywords, settings.auto_collections_label_keywords)
+    
+    taken = {
+        collection["name"]
+        for collection in await supabase.select_all("collections", columns="id,name,suggested")
+        if not collection.get("suggested")
+    }
+    
+    collections = []
+    for cluster in np.argsort([-len(videos) for videos in members], kind="stable"):
+        if len(members[cluster]) < min_size:
+            continue
+        name = _unique_name(labels[cluster] or f"Cluster {len(collections) + 1}", taken)
+        taken.add(name)
+        collections.append({
+            "name": name,
+            "centroid": centers[cluster].tolist(),
+            "video_ids": members[cluster],
+        })
+    
+    progress["collections"] = await supabase.rpc("replace_suggested_collections", {
+        "p_collections": collections,
+        "p_embedding_model": model_id,
+    })
+    progress["unassigned"] = len(video_ids) - sum(len(c["video_ids"]) for c in collections)
+    
+    _report_progress(job, progress)
+    print(f"✅ Suggested {progress['collections']} collections from {len(video_ids)} videos")
+    
+    return progress
+
+
+def _unique_name(label: str, taken: set[str]) -> str:
+    """Collection name for a label that collides with no existing name."""
+    name = label[:MAX_NAME_LENGTH]
+    suffix = 2
+    while name in taken:
+        tail = f" ({suffix})"
+        name = label[:MAX_NAME_LENGTH - len(tail)] + tail
+        suffix += 1
+    return name
+
+
+def build_auto_collections(clusters: int | None = None, min_size: int | None = None) -> dict:
+    """
+    Synchronous wrapper for the auto-collections job.
+    
+    This is the function that RQ will call.
+    
+    Args:
+        clusters: Number of clusters
+        min_size: Smallest cluster kept as a collection
+    
+    Returns:
+        Progress counters
+    """
+    return asyncio.run(build_auto_collections_async(clusters, min_size))
@@ -47,6 +47,7 @@ def get_job_status(job_id: str) -> dict:
             "status": job.get_status(),
             "result": job.result,
             "exc_info": job.exc_info,
+            "meta": job.meta,
             "created_at": job.created_at.isoformat() if job.created_at else None,
             "started_at": job.started_at.isoformat() if job.started_at else None,
             "ended_at": job.ended_at.isoformat() if job.ended_at else None,
@@ -7,13 +7,25 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config import settings
 from supabase_client import supabase
 from storage import storage_service
 from services.downloader import MediaDownloader
 from services.media_inspector import MediaInspector
-from services.transcription import transcription_service
+from services.transcription import (
+    TranscriptResult,
+    get_transcription_backend,
+    transcription_service,
+)
 from services.chunker import chunker
 from services.ai_service import ai_service
+from services.embeddings import embed_missing, get_active_embedding_provider
+from services.audio_fingerprint import audio_fingerprinter
+from services.audio_preprocessor import audio_preprocessor
+from services.search_cache import bump_corpus_version
+from services.vector_index import record_video_vectors
+from services.related_videos import update_video_centroids
+from services.auto_collections import assign_to_suggested_collections
 
 
 async def process_video_async(video_id: str, source_url: str):
@@ -70,6 +82,47 @@ async def process_video_async(video_id: str, source_url: str):
             )
             download_result.duration_seconds = media_info.duration_seconds
         
+        # Link to an already processed upload of the same audio (e.g. a repost
+        # on another platform) instead of transcribing and summarizing again
+        if settings.fingerprint_enabled:
+            landmarks = await audio_fingerprinter.fingerprint(download_result.file_path)
+            match = await audio_fingerprinter.find_match(
+                landmarks,
+                download_result.duration_seconds
+            )
+            
+            if match and match.video_id != video_id:
+                # Only the span both recordings share is copied and shifted
+                await supabase.rpc("link_duplicate_video", {
+                    "p_video_id": video_id,
+                    "p_source_video_id": match.video_id,
+                    "p_offset_ms": match.offset_ms,
+                    "p_duration_ms": download_result.duration_seconds * 1000,
+                })
+                downloader.cleanup(download_result.file_path)
+                
+                await supabase.update(
+                    "videos",
+                    {
+                        "status": "done",
+                        "current_stage": None
+                    },
+                    {"id": video_id}
+                )
+                await record_video_vectors([video_id])
+                await update_video_centroids([video_id])
+                await assign_to_suggested_collections([video_id])
+                await bump_corpus_version()
+                return
+            
+            # Store audio fingerprint so later reposts can be linked to this
+            # video (matching only considers videos that reached done)
+            if landmarks:
+                try:
+                    await audio_fingerprinter.store(video_id, landmarks)
+                except Exception:
+                    pass
+        
         # Stage 2: Upload to storage
         await supabase.update(
             "videos",
@@ -77,24 +130,34 @@ async def process_video_async(video_id: str, source_url: str):
             {"id": video_id}
         )
         
+        # Optionally transcode to mono low-bitrate Opus to shrink upload and
+        # transcription payloads (falls back to the original file on failure)
+        upload_path = download_result.file_path
+        content_type = "audio/mp4"
+        media_offset_ms = 0
+        if settings.audio_transcode_enabled:
+            preprocess_result = await audio_preprocessor.preprocess(
+                download_result.file_path,
+                download_result.duration_seconds
+            )
+            if preprocess_result.success:
+                downloader.cleanup(download_result.file_path)
+                upload_path = preprocess_result.file_path
+                content_type = preprocess_result.content_type
+                media_offset_ms = preprocess_result.leading_trim_ms
+        
         storage_path = await storage_service.upload_media(
             video_id,
-            download_result.file_path,
-            content_type="audio/mp4"
+            upload_path,
+            content_type=content_type
         )
         
         await supabase.update(
             "videos",
-            {"storage_path": storage_path},
+            {"storage_path": storage_path, "media_offset_ms": media_offset_ms},
             {"id": video_id}
         )
         
-        # Generate signed URL for transcription
-        signed_url = await storage_service.generate_signed_url(storage_path, ttl=3600)
-        
-        # Clean up local file
-        downloader.cleanup(download_result.file_path)
-        
         # Stage 3: Transcribe
         await supabase.update(
             "videos",
@@ -102,7 +165,58 @@ async def process_video_async(video_id: str, source_url: str):
             {"id": video_id}
         )
         
-        transcript_result = await transcription_service.transcribe(signed_url)
+        # Long media is split and transcribed in concurrent segments from the
+        # local file; everything else is fetched by Deepgram from storage
+        use_local = settings.transcription_backend == "local"
+        use_segments = (
+            not use_local
+            and settings.transcription_segmented_enabled
+            and (download_result.duration_seconds or 0) > settings.transcription_segment_seconds * 1.5
+        )
+        
+        if settings.deepgram_callback_enabled and not (use_local or use_segments):
+            # Submit and park: the /webhooks/deepgram route resumes the
+            # pipeline when the result arrives, freeing this worker slot
+            try:
+                signed_url = await storage_service.generate_signed_url(storage_path, ttl=3600)
+                request_id = await transcription_service.submit_with_callback(signed_url, video_id)
+            finally:
+                downloader.cleanup(upload_path)
+            
+            if not request_id:
+                await supabase.update(
+                    "videos",
+                    {
+                        "status": "failed",
+                        "fail_reason": "TRANSCRIPTION_FAILED",
+                        "current_stage": None
+                    },
+                    {"id": video_id}
+                )
+                return
+            
+            await supabase.update(
+                "videos",
+                {"transcription_request_id": request_id},
+                {"id": video_id}
+            )
+            return
+        
+        try:
+            if use_local:
+                # Transcribe the local file on this machine's CPUs
+                transcript_result = await get_transcription_backend().transcribe_file(upload_path)
+            elif use_segments:
+                transcript_result = await transcription_service.transcribe_segmented(
+                    upload_path,
+                    download_result.duration_seconds
+                )
+            else:
+                signed_url = await storage_service.generate_signed_url(storage_path, ttl=3600)
+                transcript_result = await transcription_service.transcribe(signed_url)
+        finally:
+            # Clean up local file, also when transcription raises
+            downloader.cleanup(upload_path)
         
         if not transcript_result.success:
             await supabase.update(
@@ -116,102 +230,197 @@ async def process_video_async(video_id: str, source_url: str):
             )
             return
         
-        # Store full transcript
-        await supabase.insert("transcripts", {
-            "video_id": video_id,
-            "full_text": transcript_result.full_text
-        })
-        
-        # Stage 4: Generate notes
+        await complete_video_async(
+            video_id,
+            transcript_result,
+            download_result.duration_seconds or 0,
+            media_offset_ms
+        )
+    
+    except Exception as e:
+        # Handle unexpected errors
         await supabase.update(
             "videos",
-            {"current_stage": "notes"},
+            {
+                "status": "failed",
+                "fail_reason": "DOWNLOAD_FAILED",
+                "current_stage": None
+            },
             {"id": video_id}
         )
-        
-        notes_result = await ai_service.generate_notes(
-            transcript_result.full_text,
-            download_result.duration_seconds or 0
+        raise e
+
+
+async def complete_video_async(
+    video_id: str,
+    transcript_result: TranscriptResult,
+    duration_seconds: int,
+    media_offset_ms: int = 0
+):
+    """
+    Run the pipeline stages after transcription.
+    
+    Stores the transcript, generates notes and embeddings, and marks the
+    video done. Shared by the synchronous pipeline and the Deepgram callback
+    resume job.
+    
+    Args:
+        video_id: UUID of the video
+        transcript_result: Successful transcription result
+        duration_seconds: Video duration in seconds
+        media_offset_ms: Offset of the transcribed media from the source timeline
+    """
+    # Map timestamps of trimmed audio back onto the original timeline
+    if media_offset_ms and transcript_result.words:
+        transcript_result.words.shift(media_offset_ms)
+    
+    # Store full transcript with word timings so it can be re-chunked later
+    await supabase.insert("transcripts", {
+        "video_id": video_id,
+        "full_text": transcript_result.full_text,
+        "words": transcript_result.words.serialize() if transcript_result.words else [],
+    })
+    
+    # Stage 4: Generate notes
+    await supabase.update(
+        "videos",
+        {"current_stage": "notes"},
+        {"id": video_id}
+    )
+    
+    chunks = chunker.chunk_transcript(transcript_result.words)
+    
+    notes_result = await ai_service.generate_notes(
+        transcript_result.full_text,
+        duration_seconds,
+        words=transcript_result.words
+    )
+    
+    # Store notes (even if partial)
+    notes_data = {
+        "video_id": video_id,
+        "summary": notes_result.summary,
+        "keywords": notes_result.keywords or [],
+        "chapters": notes_result.chapters or [],
+        "insights": notes_result.insights or [],
+        "steps": notes_result.steps or [],
+        "quotes": notes_result.quotes or [],
+        "entities": notes_result.entities or {},
+    }
+    
+    if notes_result.raw_text:
+        notes_data["notes_raw_text"] = notes_result.raw_text
+    
+    await supabase.insert("notes", notes_data)
+    
+    # Stage 5: Generate embeddings
+    await supabase.update(
+        "videos",
+        {"current_stage": "embeddings"},
+        {"id": video_id}
+    )
+    
+    # Reuse cached embeddings by (text_hash, model) and collect the chunk rows
+    provider = await get_active_embedding_provider()
+    chunk_rows = []
+    for chunk in chunks:
+        # Check if embedding exists for this text_hash from the active model
+        existing = await supabase.select(
+            "transcript_chunks",
+            columns="embedding",
+            filters={"text_hash": chunk.text_hash, "embedding_model": provider.model_id},
+            limit=1
         )
         
-        # Store notes (even if partial)
-        notes_data = {
+        row = {
             "video_id": video_id,
-            "summary": notes_result.summary,
-            "keywords": notes_result.keywords or [],
-            "chapters": notes_result.chapters or [],
-            "insights": notes_result.insights or [],
-            "steps": notes_result.steps or [],
-            "quotes": notes_result.quotes or [],
-            "entities": notes_result.entities or {},
+            "start_ms": chunk.start_ms,
+            "end_ms": chunk.end_ms,
+            "text": chunk.text,
+            "text_hash": chunk.text_hash,
+            "embedding": None,
+            "embedding_model": None,
         }
+        if existing and existing[0].get("embedding"):
+            # Use cached embedding
+            row["embedding"] = existing[0]["embedding"]
+            row["embedding_model"] = provider.model_id
+        chunk_rows.append(row)
+    
+    # Generate the remaining embeddings in batches and store all chunks
+    await embed_missing(chunk_rows, provider)
+    if chunk_rows:
+        # Only IDs come back; echoing the vectors would multiply the transfer
+        inserted = await supabase.insert("transcript_chunks", chunk_rows, columns="id")
+        for row, inserted_row in zip(chunk_rows, inserted):
+            row["id"] = inserted_row["id"]
+    
+    # Stage 6: Generate previews (optional - skip for now)
+    # This can be implemented later or made async
+    
+    # Mark as done
+    await supabase.update(
+        "videos",
+        {
+            "status": "done",
+            "current_stage": None
+        },
+        {"id": video_id}
+    )
+    
+    # New chunks are searchable; publish them to the vector index, refresh
+    # the video's centroid for related lookups and suggested collections, and
+    # drop cached search results
+    await record_video_vectors([video_id], chunk_rows)
+    await update_video_centroids([video_id], provider.model_id)
+    await assign_to_suggested_collections([video_id])
+    await bump_corpus_version()
+
+
+async def resume_video_async(video_id: str, transcript_payload: dict):
+    """
+    Resume the pipeline with a transcript delivered by Deepgram callback.
+    
+    Args:
+        video_id: UUID of the video
+        transcript_payload: Deepgram callback body
+    """
+    try:
+        transcript_result = transcription_service.parse_result(transcript_payload)
         
-        if notes_result.raw_text:
-            notes_data["notes_raw_text"] = notes_result.raw_text
-        
-        await supabase.insert("notes", notes_data)
-        
-        # Stage 5: Chunk transcript and generate embeddings
-        await supabase.update(
-            "videos",
-            {"current_stage": "embeddings"},
-            {"id": video_id}
-        )
-        
-        # Chunk transcript
-        chunks = chunker.chunk_transcript(transcript_result.word_timestamps)
-        
-        # Check for cached embeddings and generate new ones
-        for chunk in chunks:
-            # Check if embedding exists for this text_hash
-            existing = await supabase.select(
-                "transcript_chunks",
-                columns="embedding",
-                filters={"text_hash": chunk.text_hash},
-                limit=1
+        if not transcript_result.success:
+            await supabase.update(
+                "videos",
+                {
+                    "status": "failed",
+                    "fail_reason": "TRANSCRIPTION_FAILED",
+                    "current_stage": None
+                },
+                {"id": video_id}
             )
-            
-            embedding = None
-            if existing and existing[0].get("embedding"):
-                # Use cached embedding
-                embedding = existing[0]["embedding"]
-            else:
-                # Generate new embedding
-                embedding = await ai_service.generate_embedding(chunk.text)
-            
-            # Store chunk
-            await supabase.insert("transcript_chunks", {
-                "video_id": video_id,
-                "start_ms": chunk.start_ms,
-                "end_ms": chunk.end_ms,
-                "text": chunk.text,
-                "text_hash": chunk.text_hash,
-                "embedding": embedding
-            })
-            
-            # Rate limiting
-            await asyncio.sleep(1.0)
-        
-        # Stage 6: Generate previews (optional - skip for now)
-        # This can be implemented later or made async
+            return
         
-        # Mark as done
-        await supabase.update(
+        video = await supabase.select(
             "videos",
-            {
-                "status": "done",
-                "current_stage": None
-            },
-            {"id": video_id}
+            columns="duration_seconds,media_offset_ms",
+            filters={"id": video_id},
+            limit=1
         )
+        video_data = video[0] if video else {}
         
+        await complete_video_async(
+            video_id,
+            transcript_result,
+            video_data.get("duration_seconds") or 0,
+            video_data.get("media_offset_ms") or 0
+        )
     except Exception as e:
         # Handle unexpected errors
         await supabase.update(
             "videos",
             {
                 "status": "failed",
-                "fail_reason": "DOWNLOAD_FAILED",
+                "fail_reason": "PROCESSING_FAILED",
                 "current_stage": None
             },
             {"id": video_id}
@@ -230,3 +439,16 @@ def process_video(video_id: str, source_url: str):
         source_url: Source URL of the video
     """
     asyncio.run(process_video_async(video_id, source_url))
+
+
+def resume_video(video_id: str, transcript_payload: dict):
+    """
+    Synchronous wrapper for the callback resume job.
+    
+    This is the function that RQ will call.
+    
+    Args:
+        video_id: UUID of the video
+        transcript_payload: Deepgram callback body
+    """
+    asyncio.run(resume_video_async(video_id, transcript_payload))
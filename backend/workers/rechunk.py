@@ -0,0 +1,218 @@
+"""Admin job for re-chunking and re-embedding stored transcripts."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rq import get_current_job
+
+from supabase_client import supabase
+from services.chunker import TranscriptChunker, TranscriptWords
+from services.embeddings import embed_missing, get_active_embedding_provider
+from services.search_cache import bump_corpus_version
+from services.vector_index import record_video_vectors
+from services.related_videos import update_video_centroids
+from services.auto_collections import assign_to_suggested_collections
+
+
+async def rechunk_videos_async(video_ids: list[str], chunker_config: dict) -> dict:
+    """
+    Re-chunk a batch of videos with a new chunker configuration.
+
+    Uses persisted word timings when available and falls back to timings
+    approximated from the existing chunks. Embeddings are reused by
+    text_hash for chunks whose text did not change, and each video's chunk
+    set is swapped atomically.
+
+    Args:
+        video_ids: Video IDs to re-chunk
+        chunker_config: Keyword arguments for TranscriptChunker
+
+    Returns:
+        Progress counters for the batch
+    """
+    chunker = TranscriptChunker(**chunker_config)
+    job = get_current_job()
+
+    progress = {
+        "total": len(video_ids),
+        "processed": 0,
+        "skipped": [],
+        "failed": [],
+        "chunks_written": 0,
+        "embeddings_reused": 0,
+        "embeddings_generated": 0,
+    }
+    _report_progress(job, progress)
+
+    for video_id in video_ids:
+        try:
+            stats = await rechunk_video(video_id, chunker)
+            if stats is None:
+                progress["skipped"].append(video_id)
+            else:
+                progress["chunks_written"] += stats["chunks_written"]
+                progress["embeddings_reused"] += stats["embeddings_reused"]
+                progress["embeddings_generated"] += stats["embeddings_generated"]
+        except Exception as e:
+            progress["failed"].append({"video_id": video_id, "error": str(e)[:200]})
+
+        progress["processed"] += 1
+        _report_progress(job, progress)
+
+    # Chunk sets changed; publish the new vectors and centroids and drop cached
+    # search results
+    rechunked = [
+        video_id for video_id in video_ids
+        if video_id not in progress["skipped"]
+        and video_id not in {failure["video_id"] for failure in progress["failed"]}
+    ]
+    await record_video_vectors(rechunked)
+    await update_video_centroids(rechunked)
+    await assign_to_suggested_collections(rechunked)
+    await bump_corpus_version()
+
+    return progress
+
+
+async def rechunk_video(video_id: str, chunker: TranscriptChunker) -> dict | None:
+    """
+    Re-chunk a single video and swap its chunk set.
+
+    Args:
+        video_id: Video ID
+        chunker: Chunker configured with the new strategy
+
+    Returns:
+        Per-video counters, or None if the video has no transcript
+    """
+    transcripts = await supabase.select(
+        "transcripts",
+        columns="words",
+        filters={"video_id": video_id},
+        limit=1
+    )
+    if not transcripts:
+        return None
+
+    existing_chunks = await supabase.select(
+        "transcript_chunks",
+        columns="start_ms,end_ms,text,text_hash,embedding,embedding_model",
+        filters={"video_id": video_id},
+        order="start_ms.asc"
+    )
+
+    words = TranscriptWords.from_serialized(transcripts[0].get("words"))
+    if not len(words):
+        words = _approximate_words_from_chunks(existing_chunks)
+    if not len(words):
+        return None
+
+    # Embeddings from the active model already owned by this video, keyed by text_hash
+    provider = await get_active_embedding_provider()
+    known_embeddings = {
+        chunk["text_hash"]: chunk["embedding"]
+        for chunk in existing_chunks
+        if chunk.get("embedding") and chunk.get("embedding_model") == provider.model_id
+    }
+
+    stats = {"chunks_written": 0, "embeddings_reused": 0, "embeddings_generated": 0}
+    new_chunks = []
+
+    for chunk in chunker.chunk_transcript(words):
+        embedding = known_embeddings.get(chunk.text_hash)
+
+        if embedding is None:
+            # Check if embedding exists for this text_hash in other videos
+            existing = await supabase.select(
+                "transcript_chunks",
+                columns="embedding",
+                filters={"text_hash": chunk.text_hash, "embedding_model": provider.model_id},
+                limit=1
+            )
+            if existing and existing[0].get("embedding"):
+                embedding = existing[0]["embedding"]
+                known_embeddings[chunk.text_hash] = embedding
+
+        if embedding is not None:
+            stats["embeddings_reused"] += 1
+
+        new_chunks.append({
+            "start_ms": chunk.start_ms,
+            "end_ms": chunk.end_ms,
+            "text": chunk.text,
+            "text_hash": chunk.text_hash,
+            "embedding": embedding,
+            "embedding_model": provider.model_id if embedding is not None else None,
+        })
+
+    # Embed the remaining chunks in batches
+    stats["embeddings_generated"] = await embed_missing(new_chunks, provider)
+
+    # Swap chunk sets in a single transaction
+    stats["chunks_written"] = await supabase.rpc(
+        "replace_transcript_chunks",
+        {"p_video_id": video_id, "p_chunks": new_chunks}
+    )
+
+    return stats
+
+
+def _approximate_words_from_chunks(chunks: list[dict]) -> TranscriptWords:
+    """
+    Approximate word timings from stored chunks.
+
+    Used for videos ingested before word timings were persisted. Words are
+    spread evenly over each chunk's span, and words falling inside the
+    overlap with the previous chunk are dropped.
+    """
+    words, starts, ends = [], [], []
+    previous_end_ms = None
+
+    for chunk in chunks:
+        tokens = chunk["text"].split()
+        if not tokens:
+            continue
+
+        start_ms = chunk["start_ms"]
+        step_ms = (chunk["end_ms"] - start_ms) / len(tokens)
+
+        for i, token in enumerate(tokens):
+            word_start_ms = int(start_ms + i * step_ms)
+            if previous_end_ms is not None and word_start_ms < previous_end_ms:
+                continue
+            words.append(token)
+            starts.append(word_start_ms)
+            ends.append(int(start_ms + (i + 1) * step_ms))
+
+        previous_end_ms = chunk["end_ms"]
+
+    return TranscriptWords.from_parts(words, starts, ends)
+
+
+def _report_progress(job, progress: dict) -> None:
+    """Publish progress counters on the running RQ job."""
+    if job is None:
+        return
+
+    job.meta["progress"] = progress
+    job.save_meta()
+
+
+def rechunk_videos(video_ids: list[str], chunker_config: dict) -> dict:
+    """
+    Synchronous wrapper for the re-chunk job.
+
+    This is the function that RQ will call.
+
+    Args:
+        video_ids: Video IDs to re-chunk
+        chunker_config: Keyword arguments for TranscriptChunker
+
+    Returns:
+        Progress counters for the batch
+    """
+    return asyncio.run(rechunk_videos_async(video_ids, chunker_config))
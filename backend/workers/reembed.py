@@ -0,0 +1,171 @@
+"""Admin job for migrating chunk embeddings to a new model without downtime."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rq import get_current_job
+
+from config import settings
+from supabase_client import supabase
+from services.embeddings import embed_missing, provider_for_model, reset_active_embedding_provider
+from services.search_cache import bump_corpus_version
+from workers.job_queue import enqueue_job
+from workers.rechunk import _report_progress
+from workers.vector_index import build_vector_index
+
+# Passes over the corpus to pick up chunks ingested while re-embedding
+MAX_PASSES = 3
+
+
+async def reembed_corpus_async(model_id: str, dimension: int, batch_size: int = 64) -> dict:
+    """
+    Re-embed every chunk with a new model, then cut search over to it.
+    
+    New vectors are staged in transcript_chunk_embeddings while search keeps
+    serving the active model. Once every chunk has a staged vector, the
+    activate_embedding_model RPC swaps them in and marks the model active in
+    one transaction. Chunks ingested with the old model between the last pass
+    and the cutover are re-embedded in place afterwards.
+    
+    Args:
+        model_id: Target model identity, e.g. "local/sentence-transformers/all-mpnet-base-v2"
+        dimension: Dimension of the target model's vectors
+        batch_size: Chunks per embedding batch
+    
+    Returns:
+        Progress counters
+    """
+    provider = provider_for_model(model_id, dimension)
+    job = get_current_job()
+    
+    progress = {
+        "model_id": model_id,
+        "passes": 0,
+        "staged": 0,
+        "failed": 0,
+        "switched": 0,
+        "updated_after_cutover": 0,
+        "activated": False,
+    }
+    _report_progress(job, progress)
+    
+    # Register the model so the cutover can mark it active
+    existing = await supabase.select(
+        "embedding_models",
+        columns="model_id",
+        filters={"model_id": model_id},
+        limit=1
+    )
+    if not existing:
+        await supabase.insert("embedding_models", {"model_id": model_id, "dimension": dimension})
+    
+    # Stage vectors until a pass finds nothing left to embed
+    while progress["passes"] < MAX_PASSES:
+        progress["passes"] += 1
+        progress["failed"] = 0
+        staged = 0
+        
+        async for rows in _missing_chunk_batches(model_id, batch_size):
+            await embed_missing(rows, provider)
+            
+            embedded = [row for row in rows if row["embedding"] is not None]
+            progress["failed"] += len(rows) - len(embedded)
+            
+            if embedded:
+                await supabase.insert("transcript_chunk_embeddings", [
+                    {
+                        "chunk_id": row["id"],
+                        "embedding_model": model_id,
+                        "embedding": row["embedding"],
+                    }
+                    for row in embedded
+                ])
+            
+            staged += len(embedded)
+            progress["staged"] += len(embedded)
+            _report_progress(job, progress)
+        
+        if staged == 0:
+            break
+    
+    if progress["failed"]:
+        # Keep serving the active model rather than cut over with gaps
+        _report_progress(job, progress)
+        raise RuntimeError(f"{progress['failed']} chunks could not be embedded with {model_id}")
+    
+    progress["switched"] = await supabase.rpc("activate_embedding_model", {"p_model_id": model_id})
+    progress["activated"] = True
+    reset_active_embedding_provider()
+    await bump_corpus_version()
+    _report_progress(job, progress)
+    
+    # Chunks stored with the previous model during the final pass
+    async for rows in _missing_chunk_batches(model_id, batch_size):
+        await embed_missing(rows, provider)
+        for row in rows:
+            if row["embedding"] is None:
+                continue
+            await supabase.update(
+                "transcript_chunks",
+                {"embedding": row["embedding"], "embedding_model": model_id},
+                {"id": row["id"]}
+            )
+            progress["updated_after_cutover"] += 1
+        _report_progress(job, progress)
+    
+    # Video centroids are means of the previous model's vectors
+    try:
+        progress["centroids"] = await supabase.rpc("compute_missing_video_centroids", {
+            "p_embedding_model": model_id,
+        })
+    except Exception as e:
+        print(f"❌ Failed to recompute video centroids: {e}")
+    _report_progress(job, progress)
+    
+    # The vector index snapshot holds the previous model's vectors; search
+    # uses the database until the rebuild lands
+    if settings.vector_index_enabled:
+        progress["vector_index_job_id"] = enqueue_job(build_vector_index, job_timeout=2 * 3600).id
+        _report_progress(job, progress)
+    
+    return progress
+
+
+async def _missing_chunk_batches(model_id: str, batch_size: int):
+    """Yield batches of chunks lacking a vector from model_id, paging by id."""
+    after = None
+    while True:
+        rows = await supabase.rpc("chunks_missing_embedding", {
+            "p_model_id": model_id,
+            "p_after": after,
+            "p_limit": batch_size,
+        })
+        if not rows:
+            return
+        
+        for row in rows:
+            row["embedding"] = None
+        yield rows
+        
+        after = rows[-1]["id"]
+
+
+def reembed_corpus(model_id: str, dimension: int, batch_size: int = 64) -> dict:
+    """
+    Synchronous wrapper for the re-embed job.
+    
+    This is the function that RQ will call.
+    
+    Args:
+        model_id: Target model identity
+        dimension: Dimension of the target model's vectors
+        batch_size: Chunks per embedding batch
+    
+    Returns:
+        Progress counters
+    """
+    return asyncio.run(reembed_corpus_async(model_id, dimension, batch_size))
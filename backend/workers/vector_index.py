@@ -0,0 +1,154 @@
+"""Admin job for building the in-process vector index."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from rq import get_current_job
+
+from config import settings
+from supabase_client import supabase
+from services.embeddings import get_active_embedding_provider
+from services.quantization import decode_q8
+from services.vector_index import IVFIndex, vector_change_log
+from workers.rechunk import _report_progress
+
+# Chunks fetched per page while reading the corpus
+PAGE_SIZE = 1000
+
+
+async def build_vector_index_async(nlist: int | None = None, nprobe_check: int | None = None) -> dict:
+    """
+    Build the vector index from the active model's chunk vectors.
+    
+    Reads every chunk vector in id order, trains the IVF lists and writes
+    the snapshot to vector_index_path, where API processes pick it up on
+    their next refresh. Change log entries present before the read are
+    already reflected in the database and are folded into the snapshot.
+    
+    Args:
+        nlist: Number of inverted lists (default from settings, 0 for sqrt(n))
+        nprobe_check: If set, report recall@10 of this nprobe against exact
+            search on a sample of indexed vectors
+    
+    Returns:
+        Progress counters
+    """
+    model_id = (await get_active_embedding_provider()).model_id
+    job = get_current_job()
+    
+    progress = {"model_id": model_id, "read": 0, "indexed": 0, "nlist": None}
+    _report_progress(job, progress)
+    
+    # Compaction waits out the build; the snapshot lock is only needed to save
+    with vector_change_log.build_lock():
+        merged = vector_change_log.entries()
+        index = await _build_index(model_id, nlist, progress, job)
+        index.merged_changes = merged
+        with vector_change_log.lock():
+            await asyncio.to_thread(index.save, Path(settings.vector_index_path))
+            vector_change_log.remove(merged)
+    
+    if nprobe_check:
+        # Recall of the snapshot as stored, i.e. including quantization
+        stored = await asyncio.to_thread(IVFIndex.load, Path(settings.vector_index_path))
+        progress["recall_at_10"] = _sample_recall(index, stored, nprobe_check)
+    
+    progress["indexed"] = len(index)
+    progress["nlist"] = index.nlist
+    
+    _report_progress(job, progress)
+    print(f"✅ Built vector index: {len(index)} vectors in {index.nlist} lists")
+    
+    return progress
+
+
+async def _build_index(model_id: str, nlist: int | None, progress: dict, job) -> IVFIndex:
+    """Read the model's chunk vectors and train the index."""
+    ids = []
+    video_ids = []
+    vectors = []
+    after = None
+    
+    while True:
+        rows = await supabase.rpc("chunk_embeddings_page", {
+            "p_embedding_model": model_id,
+            "p_after": after,
+            "p_limit": PAGE_SIZE,
+        })
+        if not rows:
+            break
+        
+        # Vectors arrive int8-quantized, a fraction of the JSON size
+        for row in rows:
+            ids.append(row["id"])
+            video_ids.append(row["video_id"])
+            vectors.append(decode_q8(row["embedding_q8"]))
+        
+        after = rows[-1]["id"]
+        progress["read"] += len(rows)
+        _report_progress(job, progress)
+    
+    if not vectors:
+        raise RuntimeError(f"No chunk vectors for {model_id}")
+    
+    start = time.perf_counter()
+    index = await asyncio.to_thread(
+        IVFIndex.build,
+        model_id,
+        ids,
+        video_ids,
+        np.stack(vectors),
+        settings.vector_index_nlist if nlist is None else nlist,
+        settings.vector_index_train_iterations,
+    )
+    progress["build_seconds"] = round(time.perf_counter() - start, 1)
+    
+    return index
+
+
+def _sample_recall(
+    index: IVFIndex,
+    stored: IVFIndex,
+    nprobe: int,
+    queries: int = 100,
+    k: int = 10
+) -> float:
+    """
+    Recall@k of the stored index at nprobe versus exact float32 search.
+    
+    Queries are indexed vectors; rescoring is not applied, so this is a
+    lower bound on search recall.
+    """
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(index), min(queries, len(index)), replace=False)
+    hits = 0
+    
+    for row in rows:
+        query = np.asarray(index.vectors[row])
+        exact = {chunk_id for chunk_id, _, _ in index.search(query, k, nprobe=index.nlist)}
+        approximate = {chunk_id for chunk_id, _, _ in stored.search(query, k, nprobe=nprobe)}
+        hits += len(exact & approximate)
+    
+    return round(hits / (len(rows) * k), 4)
+
+
+def build_vector_index(nlist: int | None = None, nprobe_check: int | None = None) -> dict:
+    """
+    Synchronous wrapper for the vector index build job.
+    
+    This is the function that RQ will call.
+    
+    Args:
+        nlist: Number of inverted lists
+        nprobe_check: nprobe to measure recall for
+    
+    Returns:
+        Progress counters
+    """
+    return asyncio.run(build_vector_index_async(nlist, nprobe_check))
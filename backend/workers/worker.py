@@ -7,15 +7,33 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from redis import Redis
-from rq import Worker
+from rq import SimpleWorker, Worker
 from config import settings
 
 
+def worker_class() -> type[Worker]:
+    """
+    RQ worker class for the configured backends.
+    
+    The default Worker forks a work horse per job, so anything a job sets up
+    in-process dies with it. The local transcription pool and the models
+    loaded in it must outlive jobs, so that backend runs jobs in the worker
+    process itself.
+    """
+    if settings.transcription_backend == "local":
+        return SimpleWorker
+    return Worker
+
+
 def main():
     """Start RQ worker."""
+    if settings.transcription_backend == "local":
+        from services.local_transcription import check_dependencies
+        check_dependencies()
+    
     redis_conn = Redis.from_url(settings.redis_url, decode_responses=False)
     
-    worker = Worker(
+    worker = worker_class()(
         ["default"],
         connection=redis_conn,
         name="clipbrain-worker"
@@ -23,6 +41,7 @@ def main():
     
     print("🚀 Starting ClipBrain worker...")
     print(f"   Listening on queue: default")
+    print(f"   Worker class: {type(worker).__name__}")
     print(f"   Redis: {settings.redis_url[:50]}...")
     
     worker.work()
@@ -0,0 +1,32 @@
+-- Persist word-level timings so transcripts can be re-chunked without re-transcription.
+-- Stored as a compact array of [word, start_ms, end_ms] triples.
+ALTER TABLE transcripts ADD COLUMN IF NOT EXISTS words JSONB;
+
+-- Atomically replace all chunks of a video.
+-- p_chunks is a JSON array of {start_ms, end_ms, text, text_hash, embedding} objects.
+-- The delete and insert run in a single transaction, so search never sees a
+-- video with a partial chunk set.
+CREATE OR REPLACE FUNCTION replace_transcript_chunks(p_video_id UUID, p_chunks JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  inserted_count INTEGER;
+BEGIN
+  DELETE FROM transcript_chunks WHERE video_id = p_video_id;
+
+  INSERT INTO transcript_chunks (video_id, start_ms, end_ms, text, text_hash, embedding)
+  SELECT
+    p_video_id,
+    (c->>'start_ms')::INTEGER,
+    (c->>'end_ms')::INTEGER,
+    c->>'text',
+    c->>'text_hash',
+    CASE
+      WHEN c->'embedding' IS NULL OR jsonb_typeof(c->'embedding') = 'null' THEN NULL
+      ELSE (c->>'embedding')::vector
+    END
+  FROM jsonb_array_elements(p_chunks) AS c;
+
+  GET DIAGNOSTICS inserted_count = ROW_COUNT;
+  RETURN inserted_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,8 @@
+-- Cache of generated notes keyed by a hash of the normalized transcript,
+-- the notes prompt version and the include-chapters flag. Lets identical
+-- content (re-ingests, cross-platform reposts) skip notes generation.
+CREATE TABLE IF NOT EXISTS notes_cache (
+  cache_key TEXT PRIMARY KEY,
+  result JSONB NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT now()
+);
@@ -0,0 +1,61 @@
+-- Landmark hashes of processed videos for content-level deduplication.
+-- Each row is one (hash, frame offset) landmark from the start of the audio.
+CREATE TABLE IF NOT EXISTS audio_fingerprints (
+  video_id UUID NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+  hash INTEGER NOT NULL,
+  offset_frames INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_audio_fingerprints_hash ON audio_fingerprints(hash);
+CREATE INDEX IF NOT EXISTS idx_audio_fingerprints_video ON audio_fingerprints(video_id);
+
+-- Videos whose transcript, notes and chunks were linked from an identical upload
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS duplicate_of UUID REFERENCES videos(id) ON DELETE SET NULL;
+
+-- Find the done video sharing the most landmarks at a consistent time offset.
+CREATE OR REPLACE FUNCTION match_audio_fingerprint(p_hashes INTEGER[], p_offsets INTEGER[])
+RETURNS TABLE (video_id UUID, delta_frames INTEGER, score BIGINT) AS $$
+  SELECT f.video_id, f.offset_frames - q.offset_frames AS delta_frames, COUNT(*) AS score
+  FROM unnest(p_hashes, p_offsets) AS q(hash, offset_frames)
+  JOIN audio_fingerprints f ON f.hash = q.hash
+  JOIN videos v ON v.id = f.video_id AND v.status = 'done'
+  GROUP BY f.video_id, delta_frames
+  ORDER BY score DESC
+  LIMIT 1;
+$$ LANGUAGE sql STABLE;
+
+-- Link a new video to the transcript, notes and chunks of an identical one.
+-- p_offset_ms is how far into the source the new video starts; chunk
+-- timestamps are shifted so they stay aligned with the new video.
+CREATE OR REPLACE FUNCTION link_duplicate_video(
+  p_video_id UUID,
+  p_source_video_id UUID,
+  p_offset_ms INTEGER DEFAULT 0
+)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE videos
+  SET duplicate_of = src.id,
+      storage_path = src.storage_path,
+      title = COALESCE(videos.title, src.title),
+      duration_seconds = COALESCE(videos.duration_seconds, src.duration_seconds),
+      language = COALESCE(videos.language, src.language)
+  FROM videos src
+  WHERE videos.id = p_video_id AND src.id = p_source_video_id;
+
+  INSERT INTO transcripts (video_id, full_text, words)
+  SELECT p_video_id, full_text, words
+  FROM transcripts WHERE video_id = p_source_video_id;
+
+  INSERT INTO notes (video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text)
+  SELECT p_video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text
+  FROM notes WHERE video_id = p_source_video_id;
+
+  INSERT INTO transcript_chunks (video_id, start_ms, end_ms, text, text_hash, embedding)
+  SELECT p_video_id,
+         GREATEST(start_ms - p_offset_ms, 0),
+         GREATEST(end_ms - p_offset_ms, 0),
+         text, text_hash, embedding
+  FROM transcript_chunks WHERE video_id = p_source_video_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,41 @@
+-- Offset of the stored media file relative to the source video, in
+-- milliseconds. Non-zero when leading silence was trimmed before upload;
+-- transcript timestamps stay on the source timeline, so players of the
+-- stored file seek to (start_ms - media_offset_ms).
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS media_offset_ms INTEGER NOT NULL DEFAULT 0;
+
+-- Linked duplicates share the source storage object, so their media offset is
+-- the source offset adjusted by where the duplicate starts within the source.
+CREATE OR REPLACE FUNCTION link_duplicate_video(
+  p_video_id UUID,
+  p_source_video_id UUID,
+  p_offset_ms INTEGER DEFAULT 0
+)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE videos
+  SET duplicate_of = src.id,
+      storage_path = src.storage_path,
+      media_offset_ms = src.media_offset_ms - p_offset_ms,
+      title = COALESCE(videos.title, src.title),
+      duration_seconds = COALESCE(videos.duration_seconds, src.duration_seconds),
+      language = COALESCE(videos.language, src.language)
+  FROM videos src
+  WHERE videos.id = p_video_id AND src.id = p_source_video_id;
+
+  INSERT INTO transcripts (video_id, full_text, words)
+  SELECT p_video_id, full_text, words
+  FROM transcripts WHERE video_id = p_source_video_id;
+
+  INSERT INTO notes (video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text)
+  SELECT p_video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text
+  FROM notes WHERE video_id = p_source_video_id;
+
+  INSERT INTO transcript_chunks (video_id, start_ms, end_ms, text, text_hash, embedding)
+  SELECT p_video_id,
+         GREATEST(start_ms - p_offset_ms, 0),
+         GREATEST(end_ms - p_offset_ms, 0),
+         text, text_hash, embedding
+  FROM transcript_chunks WHERE video_id = p_source_video_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,3 @@
+-- Deepgram request ID of a transcription submitted in callback mode, kept
+-- so a parked video can be traced back to its pending request.
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS transcription_request_id TEXT;
@@ -0,0 +1,70 @@
+-- Identity of the model that produced each chunk embedding, e.g.
+-- 'gemini/text-embedding-004' or 'local/sentence-transformers/all-mpnet-base-v2'.
+ALTER TABLE transcript_chunks ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+
+-- Every embedding stored so far came from Gemini text-embedding-004
+UPDATE transcript_chunks
+SET embedding_model = 'gemini/text-embedding-004'
+WHERE embedding IS NOT NULL AND embedding_model IS NULL;
+
+-- p_chunks objects may now carry embedding_model.
+CREATE OR REPLACE FUNCTION replace_transcript_chunks(p_video_id UUID, p_chunks JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  inserted_count INTEGER;
+BEGIN
+  DELETE FROM transcript_chunks WHERE video_id = p_video_id;
+
+  INSERT INTO transcript_chunks (video_id, start_ms, end_ms, text, text_hash, embedding, embedding_model)
+  SELECT
+    p_video_id,
+    (c->>'start_ms')::INTEGER,
+    (c->>'end_ms')::INTEGER,
+    c->>'text',
+    c->>'text_hash',
+    CASE
+      WHEN c->'embedding' IS NULL OR jsonb_typeof(c->'embedding') = 'null' THEN NULL
+      ELSE (c->>'embedding')::vector
+    END,
+    c->>'embedding_model'
+  FROM jsonb_array_elements(p_chunks) AS c;
+
+  GET DIAGNOSTICS inserted_count = ROW_COUNT;
+  RETURN inserted_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Linked duplicates keep the model identity of the copied embeddings.
+CREATE OR REPLACE FUNCTION link_duplicate_video(
+  p_video_id UUID,
+  p_source_video_id UUID,
+  p_offset_ms INTEGER DEFAULT 0
+)
+RETURNS VOID AS $$
+BEGIN
+  UPDATE videos
+  SET duplicate_of = src.id,
+      storage_path = src.storage_path,
+      media_offset_ms = src.media_offset_ms - p_offset_ms,
+      title = COALESCE(videos.title, src.title),
+      duration_seconds = COALESCE(videos.duration_seconds, src.duration_seconds),
+      language = COALESCE(videos.language, src.language)
+  FROM videos src
+  WHERE videos.id = p_video_id AND src.id = p_source_video_id;
+
+  INSERT INTO transcripts (video_id, full_text, words)
+  SELECT p_video_id, full_text, words
+  FROM transcripts WHERE video_id = p_source_video_id;
+
+  INSERT INTO notes (video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text)
+  SELECT p_video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text
+  FROM notes WHERE video_id = p_source_video_id;
+
+  INSERT INTO transcript_chunks (video_id, start_ms, end_ms, text, text_hash, embedding, embedding_model)
+  SELECT p_video_id,
+         GREATEST(start_ms - p_offset_ms, 0),
+         GREATEST(end_ms - p_offset_ms, 0),
+         text, text_hash, embedding, embedding_model
+  FROM transcript_chunks WHERE video_id = p_source_video_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,75 @@
+-- Embedding model registry. The active model is the one whose vectors live in
+-- transcript_chunks.embedding and that search uses to embed queries.
+CREATE TABLE IF NOT EXISTS embedding_models (
+  model_id TEXT PRIMARY KEY,
+  dimension INTEGER NOT NULL,
+  is_active BOOLEAN NOT NULL DEFAULT false,
+  created_at TIMESTAMPTZ DEFAULT now(),
+  activated_at TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_embedding_models_active ON embedding_models(is_active) WHERE is_active;
+
+-- Store vectors of any dimension. The fixed-dimension ivfflat index cannot
+-- cover a dimensionless column; build a per-model expression index instead, e.g.
+--   CREATE INDEX ON transcript_chunks USING ivfflat ((embedding::vector(768)) vector_cosine_ops)
+--   WHERE embedding_model = 'gemini/text-embedding-004';
+DROP INDEX IF EXISTS idx_chunks_embedding;
+ALTER TABLE transcript_chunks ALTER COLUMN embedding TYPE vector;
+
+-- Embedding cache lookups are keyed by (text_hash, embedding_model)
+DROP INDEX IF EXISTS idx_chunks_text_hash;
+CREATE INDEX IF NOT EXISTS idx_chunks_text_hash_model ON transcript_chunks(text_hash, embedding_model);
+
+-- Vectors from a model being migrated to, staged until cutover so search keeps
+-- serving the active model's vectors meanwhile.
+CREATE TABLE IF NOT EXISTS transcript_chunk_embeddings (
+  chunk_id UUID NOT NULL REFERENCES transcript_chunks(id) ON DELETE CASCADE,
+  embedding_model TEXT NOT NULL,
+  embedding vector NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (chunk_id, embedding_model)
+);
+
+-- Chunks not yet embedded (nor staged) for a model, in id order after p_after.
+CREATE OR REPLACE FUNCTION chunks_missing_embedding(
+  p_model_id TEXT,
+  p_after UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 64
+)
+RETURNS TABLE (id UUID, text TEXT, text_hash TEXT) AS $$
+  SELECT c.id, c.text, c.text_hash
+  FROM transcript_chunks c
+  WHERE c.embedding_model IS DISTINCT FROM p_model_id
+    AND (p_after IS NULL OR c.id > p_after)
+    AND NOT EXISTS (
+      SELECT 1 FROM transcript_chunk_embeddings s
+      WHERE s.chunk_id = c.id AND s.embedding_model = p_model_id
+    )
+  ORDER BY c.id
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Cut search over to a model: move its staged vectors into transcript_chunks
+-- and mark it active, all in one transaction. Returns the chunks switched.
+CREATE OR REPLACE FUNCTION activate_embedding_model(p_model_id TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+  switched_count INTEGER;
+BEGIN
+  UPDATE transcript_chunks c
+  SET embedding = s.embedding,
+      embedding_model = s.embedding_model
+  FROM transcript_chunk_embeddings s
+  WHERE s.chunk_id = c.id AND s.embedding_model = p_model_id;
+
+  GET DIAGNOSTICS switched_count = ROW_COUNT;
+
+  DELETE FROM transcript_chunk_embeddings WHERE embedding_model = p_model_id;
+
+  UPDATE embedding_models SET is_active = false WHERE is_active AND model_id <> p_model_id;
+  UPDATE embedding_models SET is_active = true, activated_at = now() WHERE model_id = p_model_id;
+
+  RETURN switched_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,48 @@
+-- Candidate retrieval with tag and platform filters applied before ranking,
+-- so a filtered search still returns a full top-k.
+-- p_tags matches videos whose keywords include every given tag.
+
+-- Nearest chunks to a query embedding among chunks from the same model.
+CREATE OR REPLACE FUNCTION match_chunks(
+  p_query_embedding vector,
+  p_embedding_model TEXT,
+  p_platform TEXT DEFAULT NULL,
+  p_tags TEXT[] DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (id UUID, video_id UUID, start_ms INTEGER, end_ms INTEGER, text TEXT, similarity FLOAT) AS $$
+  SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text,
+         1 - (c.embedding <=> p_query_embedding) AS similarity
+  FROM transcript_chunks c
+  JOIN videos v ON v.id = c.video_id
+  LEFT JOIN notes n ON n.video_id = c.video_id
+  WHERE c.embedding_model = p_embedding_model
+    AND c.embedding IS NOT NULL
+    AND (p_platform IS NULL OR v.platform = p_platform)
+    AND (p_tags IS NULL OR n.keywords @> p_tags)
+  ORDER BY c.embedding <=> p_query_embedding
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Chunks containing a query phrase (case-insensitive), scored by occurrence count.
+CREATE OR REPLACE FUNCTION search_chunks_text(
+  p_query TEXT,
+  p_platform TEXT DEFAULT NULL,
+  p_tags TEXT[] DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (id UUID, video_id UUID, start_ms INTEGER, end_ms INTEGER, text TEXT, occurrences INTEGER) AS $$
+  SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text,
+         ((length(c.text) - length(replace(lower(c.text), lower(p_query), ''))) / length(p_query))::INTEGER AS occurrences
+  FROM transcript_chunks c
+  JOIN videos v ON v.id = c.video_id
+  LEFT JOIN notes n ON n.video_id = c.video_id
+  WHERE c.text ILIKE '%' || replace(replace(replace(p_query, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+    AND (p_platform IS NULL OR v.platform = p_platform)
+    AND (p_tags IS NULL OR n.keywords @> p_tags)
+  ORDER BY occurrences DESC
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Trigram index so the phrase match does not scan every chunk
+CREATE INDEX IF NOT EXISTS idx_chunks_text_trgm ON transcript_chunks USING gin(text gin_trgm_ops);
@@ -0,0 +1,40 @@
+-- Support for the optional in-process vector index.
+
+-- Page through chunk embeddings of one model in id order (index builds).
+CREATE OR REPLACE FUNCTION chunk_embeddings_page(
+  p_embedding_model TEXT,
+  p_after UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 1000
+)
+RETURNS TABLE (id UUID, video_id UUID, embedding vector) AS $$
+  SELECT c.id, c.video_id, c.embedding
+  FROM transcript_chunks c
+  WHERE c.embedding_model = p_embedding_model
+    AND c.embedding IS NOT NULL
+    AND (p_after IS NULL OR c.id > p_after)
+  ORDER BY c.id
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Chunk rows for ids returned by the index, in one round trip.
+CREATE OR REPLACE FUNCTION get_chunks(p_ids UUID[])
+RETURNS TABLE (id UUID, video_id UUID, start_ms INTEGER, end_ms INTEGER, text TEXT) AS $$
+  SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text
+  FROM transcript_chunks c
+  WHERE c.id = ANY(p_ids);
+$$ LANGUAGE sql STABLE;
+
+-- Videos passing search filters, used to pre-filter index candidates.
+-- p_tags matches videos whose keywords include every given tag.
+CREATE OR REPLACE FUNCTION filter_video_ids(
+  p_platform TEXT DEFAULT NULL,
+  p_tags TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (id UUID) AS $$
+  SELECT v.id
+  FROM videos v
+  LEFT JOIN notes n ON n.video_id = v.id
+  WHERE v.status = 'done'
+    AND (p_platform IS NULL OR v.platform = p_platform)
+    AND (p_tags IS NULL OR n.keywords @> p_tags);
+$$ LANGUAGE sql STABLE;
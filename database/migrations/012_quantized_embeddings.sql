@@ -0,0 +1,77 @@
+-- Compact binary transport of chunk vectors and exact rescoring.
+
+-- Scalar-quantize a vector to int8 with a per-vector scale, base64 encoded:
+-- 4 bytes of big-endian float4 scale, then one signed byte per dimension
+-- (value = byte * scale). About 1 KB for 768 dimensions instead of ~9 KB
+-- of JSON text.
+CREATE OR REPLACE FUNCTION quantize_embedding(p_embedding vector)
+RETURNS TEXT AS $$
+  WITH v AS (
+    SELECT x, i
+    FROM unnest(p_embedding::real[]) WITH ORDINALITY AS t(x, i)
+  ),
+  s AS (
+    SELECT GREATEST(MAX(ABS(x)), 1e-12) / 127 AS scale FROM v
+  )
+  SELECT encode(
+    float4send(s.scale::real) || string_agg(
+      set_byte('\x00'::bytea, 0, (LEAST(GREATEST(ROUND(v.x / s.scale), -127), 127)::int & 255)),
+      ''::bytea ORDER BY v.i
+    ),
+    'base64'
+  )
+  FROM v, s
+  GROUP BY s.scale;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Index builds read quantized vectors instead of JSON arrays.
+DROP FUNCTION IF EXISTS chunk_embeddings_page(TEXT, UUID, INTEGER);
+CREATE OR REPLACE FUNCTION chunk_embeddings_page(
+  p_embedding_model TEXT,
+  p_after UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 1000
+)
+RETURNS TABLE (id UUID, video_id UUID, embedding_q8 TEXT) AS $$
+  SELECT c.id, c.video_id, quantize_embedding(c.embedding)
+  FROM transcript_chunks c
+  WHERE c.embedding_model = p_embedding_model
+    AND c.embedding IS NOT NULL
+    AND (p_after IS NULL OR c.id > p_after)
+  ORDER BY c.id
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+-- Quantized vectors of some videos' chunks, for vector change log entries.
+CREATE OR REPLACE FUNCTION chunk_embeddings_for_videos(
+  p_video_ids UUID[],
+  p_embedding_model TEXT
+)
+RETURNS TABLE (id UUID, video_id UUID, embedding_q8 TEXT) AS $$
+  SELECT c.id, c.video_id, quantize_embedding(c.embedding)
+  FROM transcript_chunks c
+  WHERE c.video_id = ANY(p_video_ids)
+    AND c.embedding_model = p_embedding_model
+    AND c.embedding IS NOT NULL;
+$$ LANGUAGE sql STABLE;
+
+-- Chunk rows for index candidates, with full-precision similarity to the
+-- query when one is given so quantized index scores can be rescored.
+DROP FUNCTION IF EXISTS get_chunks(UUID[]);
+CREATE OR REPLACE FUNCTION get_chunks(
+  p_ids UUID[],
+  p_query_embedding vector DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  video_id UUID,
+  start_ms INTEGER,
+  end_ms INTEGER,
+  text TEXT,
+  similarity FLOAT
+) AS $$
+  SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text,
+         CASE WHEN p_query_embedding IS NULL THEN NULL
+              ELSE 1 - (c.embedding <=> p_query_embedding) END
+  FROM transcript_chunks c
+  WHERE c.id = ANY(p_ids);
+$$ LANGUAGE sql STABLE;
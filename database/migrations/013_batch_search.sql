@@ -0,0 +1,78 @@
+-- Batched candidate retrieval: many queries per round trip.
+-- p_queries is a JSON array of {"embedding" | "query", "platform", "tags"}
+-- objects; results carry the zero-based index of the query they answer.
+
+CREATE OR REPLACE FUNCTION match_chunks_batch(
+  p_queries JSONB,
+  p_embedding_model TEXT,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+  query_index INTEGER,
+  id UUID,
+  video_id UUID,
+  start_ms INTEGER,
+  end_ms INTEGER,
+  text TEXT,
+  similarity FLOAT
+) AS $$
+  SELECT (q.ordinality - 1)::INTEGER, m.*
+  FROM jsonb_array_elements(p_queries) WITH ORDINALITY AS q(query, ordinality)
+  CROSS JOIN LATERAL match_chunks(
+    (q.query->>'embedding')::vector,
+    p_embedding_model,
+    q.query->>'platform',
+    CASE WHEN jsonb_typeof(q.query->'tags') = 'array'
+         THEN ARRAY(SELECT jsonb_array_elements_text(q.query->'tags')) END,
+    p_limit
+  ) AS m;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION search_chunks_text_batch(
+  p_queries JSONB,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+  query_index INTEGER,
+  id UUID,
+  video_id UUID,
+  start_ms INTEGER,
+  end_ms INTEGER,
+  text TEXT,
+  occurrences INTEGER
+) AS $$
+  SELECT (q.ordinality - 1)::INTEGER, m.*
+  FROM jsonb_array_elements(p_queries) WITH ORDINALITY AS q(query, ordinality)
+  CROSS JOIN LATERAL search_chunks_text(
+    q.query->>'query',
+    q.query->>'platform',
+    CASE WHEN jsonb_typeof(q.query->'tags') = 'array'
+         THEN ARRAY(SELECT jsonb_array_elements_text(q.query->'tags')) END,
+    p_limit
+  ) AS m;
+$$ LANGUAGE sql STABLE;
+
+-- Chunk rows for vector index candidates of several queries, with the
+-- full-precision similarity of each chunk to each query (in query order)
+-- for rescoring.
+CREATE OR REPLACE FUNCTION get_chunks_batch(
+  p_ids UUID[],
+  p_query_embeddings JSONB
+)
+RETURNS TABLE (
+  id UUID,
+  video_id UUID,
+  start_ms INTEGER,
+  end_ms INTEGER,
+  text TEXT,
+  similarities FLOAT[]
+) AS $$
+  SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text,
+         ARRAY(
+           SELECT 1 - (c.embedding <=> (e.value #>> '{}')::vector)
+           FROM jsonb_array_elements(p_query_embeddings) WITH ORDINALITY AS e(value, ordinality)
+           ORDER BY e.ordinality
+         )
+  FROM transcript_chunks c
+  WHERE c.id = ANY(p_ids);
+$$ LANGUAGE sql STABLE;
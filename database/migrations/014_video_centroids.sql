@@ -0,0 +1,66 @@
+-- Per-video centroid embeddings (mean of the video's chunk vectors) for
+-- related-video lookups and clustering.
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS centroid vector;
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS centroid_model TEXT;
+
+-- Recompute the centroids of some videos from one model's chunk vectors.
+CREATE OR REPLACE FUNCTION compute_video_centroids(
+  p_video_ids UUID[],
+  p_embedding_model TEXT
+)
+RETURNS INTEGER AS $$
+DECLARE
+  updated_count INTEGER;
+BEGIN
+  UPDATE videos v
+  SET centroid = c.centroid,
+      centroid_model = p_embedding_model
+  FROM (
+    SELECT video_id, AVG(embedding) AS centroid
+    FROM transcript_chunks
+    WHERE video_id = ANY(p_video_ids)
+      AND embedding_model = p_embedding_model
+      AND embedding IS NOT NULL
+    GROUP BY video_id
+  ) c
+  WHERE v.id = c.video_id;
+
+  GET DIAGNOSTICS updated_count = ROW_COUNT;
+  RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Compute centroids for done videos lacking one from the model.
+CREATE OR REPLACE FUNCTION compute_missing_video_centroids(p_embedding_model TEXT)
+RETURNS INTEGER AS $$
+  SELECT compute_video_centroids(
+    ARRAY(
+      SELECT id FROM videos
+      WHERE status = 'done' AND centroid_model IS DISTINCT FROM p_embedding_model
+    ),
+    p_embedding_model
+  );
+$$ LANGUAGE sql;
+
+-- Quantized centroids of done videos from a model (see quantize_embedding),
+-- optionally only for some videos.
+CREATE OR REPLACE FUNCTION video_centroids(
+  p_embedding_model TEXT,
+  p_video_ids UUID[] DEFAULT NULL
+)
+RETURNS TABLE (id UUID, centroid_q8 TEXT) AS $$
+  SELECT v.id, quantize_embedding(v.centroid)
+  FROM videos v
+  WHERE v.status = 'done'
+    AND v.centroid_model = p_embedding_model
+    AND v.centroid IS NOT NULL
+    AND (p_video_ids IS NULL OR v.id = ANY(p_video_ids));
+$$ LANGUAGE sql STABLE;
+
+-- Backfill from the active model (Gemini before any model switch)
+SELECT compute_missing_video_centroids(
+  COALESCE(
+    (SELECT model_id FROM embedding_models WHERE is_active),
+    'gemini/text-embedding-004'
+  )
+);
@@ -0,0 +1,67 @@
+-- Suggested collections from clustering video centroids. A suggested
+-- collection keeps its cluster centroid so new videos can join the nearest
+-- one without re-clustering; accepting it turns it into a manual collection.
+ALTER TABLE collections ADD COLUMN IF NOT EXISTS suggested BOOLEAN NOT NULL DEFAULT false;
+ALTER TABLE collections ADD COLUMN IF NOT EXISTS centroid vector;
+ALTER TABLE collections ADD COLUMN IF NOT EXISTS centroid_model TEXT;
+
+-- Replace all suggested collections in one transaction.
+-- p_collections is a JSON array of {"name", "centroid", "video_ids"} objects.
+CREATE OR REPLACE FUNCTION replace_suggested_collections(
+  p_collections JSONB,
+  p_embedding_model TEXT
+)
+RETURNS INTEGER AS $$
+DECLARE
+  item JSONB;
+  new_id UUID;
+  created_count INTEGER := 0;
+BEGIN
+  DELETE FROM collections WHERE suggested;
+
+  FOR item IN SELECT * FROM jsonb_array_elements(p_collections) LOOP
+    INSERT INTO collections (name, suggested, centroid, centroid_model)
+    VALUES (item->>'name', true, (item->>'centroid')::vector, p_embedding_model)
+    RETURNING id INTO new_id;
+
+    INSERT INTO collection_items (collection_id, video_id)
+    SELECT new_id, video_id::UUID
+    FROM jsonb_array_elements_text(item->'video_ids') AS video_id;
+
+    created_count := created_count + 1;
+  END LOOP;
+
+  RETURN created_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move videos into the suggested collection with the nearest centroid, if
+-- it is similar enough. Returns the number of videos assigned.
+CREATE OR REPLACE FUNCTION assign_suggested_collections(
+  p_video_ids UUID[],
+  p_min_similarity FLOAT
+)
+RETURNS INTEGER AS $$
+DECLARE
+  assigned_count INTEGER;
+BEGIN
+  DELETE FROM collection_items ci
+  USING collections c
+  WHERE ci.collection_id = c.id
+    AND c.suggested
+    AND ci.video_id = ANY(p_video_ids);
+
+  INSERT INTO collection_items (collection_id, video_id)
+  SELECT DISTINCT ON (v.id) c.id, v.id
+  FROM videos v
+  JOIN collections c
+    ON c.suggested AND c.centroid_model = v.centroid_model
+  WHERE v.id = ANY(p_video_ids)
+    AND v.centroid IS NOT NULL
+    AND 1 - (c.centroid <=> v.centroid) >= p_min_similarity
+  ORDER BY v.id, c.centroid <=> v.centroid;
+
+  GET DIAGNOSTICS assigned_count = ROW_COUNT;
+  RETURN assigned_count;
+END;
+$$ LANGUAGE plpgsql;
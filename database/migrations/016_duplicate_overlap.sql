@@ -0,0 +1,129 @@
+-- Duplicate linking only copies the span both recordings share.
+-- The fingerprint match also reports how many landmarks the source has and
+-- its duration, so a short clip of a longer video is not taken for a repost.
+DROP FUNCTION IF EXISTS match_audio_fingerprint(INTEGER[], INTEGER[]);
+
+CREATE FUNCTION match_audio_fingerprint(p_hashes INTEGER[], p_offsets INTEGER[])
+RETURNS TABLE (
+  video_id UUID,
+  delta_frames INTEGER,
+  score BIGINT,
+  source_landmarks BIGINT,
+  duration_seconds INTEGER
+) AS $$
+  WITH best AS (
+    SELECT f.video_id, f.offset_frames - q.offset_frames AS delta_frames, COUNT(*) AS score
+    FROM unnest(p_hashes, p_offsets) AS q(hash, offset_frames)
+    JOIN audio_fingerprints f ON f.hash = q.hash
+    JOIN videos v ON v.id = f.video_id AND v.status = 'done'
+    GROUP BY f.video_id, delta_frames
+    ORDER BY score DESC
+    LIMIT 1
+  )
+  SELECT best.video_id,
+         best.delta_frames,
+         best.score,
+         (SELECT COUNT(*) FROM audio_fingerprints f WHERE f.video_id = best.video_id),
+         v.duration_seconds
+  FROM best
+  JOIN videos v ON v.id = best.video_id;
+$$ LANGUAGE sql STABLE;
+
+-- Link a new video to the transcript, notes and chunks of the same audio.
+-- p_offset_ms is how far into the source the new video starts and
+-- p_duration_ms how long it is; only source content inside that span is
+-- copied, shifted onto the new video's timeline. Chunks, transcript words
+-- and chapter and quote timestamps are all shifted the same way.
+DROP FUNCTION IF EXISTS link_duplicate_video(UUID, UUID, INTEGER);
+
+CREATE FUNCTION link_duplicate_video(
+  p_video_id UUID,
+  p_source_video_id UUID,
+  p_offset_ms INTEGER,
+  p_duration_ms INTEGER
+)
+RETURNS VOID AS $$
+DECLARE
+  span_end INTEGER := p_offset_ms + p_duration_ms;
+BEGIN
+  UPDATE videos
+  SET duplicate_of = src.id,
+      storage_path = src.storage_path,
+      media_offset_ms = src.media_offset_ms - p_offset_ms,
+      title = COALESCE(videos.title, src.title),
+      duration_seconds = COALESCE(videos.duration_seconds, src.duration_seconds),
+      language = COALESCE(videos.language, src.language)
+  FROM videos src
+  WHERE videos.id = p_video_id AND src.id = p_source_video_id;
+
+  -- Words are [word, start_ms, end_ms] triples; the full text is rebuilt
+  -- from the kept words only when some were cut
+  INSERT INTO transcripts (video_id, full_text, words)
+  SELECT p_video_id,
+         CASE WHEN kept.count = jsonb_array_length(COALESCE(t.words, '[]'::jsonb))
+              THEN t.full_text ELSE kept.text END,
+         CASE WHEN t.words IS NULL THEN NULL ELSE kept.words END
+  FROM transcripts t
+  CROSS JOIN LATERAL (
+    SELECT COUNT(*) AS count,
+           COALESCE(string_agg(w->>0, ' ' ORDER BY i), '') AS text,
+           COALESCE(
+             jsonb_agg(
+               jsonb_build_array(
+                 w->0,
+                 (w->>1)::INTEGER - p_offset_ms,
+                 LEAST((w->>2)::INTEGER - p_offset_ms, p_duration_ms)
+               )
+               ORDER BY i
+             ),
+             '[]'::jsonb
+           ) AS words
+    FROM jsonb_array_elements(COALESCE(t.words, '[]'::jsonb)) WITH ORDINALITY AS e(w, i)
+    WHERE (w->>1)::INTEGER >= p_offset_ms AND (w->>1)::INTEGER < span_end
+  ) kept
+  WHERE t.video_id = p_source_video_id;
+
+  INSERT INTO notes (video_id, summary, keywords, chapters, insights, steps, quotes, entities, notes_raw_text)
+  SELECT p_video_id, summary, keywords,
+         shift_timed_items(chapters, p_offset_ms, p_duration_ms),
+         insights, steps,
+         shift_timed_items(quotes, p_offset_ms, p_duration_ms),
+         entities, notes_raw_text
+  FROM notes WHERE video_id = p_source_video_id;
+
+  INSERT INTO transcript_chunks (video_id, start_ms, end_ms, text, text_hash, embedding, embedding_model)
+  SELECT p_video_id,
+         GREATEST(start_ms - p_offset_ms, 0),
+         LEAST(end_ms - p_offset_ms, p_duration_ms),
+         text, text_hash, embedding, embedding_model
+  FROM transcript_chunks
+  WHERE video_id = p_source_video_id
+    AND end_ms > p_offset_ms
+    AND start_ms < span_end;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep the items of a JSON array of {..., "start_ms"} objects that start
+-- inside [p_offset_ms, p_offset_ms + p_duration_ms), shifted by -p_offset_ms.
+-- Items without a numeric start_ms are kept unchanged.
+CREATE OR REPLACE FUNCTION shift_timed_items(
+  p_items JSONB,
+  p_offset_ms INTEGER,
+  p_duration_ms INTEGER
+)
+RETURNS JSONB AS $$
+  SELECT COALESCE(
+    jsonb_agg(
+      CASE WHEN timed
+           THEN jsonb_set(item, '{start_ms}', to_jsonb((item->>'start_ms')::NUMERIC - p_offset_ms))
+           ELSE item END
+      ORDER BY i
+    ),
+    '[]'::jsonb
+  )
+  FROM jsonb_array_elements(COALESCE(p_items, '[]'::jsonb)) WITH ORDINALITY AS e(item, i)
+  CROSS JOIN LATERAL (SELECT COALESCE(jsonb_typeof(item->'start_ms') = 'number', false) AS timed) t
+  WHERE NOT timed
+     OR ((item->>'start_ms')::NUMERIC >= p_offset_ms
+         AND (item->>'start_ms')::NUMERIC < p_offset_ms + p_duration_ms);
+$$ LANGUAGE sql IMMUTABLE;
@@ -0,0 +1,21 @@
+-- Videos parked waiting for a Deepgram callback that never arrives would stay
+-- "processing" forever. Fail those parked longer than the timeout; the
+-- callback route only claims videos still parked, so a late result is ignored.
+CREATE OR REPLACE FUNCTION expire_transcription_callbacks(p_timeout_seconds INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+  expired_count INTEGER;
+BEGIN
+  UPDATE videos
+  SET status = 'failed',
+      fail_reason = 'TRANSCRIPTION_TIMEOUT',
+      current_stage = NULL
+  WHERE status = 'processing'
+    AND current_stage = 'transcribe'
+    AND transcription_request_id IS NOT NULL
+    AND updated_at < now() - make_interval(secs => p_timeout_seconds);
+
+  GET DIAGNOSTICS expired_count = ROW_COUNT;
+  RETURN expired_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,131 @@
+-- Approximate nearest-neighbour indexes for the dimensionless embedding
+-- column. Migration 009 dropped the fixed-dimension ivfflat index, which left
+-- every database vector search an exact scan over all chunks. Each model now
+-- gets a partial HNSW index on its vectors cast to the model's dimension, and
+-- match_chunks queries through the same cast so the planner can use it.
+
+-- Dimension of a model: registered in embedding_models, else read off one of
+-- its stored vectors.
+CREATE OR REPLACE FUNCTION embedding_model_dimension(p_model_id TEXT)
+RETURNS INTEGER AS $$
+  SELECT COALESCE(
+    (SELECT dimension FROM embedding_models WHERE model_id = p_model_id),
+    (SELECT vector_dims(embedding) FROM transcript_chunks
+     WHERE embedding_model = p_model_id AND embedding IS NOT NULL
+     LIMIT 1)
+  );
+$$ LANGUAGE sql STABLE;
+
+-- Create the index for a model if it does not exist. pgvector indexes are
+-- limited to 2000 dimensions; larger models keep exact search.
+CREATE OR REPLACE FUNCTION ensure_embedding_index(
+  p_model_id TEXT,
+  p_dimension INTEGER DEFAULT NULL
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+  dim INTEGER := COALESCE(p_dimension, embedding_model_dimension(p_model_id));
+BEGIN
+  IF dim IS NULL OR dim > 2000 THEN
+    RETURN false;
+  END IF;
+
+  EXECUTE format(
+    'CREATE INDEX IF NOT EXISTS %I ON transcript_chunks '
+    'USING hnsw ((embedding::vector(%s)) vector_cosine_ops) '
+    'WHERE embedding_model = %L',
+    'idx_chunks_embedding_' || substr(md5(p_model_id), 1, 12),
+    dim,
+    p_model_id
+  );
+  RETURN true;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Vector candidates for a query, through the model's index when it has one.
+-- The query text is built per model so the cast and the partial index
+-- predicate match the index definition literally.
+CREATE OR REPLACE FUNCTION match_chunks(
+  p_query_embedding vector,
+  p_embedding_model TEXT,
+  p_platform TEXT DEFAULT NULL,
+  p_tags TEXT[] DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (id UUID, video_id UUID, start_ms INTEGER, end_ms INTEGER, text TEXT, similarity FLOAT) AS $$
+DECLARE
+  dim INTEGER := embedding_model_dimension(p_embedding_model);
+BEGIN
+  IF dim IS NULL OR dim > 2000 THEN
+    RETURN QUERY
+    SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text,
+           1 - (c.embedding <=> p_query_embedding) AS similarity
+    FROM transcript_chunks c
+    JOIN videos v ON v.id = c.video_id
+    LEFT JOIN notes n ON n.video_id = c.video_id
+    WHERE c.embedding_model = p_embedding_model
+      AND c.embedding IS NOT NULL
+      AND (p_platform IS NULL OR v.platform = p_platform)
+      AND (p_tags IS NULL OR n.keywords @> p_tags)
+    ORDER BY c.embedding <=> p_query_embedding
+    LIMIT p_limit;
+    RETURN;
+  END IF;
+
+  -- The HNSW candidate list must cover the limit; iterative scans (pgvector
+  -- 0.8+) keep filtered queries from coming back short
+  PERFORM set_config('hnsw.ef_search', LEAST(GREATEST(p_limit * 2, 40), 1000)::TEXT, true);
+  PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+
+  RETURN QUERY EXECUTE format(
+    'SELECT c.id, c.video_id, c.start_ms, c.end_ms, c.text,
+            1 - (c.embedding::vector(%1$s) <=> $1::vector(%1$s)) AS similarity
+     FROM transcript_chunks c
+     JOIN videos v ON v.id = c.video_id
+     LEFT JOIN notes n ON n.video_id = c.video_id
+     WHERE c.embedding_model = %2$L
+       AND ($2::TEXT IS NULL OR v.platform = $2)
+       AND ($3::TEXT[] IS NULL OR n.keywords @> $3)
+     ORDER BY c.embedding::vector(%1$s) <=> $1::vector(%1$s)
+     LIMIT $4',
+    dim,
+    p_embedding_model
+  )
+  USING p_query_embedding, p_platform, p_tags, p_limit;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Cutover builds the new model's index before its vectors move in.
+CREATE OR REPLACE FUNCTION activate_embedding_model(p_model_id TEXT)
+RETURNS INTEGER AS $$
+DECLARE
+  switched_count INTEGER;
+BEGIN
+  PERFORM ensure_embedding_index(p_model_id);
+
+  UPDATE transcript_chunks c
+  SET embedding = s.embedding,
+      embedding_model = s.embedding_model
+  FROM transcript_chunk_embeddings s
+  WHERE s.chunk_id = c.id AND s.embedding_model = p_model_id;
+
+  GET DIAGNOSTICS switched_count = ROW_COUNT;
+
+  DELETE FROM transcript_chunk_embeddings WHERE embedding_model = p_model_id;
+
+  UPDATE embedding_models SET is_active = false WHERE is_active AND model_id <> p_model_id;
+  UPDATE embedding_models SET is_active = true, activated_at = now() WHERE model_id = p_model_id;
+
+  RETURN switched_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Index the models already stored, and the default model on a fresh database
+SELECT ensure_embedding_index(model_id)
+FROM (
+  SELECT DISTINCT embedding_model AS model_id
+  FROM transcript_chunks
+  WHERE embedding_model IS NOT NULL
+) models;
+
+SELECT ensure_embedding_index('gemini/text-embedding-004', 768);
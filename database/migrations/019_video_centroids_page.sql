@@ -0,0 +1,21 @@
+-- Keyset pagination for video_centroids, like chunk_embeddings_page: a single
+-- call is truncated at PostgREST's max-rows, so callers page by video ID.
+DROP FUNCTION IF EXISTS video_centroids(TEXT, UUID[]);
+
+CREATE FUNCTION video_centroids(
+  p_embedding_model TEXT,
+  p_video_ids UUID[] DEFAULT NULL,
+  p_after UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 1000
+)
+RETURNS TABLE (id UUID, centroid_q8 TEXT) AS $$
+  SELECT v.id, quantize_embedding(v.centroid)
+  FROM videos v
+  WHERE v.status = 'done'
+    AND v.centroid_model = p_embedding_model
+    AND v.centroid IS NOT NULL
+    AND (p_video_ids IS NULL OR v.id = ANY(p_video_ids))
+    AND (p_after IS NULL OR v.id > p_after)
+  ORDER BY v.id
+  LIMIT p_limit;
+$$ LANGUAGE sql STABLE;